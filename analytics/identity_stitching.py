@@ -1,61 +1,143 @@
 """
 Identity Stitching - Merges anonymous histories when users log in
 Location: analytics/identity_stitching.py
+
+Login only enqueues a merge job on the identity stream; the identity
+worker (app/workers/identity_worker.py) calls stitch(), which attaches
+the session's anonymous rows in user_activity and analytics_events_v2
+to the user.
+
+device_id is only a fingerprint (user agent | accept | IP), shared by
+everyone on the same browser build behind one NAT or office IP, so it
+never decides ownership on its own: the device pass only attaches
+anonymous rows from sessions that already have rows belonging to this
+user (earlier logins in the same session cookie). Anonymous sessions
+that never saw a login stay anonymous.
+
+Each UPDATE touches at most `batch_size` rows found through the partial
+indexes on (session_id) / (device_id) WHERE user_id IS NULL
+(migrations/0007_identity_stitching.sql) and commits on its own, so a
+long anonymous history never holds many row locks at once and a login
+never waits on a table scan.
 """
 
+import os
+import time
 from typing import Optional
-from psycopg2.extras import RealDictCursor
-from db.connection import get_db
+
+from app.utils.redis_client import redis_client
+from db.statements import execute, statement
+
+IDENTITY_STREAM = "identity_stream"
+STREAM_MAXLEN = 100_000
+
+BATCH_SIZE = int(os.getenv("IDENTITY_STITCH_BATCH", 1000))
+
+STITCH_TABLES = ("user_activity", "analytics_events_v2")
+STITCH_KEYS = ("session_id", "device_id")
+
+# Extra condition per key (device: only sessions this user already owns)
+_STITCH_SCOPE = {
+    "session_id": "",
+    "device_id": "AND session_id IN (SELECT session_id FROM {table} WHERE user_id = %s)",
+}
+
+# The key predicate is repeated outside the subquery so the outer scan
+# also uses the partial index and never re-stitches a row.
+STITCH = {
+    (table, key): statement(f"stitch_{table}_{key}", f"""
+        UPDATE {table}
+        SET user_id = %s
+        WHERE id IN (
+            SELECT id FROM {table}
+            WHERE {key} = %s AND user_id IS NULL
+            {_STITCH_SCOPE[key].format(table=table)}
+            LIMIT %s
+        )
+          AND {key} = %s
+          AND user_id IS NULL
+    """)
+    for table in STITCH_TABLES
+    for key in STITCH_KEYS
+}
+
+# ============================================================
+# LOGIN PATH (ENQUEUE ONLY)
+# ============================================================
+
+def enqueue_merge(user_id: int, session_id: Optional[str], device_id: Optional[str] = None) -> Optional[str]:
+    """Queue a stitching job. Returns the stream id, or None if there is nothing to merge."""
+    if not session_id and not device_id:
+        return None
+    return redis_client.xadd(
+        IDENTITY_STREAM,
+        {
+            "user_id": user_id,
+            "session_id": session_id or "",
+            "device_id": device_id or "",
+            "ts": int(time.time()),
+        },
+        maxlen=STREAM_MAXLEN,
+        approximate=True,
+    )
 
 
 async def merge_anonymous_history_into_user(
     anonymous_session_id: str,
     user_id: int,
-    conn=None
-) -> int:
+    device_id: Optional[str] = None,
+) -> Optional[str]:
     """
-    Merge anonymous user_activity events into the authenticated user.
+    Merge anonymous activity into the authenticated user.
 
-    Purpose:
-        When a user logs in, their past anonymous session activity
-        (searches, clicks, views) should be connected to their
-        authenticated profile, giving you complete analytics.
+    Called on login. The merge itself runs in the identity worker; this
+    only queues it, so the request never touches the activity tables.
 
     Args:
         anonymous_session_id: The session_id before login
         user_id: The authenticated user's ID
-        conn: Optional database connection. If not provided, one is opened.
+        device_id: The device fingerprint; only stitches anonymous rows
+            of sessions this user has already logged in from
 
     Returns:
-        Number of events that were merged.
+        The queued job id (None if nothing to merge or Redis is down).
     """
-
-    # Allow external injections OR fallback to get_db()
-    if conn is None:
-        conn = get_db()
-
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-
-        # Secure update – no SQL injection possible using parameters
-        cur.execute(
-            """
-            UPDATE user_activity
-            SET user_id = %s
-            WHERE session_id = %s
-              AND user_id IS NULL
-            """,
-            (user_id, anonymous_session_id)
-        )
-
-        merged_count = cur.rowcount
-
-        conn.commit()
-        cur.close()
+        return enqueue_merge(user_id, anonymous_session_id, device_id)
+    except Exception as e:
+        # Do NOT crash the login — log safely
+        print(f"[Identity Stitching] Error queueing merge: {e}")
+        return None
 
-        return merged_count
+# ============================================================
+# WORKER PATH (CHUNKED, INDEXED UPDATES)
+# ============================================================
 
-    except Exception as e:
-        # Do NOT crash the app — log safely
-        print(f"[Identity Stitching] Error merging history: {e}")
-        return 0
+def stitch(
+    conn,
+    user_id: int,
+    session_id: Optional[str] = None,
+    device_id: Optional[str] = None,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Attach the session's anonymous rows to `user_id`, then the device's
+    rows in sessions the user owns (never by fingerprint alone). Returns
+    rows updated.
+    """
+    merged = 0
+    cur = conn.cursor()
+    for key, value in (("session_id", session_id), ("device_id", device_id)):
+        if not value:
+            continue
+        scope = (user_id,) if key == "device_id" else ()
+        for table in STITCH_TABLES:
+            while True:
+                execute(cur, STITCH[(table, key)], (user_id, value, *scope, batch_size, value))
+                updated = cur.rowcount
+                conn.commit()
+                merged += updated
+                if updated < batch_size:
+                    break
+    cur.close()
+    return merged
@@ -0,0 +1,283 @@
+"""
+Profile Store - Incrementally maintained personalization profiles
+Location: analytics/profile_store.py
+
+One Redis hash per session (and per user once known):
+
+    profile:session:{session_id} / profile:user:{user_id}
+        svc:{service}   decayed weight of searches / clicks for a service
+        loc:{city}      decayed weight of activity in a city
+        radius_sum      decayed sum of nearby-search radii
+        radius_n        decayed count of nearby searches
+        engagement      decayed count of high-intent events
+        updated_at      epoch seconds the weights are valid at
+
+The analytics stream carries sessions, not users: user profiles are
+filled by merge_session_into_user(), which the identity worker calls when
+a login is stitched, and get_profile() falls back to the session profile
+while the user hash is still empty. The merge moves the session hash
+(read and delete in one MULTI/EXEC), so a later login with the same
+long-lived session cookie folds in only what was recorded since. Events
+that carry a user_id update the user profile only, never both.
+
+The analytics worker calls record_event() for every event; weights decay
+exponentially with PROFILE_HALF_LIFE_HOURS, applied inside one Lua script
+so concurrent updates never lose increments. Reads go through a small
+in-process LRU (PROFILE_CACHE_SECONDS), so scoring a search costs a dict
+lookup most of the time and one HGETALL otherwise. Nothing here reads
+user_activity.
+"""
+
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.controlled_vocabulary import CONTROLLED_TERMS
+from app.utils.redis_client import redis_client
+
+HALF_LIFE = float(os.getenv("PROFILE_HALF_LIFE_HOURS", 72)) * 3600
+PROFILE_TTL = int(os.getenv("PROFILE_TTL_DAYS", 30)) * 86400
+CACHE_SECONDS = float(os.getenv("PROFILE_CACHE_SECONDS", 30))
+CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", 10_000))
+
+DEFAULT_RADIUS = 25
+MIN_SERVICE_WEIGHT = 0.5   # below this a service is no longer "preferred"
+
+SERVICE_LABELS = {"aba": "ABA", "speech": "Speech", "ot": "OT", "pt": "PT"}
+
+# Feature increments per event type
+SEARCH_EVENTS = {"search": 1.0, "fuzzy_search": 1.0, "search_unmet": 1.0,
+                 "search_low_supply": 1.0, "search_satisfied": 1.0}
+HIGH_INTENT_EVENTS = {"provider_view": 1.0, "phone_click": 2.0, "website_click": 2.0,
+                      "provider_phone_click": 2.0, "provider_website_click": 2.0,
+                      "provider_email_click": 2.0}
+
+EMPTY_PROFILE = {
+    "preferred_services": [],
+    "preferred_locations": [],
+    "avg_search_radius": DEFAULT_RADIUS,
+    "engagement_score": 0.0,
+}
+
+_SERVICE_PATTERNS = {
+    key: re.compile(r"\b(" + "|".join(re.escape(a) for a in sorted({key, *aliases}, key=len, reverse=True)) + r")\b")
+    for key, aliases in CONTROLLED_TERMS.items()
+}
+
+# KEYS[1] = profile key
+# ARGV = now, half_life, ttl, field1, inc1, field2, inc2, ...
+_DECAY_AND_ADD = redis_client.register_script("""
+local now = tonumber(ARGV[1])
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated_at') or now)
+local factor = math.pow(0.5, math.max(now - updated, 0) / tonumber(ARGV[2]))
+if factor < 0.999 then
+    local flat = redis.call('HGETALL', KEYS[1])
+    for i = 1, #flat, 2 do
+        if flat[i] ~= 'updated_at' then
+            local v = tonumber(flat[i + 1]) * factor
+            if v < 0.01 then
+                redis.call('HDEL', KEYS[1], flat[i])
+            else
+                redis.call('HSET', KEYS[1], flat[i], tostring(v))
+            end
+        end
+    end
+end
+for i = 4, #ARGV, 2 do
+    redis.call('HINCRBYFLOAT', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('HSET', KEYS[1], 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return 1
+""")
+
+
+def profile_key(session_id: Optional[str] = None, user_id: Optional[int] = None) -> Optional[str]:
+    if user_id:
+        return f"profile:user:{user_id}"
+    if session_id:
+        return f"profile:session:{session_id}"
+    return None
+
+
+def services_in(text: str) -> List[str]:
+    """Canonical service keys mentioned in free text (query or provider services)."""
+    text = (text or "").lower()
+    return [key for key, pattern in _SERVICE_PATTERNS.items() if pattern.search(text)]
+
+# ============================================================
+# WRITE PATH (ANALYTICS WORKER)
+# ============================================================
+
+def features(event: Dict[str, Any]) -> Dict[str, float]:
+    """Field increments one stream event contributes to a profile."""
+    event_type = event.get("event") or event.get("event_type") or ""
+    inc: Dict[str, float] = {}
+
+    if event_type in SEARCH_EVENTS:
+        for key in services_in(event.get("query") or event.get("search_query") or ""):
+            inc[f"svc:{key}"] = SEARCH_EVENTS[event_type]
+
+    if event_type == "nearby_search" and event.get("radius"):
+        try:
+            inc["radius_sum"] = float(event["radius"])
+            inc["radius_n"] = 1.0
+        except (TypeError, ValueError):
+            pass
+
+    if event_type in HIGH_INTENT_EVENTS:
+        inc["engagement"] = HIGH_INTENT_EVENTS[event_type]
+        for key in services_in(event.get("search_query") or ""):
+            inc[f"svc:{key}"] = inc.get(f"svc:{key}", 0.0) + HIGH_INTENT_EVENTS[event_type]
+
+    city = (event.get("city") or "").strip()
+    if city and inc:
+        inc[f"loc:{city}"] = 1.0
+
+    return inc
+
+
+def record_event(event: Dict[str, Any], now: Optional[float] = None) -> bool:
+    """Decay and update the user's profile (the session's until login) for one event."""
+    inc = features(event)
+    if not inc:
+        return False
+
+    args = [now or time.time(), HALF_LIFE, PROFILE_TTL]
+    for field, value in inc.items():
+        args.extend((field, value))
+
+    key = profile_key(session_id=event.get("session_id"), user_id=event.get("user_id"))
+    if key is None or key == "profile:session:unknown":
+        return False
+    _DECAY_AND_ADD(keys=[key], args=args)
+    return True
+
+
+def merge_session_into_user(session_id: str, user_id: int, now: Optional[float] = None) -> bool:
+    """
+    Move a session profile (decayed to now) into the user's profile.
+
+    The session hash is read and deleted atomically, so repeated logins
+    (or two workers racing) never add the same history twice.
+    """
+    session_key = profile_key(session_id=session_id)
+    if not session_key or not user_id:
+        return False
+
+    now = now or time.time()
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.hgetall(session_key)
+    pipe.delete(session_key)
+    raw, _ = pipe.execute()
+    if not raw:
+        return False
+
+    factor = math.pow(0.5, max(now - float(raw.get("updated_at", now)), 0) / HALF_LIFE)
+    args = [now, HALF_LIFE, PROFILE_TTL]
+    for field, value in raw.items():
+        if field != "updated_at":
+            args.extend((field, float(value) * factor))
+    _DECAY_AND_ADD(keys=[profile_key(user_id=user_id)], args=args)
+    return True
+
+# ============================================================
+# READ PATH (IN-PROCESS LRU OVER REDIS)
+# ============================================================
+
+class _LRU:
+    def __init__(self, size: int, ttl: float):
+        self.size, self.ttl = size, ttl
+        self.items: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            hit = self.items.get(key)
+            if hit is None or time.monotonic() - hit[0] > self.ttl:
+                return None
+            self.items.move_to_end(key)
+            return hit[1]
+
+    def put(self, key: str, value) -> None:
+        with self.lock:
+            self.items[key] = (time.monotonic(), value)
+            self.items.move_to_end(key)
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+
+
+_cache = _LRU(CACHE_SIZE, CACHE_SECONDS)
+
+
+def summarize(raw: Dict[str, str], now: Optional[float] = None) -> Dict[str, Any]:
+    """Profile dict (calculate_personalization_score shape) from a raw hash."""
+    if not raw:
+        return dict(EMPTY_PROFILE, weights={}, locations={})
+
+    now = now or time.time()
+    factor = math.pow(0.5, max(now - float(raw.get("updated_at", now)), 0) / HALF_LIFE)
+    values = {k: float(v) * factor for k, v in raw.items() if k != "updated_at"}
+
+    weights = {k[4:]: v for k, v in values.items() if k.startswith("svc:")}
+    locations = {k[4:]: v for k, v in values.items() if k.startswith("loc:")}
+    radius_n = values.get("radius_n", 0.0)
+
+    preferred = sorted((k for k, v in weights.items() if v >= MIN_SERVICE_WEIGHT), key=weights.get, reverse=True)
+    return {
+        "preferred_services": [SERVICE_LABELS.get(k, k) for k in preferred],
+        "preferred_locations": sorted(locations, key=locations.get, reverse=True)[:3],
+        "avg_search_radius": int(values.get("radius_sum", 0.0) / radius_n) if radius_n >= 0.01 else DEFAULT_RADIUS,
+        "engagement_score": round(min(values.get("engagement", 0.0) / 10.0, 1.0), 2),
+        "weights": weights,
+        "locations": locations,
+    }
+
+
+def get_profile(session_id: Optional[str] = None, user_id: Optional[int] = None) -> Dict[str, Any]:
+    """The user's profile, or the session's until the user profile has data."""
+    key = profile_key(session_id, user_id)
+    if key is None:
+        return summarize({})
+
+    profile = _cache.get(key)
+    if profile is None:
+        raw = redis_client.hgetall(key)
+        if not raw and user_id and session_id:
+            raw = redis_client.hgetall(profile_key(session_id=session_id))
+        profile = summarize(raw)
+        _cache.put(key, profile)
+    return profile
+
+# ============================================================
+# BATCH SCORING
+# ============================================================
+
+def _field(provider, name: str):
+    return provider.get(name) if isinstance(provider, dict) else getattr(provider, name, None)
+
+
+def score_providers(profile: Dict[str, Any], providers: Iterable[Any]) -> List[float]:
+    """
+    0..1 affinity of each provider (dict or ProviderRecord) to the profile,
+    in input order: services 60%, city 25%, distance within the usual
+    search radius 15%.
+    """
+    weights = profile.get("weights") or {}
+    locations = profile.get("locations") or {}
+    service_total = sum(weights.values()) or 1.0
+    top_location = max(locations.values(), default=0.0) or 1.0
+    radius = profile.get("avg_search_radius") or DEFAULT_RADIUS
+
+    scores = []
+    for provider in providers:
+        service = sum(weights.get(k, 0.0) for k in services_in(_field(provider, "services") or "")) / service_total
+        location = locations.get((_field(provider, "city") or "").strip(), 0.0) / top_location
+        distance = _field(provider, "distance_miles")
+        proximity = max(0.0, 1.0 - float(distance) / radius) if distance is not None else 0.0
+        scores.append(round(0.6 * min(service, 1.0) + 0.25 * location + 0.15 * proximity, 3))
+    return scores
@@ -12,7 +12,9 @@ from psycopg2.extras import RealDictCursor
 import time
 import json
 
-from db.connection import get_db
+from db.connection import READ, get_db
+from db.statements import execute, statement
+from app.services import provider_counters, search_demand
 from app.services.user_activity_service import log_event
 from app.utils.redis_client import redis_client  # ✅ centralized
 
@@ -73,44 +75,71 @@ ALLOWED_CONVERSION_EVENTS = {
 
 LOW_RESULT_THRESHOLD = 2  # <= this means underserved
 
+MAX_STATS_DAYS = 365
+
 # ============================================================
-# INTERNAL: COLUMN DETECTION (provider_stats + user_activity)
+# DASHBOARD SQL (CANONICAL SCHEMA, PREPARED ONCE PER CONNECTION)
 # ============================================================
-
-_PROVIDER_STATS_COLS: Optional[set] = None
-_USER_ACTIVITY_COLS: Optional[set] = None
-
-def _load_table_cols(table_name: str) -> set:
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute("""
-        SELECT column_name
-        FROM information_schema.columns
-        WHERE table_name = %s
-    """, (table_name,))
-    cols = {r["column_name"] for r in cur.fetchall()}
-    conn.close()
-    return cols
-
-def provider_stats_cols() -> set:
-    global _PROVIDER_STATS_COLS
-    if _PROVIDER_STATS_COLS is None:
-        _PROVIDER_STATS_COLS = _load_table_cols("provider_stats")
-    return _PROVIDER_STATS_COLS
-
-def user_activity_cols() -> set:
-    global _USER_ACTIVITY_COLS
-    if _USER_ACTIVITY_COLS is None:
-        _USER_ACTIVITY_COLS = _load_table_cols("user_activity")
-    return _USER_ACTIVITY_COLS
-
-def _activity_time_col() -> str:
-    cols = user_activity_cols()
-    if "timestamp" in cols:
-        return "timestamp"
-    if "created_at" in cols:
-        return "created_at"
-    return "timestamp"
+# Table shapes come from migrations/0003_canonical_analytics_tables.sql
+# and are checked once at startup (db/migrations.py: verify_schema), so
+# the SQL is fixed here instead of probing information_schema.
+
+PROVIDER_NAME = statement("analytics_provider_name", "SELECT name FROM providers WHERE id = %s")
+
+PROVIDER_STATS = statement("analytics_provider_stats", """
+    SELECT
+        views,
+        searches,
+        conversions,
+        phone_clicks,
+        website_clicks,
+        ROUND(conversions::numeric / NULLIF(views, 0) * 100, 2) AS conversion_rate,
+        last_event_at AS last_updated
+    FROM provider_stats
+    WHERE provider_id = %s
+""")
+
+PROVIDERS_TOP = statement("analytics_providers_top", """
+    SELECT
+        p.id,
+        p.name,
+        p.city,
+        p.state,
+        p.services,
+        ps.views,
+        ps.phone_clicks,
+        ps.website_clicks,
+        ps.conversions,
+        ROUND(ps.conversions::numeric / NULLIF(ps.views, 0) * 100, 2) AS conversion_rate,
+        ps.last_event_at
+    FROM provider_stats ps
+    JOIN providers p ON p.id = ps.provider_id
+    ORDER BY ps.views DESC, ps.conversions DESC
+    LIMIT %s
+""")
+
+EVENT_COUNTS = statement("analytics_event_counts", """
+    SELECT event_type, COUNT(*) AS count
+    FROM user_activity
+    WHERE timestamp >= %s
+    GROUP BY event_type
+""")
+
+SESSION_COUNT = statement("analytics_session_count", """
+    SELECT COUNT(DISTINCT session_id) AS sessions
+    FROM user_activity
+    WHERE timestamp >= %s
+""")
+
+EMPTY_STATS = {
+    "views": 0,
+    "searches": 0,
+    "conversions": 0,
+    "phone_clicks": 0,
+    "website_clicks": 0,
+    "conversion_rate": 0.0,
+    "last_updated": None,
+}
 
 # ============================================================
 # CLICK TRACKING (LEGACY + COMPATIBLE)
@@ -135,6 +164,7 @@ async def track_click(request: Request, event: ClickEvent):
         "state": request.headers.get("X-State", ""),
         "source": "click",
     })
+    provider_counters.record(event.provider_id, event_type)
 
     await log_event(
         request=request,
@@ -165,6 +195,7 @@ async def track_conversion(request: Request, payload: ConversionEvent):
         "source": "conversion",
         **(payload.metadata or {}),
     })
+    provider_counters.record(payload.provider_id, payload.event_type)
 
     await log_event(
         request=request,
@@ -231,75 +262,32 @@ async def track_search_result(request: Request, payload: SearchResultEvent):
 
 @router.get("/provider/{provider_id}/stats")
 async def get_provider_stats(provider_id: int, days: int = 30):
+    if days < 1 or days > MAX_STATS_DAYS:
+        raise HTTPException(400, f"days must be between 1 and {MAX_STATS_DAYS}")
+
     cache_key = f"analytics:provider:{provider_id}:stats:{days}"
     cached = cache_get(cache_key)
     if cached:
         return cached
 
-    pcols = provider_stats_cols()
-    tcol = _activity_time_col()
-    cutoff = datetime.now() - timedelta(days=days)
-
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute("SELECT name FROM providers WHERE id = %s", (provider_id,))
-    provider = cur.fetchone()
-    if not provider:
-        conn.close()
-        raise HTTPException(404, "Provider not found")
-
-    if {"total_views", "total_phone_clicks", "total_website_clicks"}.issubset(pcols):
-        cur.execute(f"""
-            SELECT
-                total_views AS views,
-                total_phone_clicks AS phone_clicks,
-                total_website_clicks AS website_clicks,
-                ROUND(
-                    (total_phone_clicks + total_website_clicks)::numeric
-                    / NULLIF(total_views, 0) * 100, 2
-                ) AS conversion_rate,
-                {("last_updated" if "last_updated" in pcols else "NULL")} AS last_updated
-            FROM provider_stats
-            WHERE provider_id = %s
-        """, (provider_id,))
-        stats_row = cur.fetchone() or {
-            "views": 0,
-            "phone_clicks": 0,
-            "website_clicks": 0,
-            "conversion_rate": 0.0,
-            "last_updated": None,
-        }
-    else:
-        cur.execute("""
-            SELECT views, searches, conversions, last_event_at
-            FROM provider_stats
-            WHERE provider_id = %s
-        """, (provider_id,))
-        row = cur.fetchone() or {}
-        views = int(row.get("views") or 0)
-        conversions = int(row.get("conversions") or 0)
-        stats_row = {
-            "views": views,
-            "phone_clicks": None,
-            "website_clicks": None,
-            "conversion_rate": round((conversions / views * 100), 2) if views else 0.0,
-            "last_updated": row.get("last_event_at"),
-            "searches": int(row.get("searches") or 0),
-            "conversions": conversions,
-        }
-
-    cur.execute(f"""
-        SELECT event_type, COUNT(*) AS count
-        FROM user_activity
-        WHERE provider_id = %s
-          AND {tcol} >= %s
-        GROUP BY event_type
-        ORDER BY count DESC
-    """, (provider_id, cutoff))
-    breakdown = cur.fetchall()
-
-    conn.close()
+    with get_db(READ) as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        execute(cur, PROVIDER_NAME, (provider_id,))
+        provider = cur.fetchone()
+        if not provider:
+            raise HTTPException(404, "Provider not found")
+
+        execute(cur, PROVIDER_STATS, (provider_id,))
+        stats_row = cur.fetchone() or EMPTY_STATS
+
+        # Live hourly counters (Redis) + compacted hours (provider_activity_hourly)
+        counts = provider_counters.window_counts(cur, provider_id, days)
+
+    breakdown = [
+        {"event_type": event_type, "count": count}
+        for event_type, count in sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
+    ]
 
     payload = {
         "provider_id": provider_id,
@@ -326,51 +314,10 @@ async def providers_top(limit: int = 25):
     if cached:
         return cached
 
-    pcols = provider_stats_cols()
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    if {"total_views", "total_phone_clicks", "total_website_clicks"}.issubset(pcols):
-        cur.execute("""
-            SELECT
-                p.id,
-                p.name,
-                p.city,
-                p.state,
-                p.services,
-                ps.total_views AS views,
-                ps.total_phone_clicks AS phone_clicks,
-                ps.total_website_clicks AS website_clicks,
-                ROUND(
-                    (ps.total_phone_clicks + ps.total_website_clicks)::numeric
-                    / NULLIF(ps.total_views, 0) * 100, 2
-                ) AS conversion_rate,
-                ps.last_updated
-            FROM provider_stats ps
-            JOIN providers p ON p.id = ps.provider_id
-            ORDER BY ps.total_views DESC, (ps.total_phone_clicks + ps.total_website_clicks) DESC
-            LIMIT %s
-        """, (limit,))
-    else:
-        cur.execute("""
-            SELECT
-                p.id,
-                p.name,
-                p.city,
-                p.state,
-                p.services,
-                ps.views,
-                ps.conversions,
-                ROUND(ps.conversions::numeric / NULLIF(ps.views, 0) * 100, 2) AS conversion_rate,
-                ps.last_event_at
-            FROM provider_stats ps
-            JOIN providers p ON p.id = ps.provider_id
-            ORDER BY ps.views DESC, ps.conversions DESC
-            LIMIT %s
-        """, (limit,))
-
-    rows = cur.fetchall()
-    conn.close()
+    with get_db(READ) as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        execute(cur, PROVIDERS_TOP, (limit,))
+        rows = cur.fetchall()
 
     payload = {"limit": limit, "items": rows}
     cache_set(cache_key, payload)
@@ -381,35 +328,41 @@ async def providers_top(limit: int = 25):
 # ============================================================
 
 @router.get("/unmet-demand")
-async def get_unmet_demand(days: int = 30):
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cutoff = datetime.now() - timedelta(days=days)
-    tcol = _activity_time_col()
-
-    cur.execute(f"""
-        SELECT
-            metadata->>'query' AS query,
-            metadata->>'city' AS city,
-            metadata->>'state' AS state,
-            COUNT(*) AS searches
-        FROM user_activity
-        WHERE event_type IN ('search_unmet', 'search_low_supply')
-          AND {tcol} >= %s
-        GROUP BY query, city, state
-        ORDER BY searches DESC
-        LIMIT 50
-    """, (cutoff,))
-
-    results = cur.fetchall()
-    conn.close()
-
-    return {"period_days": days, "hot_unmet_searches": results}
+async def get_unmet_demand(days: int = 30, limit: int = 50):
+    if limit < 1 or limit > 500:
+        raise HTTPException(400, "limit must be between 1 and 500")
+
+    cache_key = f"analytics:unmet_demand:{days}:{limit}"
+    cached = cache_get(cache_key)
+    if cached:
+        return cached
+
+    # Daily aggregates maintained by the analytics worker
+    with get_db(READ) as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        results = search_demand.top_demand(cur, days=days, limit=limit)
+
+    payload = {"period_days": days, "hot_unmet_searches": results}
+    cache_set(cache_key, payload)
+    return payload
 
 # ============================================================
 # SYSTEM OVERVIEW (EXISTING)
 # ============================================================
 
+def _overview(since: datetime) -> Dict[str, Any]:
+    with get_db(READ) as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+
+        execute(cur, EVENT_COUNTS, (since,))
+        events = {r["event_type"]: r["count"] for r in cur.fetchall()}
+
+        execute(cur, SESSION_COUNT, (since,))
+        sessions = cur.fetchone()["sessions"]
+
+    return {"sessions": sessions, "events": events}
+
+
 @router.get("/overview")
 async def get_overview(days: int = 7):
     cache_key = f"analytics:overview:{days}"
@@ -417,29 +370,7 @@ async def get_overview(days: int = 7):
     if cached:
         return cached
 
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cutoff = datetime.now() - timedelta(days=days)
-    tcol = _activity_time_col()
-
-    cur.execute(f"""
-        SELECT event_type, COUNT(*) AS count
-        FROM user_activity
-        WHERE {tcol} >= %s
-        GROUP BY event_type
-    """, (cutoff,))
-    events = {r["event_type"]: r["count"] for r in cur.fetchall()}
-
-    cur.execute(f"""
-        SELECT COUNT(DISTINCT session_id) AS sessions
-        FROM user_activity
-        WHERE {tcol} >= %s
-    """, (cutoff,))
-    sessions = cur.fetchone()["sessions"]
-
-    conn.close()
-
-    payload = {"period_days": days, "sessions": sessions, "events": events}
+    payload = {"period_days": days, **_overview(datetime.now() - timedelta(days=days))}
     cache_set(cache_key, payload)
     return payload
 
@@ -463,38 +394,16 @@ async def get_overview_window(window: str):
         raise HTTPException(400, "Invalid window")
 
     start = _window_start(window)
-    tcol = _activity_time_col()
     cache_key = f"analytics:overview:window:{window}"
 
     cached = cache_get(cache_key)
     if cached:
         return cached
 
-    conn = get_db()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-
-    cur.execute(f"""
-        SELECT event_type, COUNT(*) AS count
-        FROM user_activity
-        WHERE {tcol} >= %s
-        GROUP BY event_type
-    """, (start,))
-    events = {r["event_type"]: r["count"] for r in cur.fetchall()}
-
-    cur.execute(f"""
-        SELECT COUNT(DISTINCT session_id) AS sessions
-        FROM user_activity
-        WHERE {tcol} >= %s
-    """, (start,))
-    sessions = cur.fetchone()["sessions"]
-
-    conn.close()
-
     payload = {
         "window": window,
         "since": start.isoformat(),
-        "sessions": sessions,
-        "events": events,
+        **_overview(start),
     }
 
     cache_set(cache_key, payload)
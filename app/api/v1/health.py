@@ -2,12 +2,12 @@ from fastapi import APIRouter, HTTPException, Request
 import sentry_sdk
 from db.connection import get_db
 from app.utils.redis_client import redis_client
-from slowapi import Limiter
 from slowapi.util import get_remote_address
+from app.utils.rate_limit import TimedLimiter
 from psycopg2.extras import RealDictCursor
 
 router = APIRouter(tags=["health"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = TimedLimiter(key_func=get_remote_address)
 
 @router.get("/health")
 @limiter.limit("500/minute")
@@ -2,19 +2,60 @@ from fastapi import APIRouter, HTTPException, Request, Response
 from typing import List
 import json
 import time
-from contextlib import closing
 
-from psycopg2.extras import RealDictCursor
-
-from db.connection import get_db
-from schemas.provider import Provider
+from db.connection import READ, bind_session, get_db
+from db.statements import Statement, execute, statement
+from app.repositories.provider import PROVIDER_BY_ID
+from schemas.provider import PROVIDER_COLUMNS, Provider, ProviderRecord, provider_payload
 from app.utils.redis_client import redis_client
+from app.core.timing import TimedJSONResponse
 
-from app.services.user_activity_service import log_event
+from app.services import provider_counters
+from app.services.user_activity_service import device_fingerprint, log_event
 from analytics.intent_model import score_intent
 
 router = APIRouter(prefix="/providers", tags=["providers"])
 
+COLUMNS = ", ".join(PROVIDER_COLUMNS)
+
+SEARCH = statement("providers_search", f"""
+    SELECT {COLUMNS} FROM providers
+    WHERE name ILIKE %s OR city ILIKE %s OR services ILIKE %s
+    LIMIT %s
+""")
+
+NEARBY = statement("providers_nearby", f"""
+    SELECT {COLUMNS},
+           ROUND(
+               CAST(
+                   ST_Distance(
+                       location,
+                       ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
+                   ) / 1609.34 AS numeric
+               ), 2
+           ) AS distance_miles
+    FROM providers
+    WHERE location IS NOT NULL
+    AND ST_DWithin(
+        location,
+        ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
+        %s
+    )
+    ORDER BY distance_miles ASC
+""")
+
+
+def fetch_records(sql: str | Statement, params: tuple = ()) -> List[ProviderRecord]:
+    with get_db(READ) as conn:
+        cur = conn.cursor()
+        if isinstance(sql, Statement):
+            execute(cur, sql, params)
+        else:
+            cur.execute(sql, params)
+        rows = cur.fetchall()
+        cur.close()
+    return [ProviderRecord.from_tuple(row) for row in rows]
+
 
 def get_or_create_session(request: Request, response: Response) -> str:
     session_id = request.cookies.get("session_id")
@@ -22,16 +63,13 @@ def get_or_create_session(request: Request, response: Response) -> str:
         import uuid
         session_id = str(uuid.uuid4())
         response.set_cookie("session_id", session_id, max_age=60 * 60 * 24 * 365)
+    bind_session(session_id)
     return session_id
 
 
 def get_device_id(request: Request) -> str:
-    import uuid
-    ua = request.headers.get("user-agent", "")
-    accept = request.headers.get("accept", "")
-    ip = request.client.host if request.client else ""
-    raw = f"{ua}|{accept}|{ip}"
-    return uuid.uuid5(uuid.NAMESPACE_DNS, raw).hex
+    # Same fingerprint log_event stores on analytics_events_v2
+    return device_fingerprint(request)
 
 
 # -------------------------------------------------------------------
@@ -42,10 +80,7 @@ async def get_all_providers(request: Request, response: Response):
     session = get_or_create_session(request, response)
     device = get_device_id(request)
 
-    with get_db() as conn:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM providers ORDER BY id;")
-        rows = cur.fetchall()
+    rows = fetch_records(f"SELECT {COLUMNS} FROM providers ORDER BY id;")
 
     metadata = {"result_count": len(rows)}
     intent = score_intent("provider_list", metadata)
@@ -69,7 +104,7 @@ async def get_all_providers(request: Request, response: Response):
         },
     )
 
-    return rows
+    return TimedJSONResponse(provider_payload(rows))
 
 
 # -------------------------------------------------------------------
@@ -88,17 +123,7 @@ async def search_providers(
 
     term = f"%{query}%"
 
-    with closing(next(get_db())) as conn:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(
-            """
-            SELECT * FROM providers
-            WHERE name ILIKE %s OR city ILIKE %s OR services ILIKE %s
-            LIMIT %s;
-            """,
-            (term, term, term, limit),
-        )
-        rows = cur.fetchall()
+    rows = fetch_records(SEARCH, (term, term, term, limit))
 
     ms = int((time.time() - start) * 1000)
 
@@ -125,7 +150,7 @@ async def search_providers(
         },
     )
 
-    return rows
+    return TimedJSONResponse(provider_payload(rows))
 
 
 # -------------------------------------------------------------------
@@ -143,43 +168,23 @@ async def nearby_providers(
     device = get_device_id(request)
     start = time.time()
 
-    cache_key = f"nearby:{lat}:{lon}:{radius}"
+    # v2: positional rows. The unversioned key holds dict rows (written by
+    # app/main.py and by workers from before the change).
+    cache_key = f"nearby:v2:{lat}:{lon}:{radius}"
     cached = redis_client.get(cache_key)
 
     if cached:
-        return json.loads(cached)
+        try:
+            return TimedJSONResponse(provider_payload([ProviderRecord.from_tuple(r) for r in json.loads(cached)]))
+        except Exception:
+            pass  # unreadable entry: fall through to the query and overwrite it
 
     radius_meters = radius * 1609.34
 
-    with get_db() as conn:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(
-            """
-            SELECT id, name, phone, email, website, street, city, state, zip,
-                   full_address, latitude, longitude, services,
-                   ROUND(
-                       CAST(
-                           ST_Distance(
-                               location,
-                               ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
-                           ) / 1609.34 AS numeric
-                       ), 2
-                   ) AS distance_miles
-            FROM providers
-            WHERE location IS NOT NULL
-            AND ST_DWithin(
-                location,
-                ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
-                %s
-            )
-            ORDER BY distance_miles ASC;
-            """,
-            (lon, lat, lon, lat, radius_meters),
-        )
-
-        rows = cur.fetchall()
+    rows = fetch_records(NEARBY, (lon, lat, lon, lat, radius_meters))
 
-    redis_client.setex(cache_key, 3600, json.dumps(rows, default=str))
+    # Positional rows: the cached set carries no repeated keys
+    redis_client.setex(cache_key, 3600, json.dumps([r.to_row() for r in rows], separators=(",", ":")))
 
     metadata = {
         "lat": lat,
@@ -192,7 +197,7 @@ async def nearby_providers(
 
     await log_event(request, "nearby_search", metadata, intent, source="map")
 
-    return rows
+    return TimedJSONResponse(provider_payload(rows))
 
 
 # -------------------------------------------------------------------
@@ -207,10 +212,8 @@ async def get_provider_by_id(
     session = get_or_create_session(request, response)
     device = get_device_id(request)
 
-    with closing(next(get_db())) as conn:
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM providers WHERE id = %s;", (provider_id,))
-        row = cur.fetchone()
+    rows = fetch_records(PROVIDER_BY_ID, (provider_id,))
+    row = rows[0] if rows else None
 
     if not row:
         raise HTTPException(status_code=404, detail="Provider not found")
@@ -236,5 +239,6 @@ async def get_provider_by_id(
             "ts": int(time.time()),
         },
     )
+    provider_counters.record(provider_id, "provider_view")
 
-    return row
+    return TimedJSONResponse(row.as_dict())
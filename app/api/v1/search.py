@@ -5,20 +5,21 @@ from typing import List
 import json
 import hashlib
 
-from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from schemas.provider import Provider
+from schemas.provider import Provider, ProviderRecord, provider_payload
 from app.services.search import SearchService
 from app.core.dependencies import get_search_service
 from app.utils.redis_client import redis_client
+from app.utils.rate_limit import TimedLimiter
+from app.core.timing import TimedJSONResponse
 
 # 🔹 Analytics (UNMET DEMAND + SEARCH INTELLIGENCE)
 from app.api.v1.analytics import track_search_result, SearchResultEvent
 
 
 router = APIRouter(prefix="/search", tags=["search"])
-limiter = Limiter(key_func=get_remote_address)
+limiter = TimedLimiter(key_func=get_remote_address)
 
 # ============================================================
 # REDIS SEARCH CACHE HELPERS (READ-THROUGH, FAIL-SAFE)
@@ -31,13 +32,15 @@ def _cache_key(prefix: str, payload: dict) -> str:
     digest = hashlib.sha256(raw.encode()).hexdigest()
     return f"{prefix}:{digest}"
 
+# Results are cached as positional rows (no repeated keys per provider)
+
 def cache_get(prefix: str, payload: dict):
     try:
         key = _cache_key(prefix, payload)
         val = redis_client.get(key)
         if not val:
             return None
-        return json.loads(val)
+        return [ProviderRecord.from_tuple(row) for row in json.loads(val)]
     except Exception:
         return None
 
@@ -47,7 +50,7 @@ def cache_set(prefix: str, payload: dict, results):
         redis_client.setex(
             key,
             SEARCH_CACHE_TTL,
-            json.dumps(results, default=str),
+            json.dumps([r.to_row() for r in results], separators=(",", ":")),
         )
     except Exception:
         pass
@@ -94,7 +97,7 @@ async def basic(
         )
     )
 
-    return results
+    return TimedJSONResponse(provider_payload(results))
 
 
 # ============================================================
@@ -138,7 +141,7 @@ async def fuzzy(
         )
     )
 
-    return results
+    return TimedJSONResponse(provider_payload(results))
 
 
 # ============================================================
@@ -190,4 +193,4 @@ async def nearby(
         )
     )
 
-    return results
+    return TimedJSONResponse(provider_payload(results))
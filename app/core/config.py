@@ -18,6 +18,7 @@ class Settings(BaseSettings):
     ANALYTICS_SALT: str = "CHANGE_ME"
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "AUTIZIM Provider API"
+    PROVIDER_CATALOG_PATH: str = "data/provider_catalog.bin"
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,19 +1,9 @@
-from sqlalchemy import create_engine
-from sqlalchemy.pool import QueuePool
-from app.core.config import get_settings
+from db.connection import WRITE, acquire
 
+# The engines and their pools live in db/connection.py: one pool per
+# server per process, sized from WEB_CONCURRENCY and the max_connections
+# budget. Pass READ to allow a read replica.
 
-settings = get_settings()
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=20,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=3600,
-    pool_pre_ping=True
-)
-
-def get_db():
-    return engine.raw_connection()
+def get_db(intent: str = WRITE):
+    return acquire(intent)
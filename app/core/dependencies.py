@@ -1,6 +1,8 @@
 from functools import lru_cache
 
+from app.core.config import get_settings
 from app.repositories.provider import ProviderRepository
+from app.services.catalog import CatalogHandle
 from app.services.search import SearchService
 from app.services.cache import CacheService
 
@@ -23,9 +25,15 @@ def get_cache_service() -> CacheService:
     return CacheService()
 
 
+@lru_cache()
+def get_catalog() -> CatalogHandle:
+    return CatalogHandle(get_settings().PROVIDER_CATALOG_PATH)
+
+
 @lru_cache()
 def get_search_service() -> SearchService:
     return SearchService(
         repo=get_provider_repo(),
         cache=get_cache_service(),
+        catalog=get_catalog(),
     )
@@ -0,0 +1,223 @@
+"""
+Observability Bootstrap - One place to configure Sentry
+Location: app/core/observability.py
+
+Replaces the import-time `traces_sample_rate=1.0, profiles_sample_rate=1.0`
+setup (every request traced and profiled) with:
+
+- traces_sampler: head sampling by endpoint. Health/metrics are never
+  traced, hot endpoints (search, nearby, provider view) at a low rate,
+  everything else at the default rate. Upstream decisions are honoured.
+- slow / error requests are always reported: sampled ones are kept as
+  transactions; unsampled ones produce a throttled "slow request" event
+  carrying the Server-Timing breakdown (see app/core/timing.py).
+- profiling on demand: profiles_sampler reads a rate from Redis
+  (`observability:profiles_rate`, set with a TTL so it switches itself
+  off), cached for a few seconds. Default: no profiling.
+
+Environment:
+    SENTRY_DSN                    unset = Sentry disabled
+    ENVIRONMENT                   default "production"
+    SENTRY_TRACES_RATE            default 0.05
+    SENTRY_TRACES_HOT_RATE        default 0.005
+    SENTRY_SLOW_REQUEST_MS        default 1000
+    SENTRY_PROFILES_RATE          default 0 (overridden by the Redis toggle)
+    SENTRY_SEND_PII               default "true"
+
+Toggle profiling at runtime:
+    python -m scripts.profiling on --rate 0.25 --minutes 15
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import sentry_sdk
+from sentry_sdk.integrations.fastapi import FastApiIntegration
+from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
+from sentry_sdk.integrations.starlette import StarletteIntegration
+
+from app.core import timing
+
+PROFILES_RATE_KEY = "observability:profiles_rate"
+
+# Path prefix -> head sampling rate class
+NEVER_TRACED = ("/health", "/metrics", "/favicon.ico")
+HOT_PATHS = (
+    "/providers/search",
+    "/providers/search_fuzzy",
+    "/providers/nearby",
+    "/search/",
+    "/analytics/track/",
+)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+# ============================================================
+# SAMPLING POLICY
+# ============================================================
+
+@dataclass
+class SamplingPolicy:
+    default_rate: float = 0.05
+    hot_rate: float = 0.005
+    slow_ms: float = 1000.0
+    never: Tuple[str, ...] = NEVER_TRACED
+    hot: Tuple[str, ...] = HOT_PATHS
+    overrides: Dict[str, float] = field(default_factory=dict)   # exact path -> rate
+
+    @classmethod
+    def from_env(cls) -> "SamplingPolicy":
+        return cls(
+            default_rate=_env_float("SENTRY_TRACES_RATE", 0.05),
+            hot_rate=_env_float("SENTRY_TRACES_HOT_RATE", 0.005),
+            slow_ms=_env_float("SENTRY_SLOW_REQUEST_MS", 1000.0),
+        )
+
+    def rate_for(self, path: str) -> float:
+        if path in self.overrides:
+            return self.overrides[path]
+        if path.startswith(self.never):
+            return 0.0
+        if path.startswith(self.hot) or (path.startswith("/providers/") and path.rstrip("/").split("/")[-1].isdigit()):
+            return self.hot_rate
+        return self.default_rate
+
+    def traces_sampler(self, sampling_context: Dict[str, Any]) -> float:
+        parent = sampling_context.get("parent_sampled")
+        if parent is not None:
+            return float(parent)
+        scope = sampling_context.get("asgi_scope") or {}
+        if scope.get("type") not in (None, "http"):
+            return 0.0
+        return self.rate_for(scope.get("path", ""))
+
+# ============================================================
+# PROFILING TOGGLE
+# ============================================================
+
+class ProfilingToggle:
+    """Profiles sample rate from Redis, re-read at most every `ttl` seconds."""
+
+    def __init__(self, default_rate: float = 0.0, ttl: float = 10.0):
+        self.default_rate = default_rate
+        self.ttl = ttl
+        self._rate = default_rate
+        self._read_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read(self) -> float:
+        from app.utils.redis_client import redis_client
+
+        try:
+            value = redis_client.get(PROFILES_RATE_KEY)
+            return min(max(float(value), 0.0), 1.0) if value is not None else self.default_rate
+        except Exception:
+            return self.default_rate
+
+    def rate(self) -> float:
+        now = time.monotonic()
+        if now - self._read_at >= self.ttl and self._lock.acquire(blocking=False):
+            try:
+                self._read_at = now
+                self._rate = self._read()
+            finally:
+                self._lock.release()
+        return self._rate
+
+    def profiles_sampler(self, sampling_context: Dict[str, Any]) -> float:
+        return self.rate()
+
+
+def set_profiling(rate: float, minutes: float) -> None:
+    """Turn profiling on for `minutes` (rate 0 turns it off)."""
+    from app.utils.redis_client import redis_client
+
+    if rate <= 0:
+        redis_client.delete(PROFILES_RATE_KEY)
+    else:
+        redis_client.setex(PROFILES_RATE_KEY, int(minutes * 60), min(rate, 1.0))
+
+# ============================================================
+# SLOW / ERROR REQUESTS
+# ============================================================
+
+class SlowRequestReporter:
+    """
+    Timing listener: reports slow or 5xx requests that were not traced,
+    at most once per route per `interval` seconds.
+    """
+
+    def __init__(self, slow_ms: float, interval: float = 60.0):
+        self.slow_ms = slow_ms
+        self.interval = interval
+        self._last: Dict[str, float] = {}
+
+    def __call__(self, method: str, route: str, status: int, seconds: float, timings) -> None:
+        slow = seconds * 1000 >= self.slow_ms
+        if not slow and status < 500:
+            return
+
+        span = sentry_sdk.Hub.current.scope.span
+        if span is not None and span.sampled:
+            return  # already captured as a transaction
+
+        key = f"{method} {route}"
+        now = time.monotonic()
+        if now - self._last.get(key, 0.0) < self.interval:
+            return
+        self._last[key] = now
+
+        with sentry_sdk.push_scope() as scope:
+            scope.set_tag("route", route)
+            scope.set_tag("status", status)
+            scope.set_context("server_timing", {"breakdown": timings.header(seconds)})
+            kind = "Slow request" if slow else "Server error"
+            sentry_sdk.capture_message(f"{kind}: {key} {seconds * 1000:.0f}ms", level="warning")
+
+# ============================================================
+# BOOTSTRAP
+# ============================================================
+
+_initialized = False
+
+
+def init_observability(dsn: Optional[str] = None, policy: Optional[SamplingPolicy] = None, **overrides) -> bool:
+    """
+    Configure Sentry once per process. Returns False when no DSN is set.
+    Keyword overrides are passed to sentry_sdk.init (benchmarks, tests).
+    """
+    global _initialized
+    if _initialized:
+        return True
+
+    dsn = dsn or os.getenv("SENTRY_DSN")
+    if not dsn:
+        print("⚠ Sentry DSN not found - error tracking disabled")
+        return False
+
+    policy = policy or SamplingPolicy.from_env()
+    toggle = ProfilingToggle(default_rate=_env_float("SENTRY_PROFILES_RATE", 0.0))
+
+    options = dict(
+        dsn=dsn,
+        integrations=[StarletteIntegration(), FastApiIntegration(), SqlalchemyIntegration()],
+        traces_sampler=policy.traces_sampler,
+        profiles_sampler=toggle.profiles_sampler,
+        send_default_pii=os.getenv("SENTRY_SEND_PII", "true").lower() == "true",
+        environment=os.getenv("ENVIRONMENT", "production"),
+    )
+    options.update(overrides)
+    sentry_sdk.init(**options)
+
+    timing.add_listener(SlowRequestReporter(policy.slow_ms))
+    _initialized = True
+    print("✓ Sentry initialized")
+    return True
@@ -0,0 +1,297 @@
+"""
+Request Timing - Per-request latency breakdown + Prometheus metrics
+Location: app/core/timing.py
+
+TimingMiddleware opens a RequestTimings for every HTTP request; code on
+the request path wraps work in span("name") (or @timed("name")). Each
+millisecond is attributed once: a span inside another span counts
+towards the outer one only, so log_event's own INSERT shows up as
+log_event, not as db_query.
+
+Span names used by the app:
+    rate_limit   slowapi limit check
+    cache        Redis GET/SET/SETEX
+    xadd         Redis XADD (analytics stream)
+    redis        any other Redis command
+    db_acquire   pool checkout (incl. new connects)
+    db_query     cursor execute + fetch
+    log_event    analytics INSERT inside the request
+    serialize    JSON rendering of the response body
+
+The breakdown is sent back as a Server-Timing header and aggregated into
+histograms served by /metrics (Prometheus text format, per process).
+"""
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+# ============================================================
+# METRICS REGISTRY (PROMETHEUS TEXT FORMAT)
+# ============================================================
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # bucket counts..., +Inf count, sum
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for labels, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {int(count)}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, inf)} {int(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {int(series[-2])}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]:.6f}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Gauge:
+    """Values read at scrape time from callbacks (e.g. pool checked-out count)."""
+
+    def __init__(self, name: str, help: str, fn: Optional[Callable[[], float]] = None, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._fns: Dict[Tuple[str, ...], Callable[[], float]] = {}
+        if fn is not None:
+            self._fns[()] = fn
+
+    def track(self, fn: Callable[[], float], *labels: str) -> "Gauge":
+        self._fns[labels] = fn
+        return self
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, fn in sorted(self._fns.items()):
+            try:
+                value = float(fn())
+            except Exception:
+                value = math.nan
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def register(self, metric):
+        """Idempotent by name, so module reloads do not duplicate series."""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Request latency", ("method", "route", "status"),
+))
+SPAN_SECONDS = REGISTRY.register(Histogram(
+    "http_request_span_seconds", "Time per request-path stage", ("route", "span"),
+))
+
+# ============================================================
+# SPANS
+# ============================================================
+
+class RequestTimings:
+    __slots__ = ("start", "spans", "depth")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}   # name -> [seconds, count]
+        self.depth = 0
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self, total: Optional[float] = None) -> str:
+        parts = [f"{name};dur={sec * 1000:.2f}" for name, (sec, _) in self.spans.items()]
+        total = time.perf_counter() - self.start if total is None else total
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Attribute the enclosed time to `name` (outermost span wins)."""
+    timings = _current.get()
+    if timings is None or timings.depth:
+        yield
+        return
+    timings.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.depth -= 1
+        timings.add(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator form of span() for sync and async functions."""
+
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse whose body rendering is recorded as the serialize span."""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialize"):
+            return super().render(content)
+
+# ============================================================
+# MIDDLEWARE
+# ============================================================
+
+# Called after every timed request: fn(method, route, status, seconds, timings)
+_listeners: List[Callable[..., None]] = []
+
+
+def add_listener(fn: Callable[..., None]) -> None:
+    _listeners.append(fn)
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead).
+
+    Adds Server-Timing to every HTTP response and feeds the histograms.
+    Paths in `skip` (e.g. /metrics) are passed through untimed.
+    """
+
+    def __init__(self, app, skip: Tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.skip = skip
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.header().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - timings.start
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(total, scope["method"], template, str(status["code"]))
+            for name, (seconds, _) in timings.spans.items():
+                SPAN_SECONDS.observe(seconds, template, name)
+            for listener in _listeners:
+                try:
+                    listener(scope["method"], template, status["code"], total, timings)
+                except Exception:
+                    pass
+
+
+def metrics_text() -> str:
+    return REGISTRY.render()
@@ -5,7 +5,7 @@
 
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse
 from typing import List, Optional
 import json
 import time
@@ -16,11 +16,9 @@ import os
 from dotenv import load_dotenv
 from psycopg2.extras import RealDictCursor
 import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 
 # ✅ SECURITY - Rate limiting
-from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
@@ -29,13 +27,25 @@ from slowapi.errors import RateLimitExceeded
 # ============================================================
 
 # DB
-from db.connection import get_db, engine
+from db.connection import READ, bind_session, get_db
+from db.migrations import SchemaError, verify_schema
+from db.statements import execute, statement
+from app.repositories.provider import PROVIDER_BY_ID
 
 # Redis
 from app.utils.redis_client import redis_client
+from app.utils.rate_limit import TimedLimiter
+
+# Request timing (Server-Timing + /metrics)
+from app.core.timing import TimedJSONResponse, TimingMiddleware, metrics_text
+from app.core.observability import init_observability
+
+# Provider schema (single canonical definition)
+from schemas.provider import PROVIDER_COLUMNS, Provider
 
 # Analytics / Services
-from app.services.user_activity_service import log_event
+from app.services import provider_counters
+from app.services.user_activity_service import device_fingerprint, log_event
 from analytics.intent_model import score_intent
 from analytics.identity_stitching import merge_anonymous_history_into_user
 from analytics.personalization_engine import calculate_personalization_score
@@ -52,21 +62,19 @@ SECRET_ANALYTICS_SALT = os.getenv("ANALYTICS_SALT", "CHANGE_ME_SALT")
 # ============================================================
 # SENTRY INIT
 # ============================================================
-sentry_sdk.init(
-    dsn=os.getenv("SENTRY_DSN"),
-    integrations=[FastApiIntegration(), SqlalchemyIntegration()],
-    traces_sample_rate=1.0,
-    profiles_sample_rate=1.0,
-    send_default_pii=True,
-)
+# Endpoint-based trace sampling, profiling on demand (app/core/observability.py)
+init_observability()
 
 # ============================================================
 # FASTAPI APP + RATE LIMITING
 # ============================================================
-app = FastAPI(title="AUTIZIM Backend – Phase 2C (Protected)")
+app = FastAPI(
+    title="AUTIZIM Backend – Phase 2C (Protected)",
+    default_response_class=TimedJSONResponse,
+)
 
 # ✅ SECURITY - Redis-backed rate limiter (persists across restarts)
-limiter = Limiter(
+limiter = TimedLimiter(
     key_func=get_remote_address,
     storage_uri=os.getenv("REDIS_URL", "redis://localhost:6379")
 )
@@ -84,12 +92,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ============================================================
+# REQUEST TIMING (outermost: sees the whole request)
+# ============================================================
+app.add_middleware(TimingMiddleware)
+
 # ============================================================
 # REGISTER ROUTERS
 # ============================================================
 app.include_router(analytics_router)
 app.include_router(api_router)
 
+# ============================================================
+# SCHEMA CHECK (migrations/ + db/migrations.py)
+# ============================================================
+# SCHEMA_CHECK=strict refuses to start against an unmigrated database,
+# warn only logs, off skips. An unreachable DB never blocks startup
+# (/health reports it).
+@app.on_event("startup")
+def check_schema():
+    mode = os.getenv("SCHEMA_CHECK", "strict").lower()
+    if mode == "off":
+        return
+    try:
+        with get_db() as conn:
+            verify_schema(conn)
+    except SchemaError as e:
+        if mode == "strict":
+            raise
+        print(f"⚠️ {e}")
+    except Exception as e:
+        print(f"⚠️ Schema check skipped: {e}")
+    else:
+        print("✓ Schema check passed")
+
 # ============================================================
 # SESSION + DEVICE HELPERS
 # ============================================================
@@ -98,15 +134,13 @@ def get_or_create_session(request: Request, response: Response) -> str:
     if not session_id:
         session_id = str(uuid.uuid4())
         response.set_cookie("session_id", session_id, max_age=60 * 60 * 24 * 365)
+    bind_session(session_id)
     return session_id
 
 
 def get_device_id(request: Request) -> str:
-    ua = request.headers.get("user-agent", "")
-    accept = request.headers.get("accept", "")
-    ip = request.client.host if request.client else ""
-    raw = f"{ua}|{accept}|{ip}"
-    return uuid.uuid5(uuid.NAMESPACE_DNS, raw).hex
+    # Same fingerprint log_event stores on analytics_events_v2
+    return device_fingerprint(request)
 
 
 def hash_ip(ip: str) -> Optional[str]:
@@ -114,25 +148,6 @@ def hash_ip(ip: str) -> Optional[str]:
         return None
     return hashlib.sha256((ip + SECRET_ANALYTICS_SALT).encode()).hexdigest()
 
-# ============================================================
-# PROVIDER MODEL
-# ============================================================
-class Provider(BaseModel):
-    id: int
-    name: str
-    phone: Optional[str]
-    email: Optional[str]
-    website: Optional[str]
-    street: Optional[str]
-    city: Optional[str]
-    state: Optional[str]
-    zip: Optional[str]
-    full_address: Optional[str]
-    latitude: Optional[float]
-    longitude: Optional[float]
-    services: Optional[str]
-    distance_miles: Optional[float] = None
-
 # ============================================================
 # ROOT ROUTE
 # ============================================================
@@ -174,6 +189,30 @@ async def honeypot(request: Request):
 # ============================================================
 # BASIC SEARCH (MVP-SCOPED FREE TEXT SEARCH)
 # ============================================================
+# ✅ MVP-SCOPED SEARCH (INTENT-FOCUSED), prepared once per connection
+SEARCH = statement("main_search", """
+    SELECT
+        id,
+        name,
+        services,
+        street,
+        city,
+        state,
+        zip,
+        phone,
+        website,
+        latitude,
+        longitude
+    FROM providers
+    WHERE
+        services ILIKE %s
+     OR name ILIKE %s
+     OR city ILIKE %s
+     OR state ILIKE %s
+     OR zip ILIKE %s
+    LIMIT %s
+""")
+
 @app.get("/providers/search", response_model=List[Provider])
 @limiter.limit("30/minute")
 async def search(request: Request, response: Response, query: str, limit: int = 50):
@@ -193,33 +232,10 @@ async def search(request: Request, response: Response, query: str, limit: int =
     limit = min(limit, 50)
     start = time.time()
 
-    with get_db() as conn:
+    with get_db(READ) as conn:
         cur = conn.cursor(cursor_factory=RealDictCursor)
         term = f"%{query}%"
-        
-        # ✅ MVP-SCOPED SEARCH (INTENT-FOCUSED)
-        cur.execute("""
-            SELECT
-                id,
-                name,
-                services,
-                street,
-                city,
-                state,
-                zip,
-                phone,
-                website,
-                latitude,
-                longitude
-            FROM providers
-            WHERE
-                services ILIKE %s
-             OR name ILIKE %s
-             OR city ILIKE %s
-             OR state ILIKE %s
-             OR zip ILIKE %s
-            LIMIT %s;
-        """, (term, term, term, term, term, limit))
+        execute(cur, SEARCH, (term, term, term, term, term, limit))
 
         rows = cur.fetchall()
         cur.close()
@@ -251,6 +267,17 @@ async def search(request: Request, response: Response, query: str, limit: int =
 # ============================================================
 # FUZZY SEARCH (Rate limited)
 # ============================================================
+SEARCH_FUZZY = statement("main_search_fuzzy", f"""
+    SELECT {", ".join(PROVIDER_COLUMNS)},
+    greatest(similarity(name, %s),
+             similarity(city, %s),
+             similarity(services, %s)) AS score
+    FROM providers
+    WHERE name %% %s OR city %% %s OR services %% %s
+    ORDER BY score DESC
+    LIMIT %s
+""")
+
 @app.get("/providers/search_fuzzy", response_model=List[Provider])
 @limiter.limit("30/minute")
 async def search_fuzzy(request: Request, response: Response, q: str, limit: int = 50):
@@ -259,19 +286,10 @@ async def search_fuzzy(request: Request, response: Response, q: str, limit: int
     device = get_device_id(request)
     start = time.time()
 
-    with get_db() as conn:
+    with get_db(READ) as conn:
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
-        cur.execute("""
-            SELECT *,
-            greatest(similarity(name, %s),
-                     similarity(city, %s),
-                     similarity(services, %s)) AS score
-            FROM providers
-            WHERE name % %s OR city % %s OR services % %s
-            ORDER BY score DESC
-            LIMIT %s;
-        """, (q, q, q, q, q, q, limit))
+        execute(cur, SEARCH_FUZZY, (q, q, q, q, q, q, limit))
 
         rows = cur.fetchall()
         cur.close()
@@ -303,6 +321,27 @@ async def search_fuzzy(request: Request, response: Response, q: str, limit: int
 # ============================================================
 # NEARBY PROVIDERS (Rate limited)
 # ============================================================
+NEARBY = statement("main_nearby", """
+    SELECT id, name, phone, email, website, street, city, state, zip,
+           full_address, latitude, longitude, services,
+           ROUND(
+               CAST(
+                   ST_Distance(
+                       location,
+                       ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
+                   ) / 1609.34 AS numeric
+               ), 2
+           ) AS distance_miles
+    FROM providers
+    WHERE location IS NOT NULL
+    AND ST_DWithin(
+            location,
+            ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
+            %s
+    )
+    ORDER BY distance_miles ASC
+""")
+
 @app.get("/providers/nearby", response_model=List[Provider])
 @limiter.limit("60/minute")
 async def nearby(request: Request, response: Response, lat: float, lon: float, radius: int = 25):
@@ -342,30 +381,11 @@ async def nearby(request: Request, response: Response, lat: float, lon: float, r
 
         return rows
         
-    with get_db() as conn:
+    with get_db(READ) as conn:
         cur = conn.cursor(cursor_factory=RealDictCursor)
         radius_meters = radius * 1609.34
 
-        cur.execute("""
-            SELECT id, name, phone, email, website, street, city, state, zip,
-                   full_address, latitude, longitude, services,
-                   ROUND(
-                       CAST(
-                           ST_Distance(
-                               location,
-                               ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
-                           ) / 1609.34 AS numeric
-                       ), 2
-                   ) AS distance_miles
-            FROM providers
-            WHERE location IS NOT NULL
-            AND ST_DWithin(
-                    location,
-                    ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
-                    %s
-            )
-            ORDER BY distance_miles ASC;
-        """, (lon, lat, lon, lat, radius_meters))
+        execute(cur, NEARBY, (lon, lat, lon, lat, radius_meters))
 
         rows = cur.fetchall()
         cur.close()
@@ -411,9 +431,9 @@ async def get_provider(request: Request, response: Response, provider_id: int):
     session = get_or_create_session(request, response)
     device = get_device_id(request)
 
-    with get_db() as conn:
+    with get_db(READ) as conn:
         cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM providers WHERE id = %s;", (provider_id,))
+        execute(cur, PROVIDER_BY_ID, (provider_id,))
         row = cur.fetchone()
         cur.close()
 
@@ -438,6 +458,7 @@ async def get_provider(request: Request, response: Response, provider_id: int):
         "device_id": device,
         "ts": int(time.time())
     })
+    provider_counters.record(provider_id, "provider_view")
 
     return row
 
@@ -458,6 +479,13 @@ async def health():
         sentry_sdk.capture_exception(e)
         raise HTTPException(503, f"Health check failed: {e}")
 
+# ============================================================
+# METRICS (Prometheus text format, per worker process)
+# ============================================================
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(metrics_text(), media_type="text/plain; version=0.0.4")
+
 # ============================================================
 # SENTRY DEBUG
 # ============================================================
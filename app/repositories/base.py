@@ -1,4 +1,5 @@
-from app.core.database import get_db
+from db.connection import READ, get_db
+from db.statements import Statement, execute as execute_statement
 from psycopg2.extras import RealDictCursor
 
 
@@ -9,30 +10,36 @@ class BaseRepository:
     Guarantees:
     - fetchall() returns List[Dict]
     - fetchone() returns Dict | None
+    - fetchrows() returns List[tuple] (no per-row dict; for hot paths)
+    - a db.statements.Statement may be passed instead of SQL text and
+      runs as a prepared statement
+    - each call checks a connection out for `intent` and returns it, so
+      one repository instance is safe to share across requests
     """
 
-    def __init__(self):
-        self._conn = None
-
-    def get_connection(self):
-        if self._conn is None:
-            self._conn = get_db()
-        return self._conn
-
-    def execute(self, query: str, params: tuple | None = None):
-        conn = self.get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(query, params or ())
-        return cur
-
-    def fetchall(self, query: str, params: tuple | None = None):
-        cur = self.execute(query, params)
-        rows = cur.fetchall()
-        cur.close()
-        return rows
-
-    def fetchone(self, query: str, params: tuple | None = None):
-        cur = self.execute(query, params)
-        row = cur.fetchone()
-        cur.close()
-        return row
+    intent = READ   # repositories that write override with db.connection.WRITE
+
+    @staticmethod
+    def _run(cur, query: str | Statement, params: tuple | None):
+        if isinstance(query, Statement):
+            execute_statement(cur, query, params or ())
+        else:
+            cur.execute(query, params or ())
+
+    def _fetch(self, query: str | Statement, params: tuple | None, cursor_factory=None, one: bool = False):
+        with get_db(self.intent) as conn:
+            cur = conn.cursor(cursor_factory=cursor_factory) if cursor_factory else conn.cursor()
+            try:
+                self._run(cur, query, params)
+                return cur.fetchone() if one else cur.fetchall()
+            finally:
+                cur.close()
+
+    def fetchall(self, query: str | Statement, params: tuple | None = None):
+        return self._fetch(query, params, RealDictCursor)
+
+    def fetchrows(self, query: str | Statement, params: tuple | None = None):
+        return self._fetch(query, params)
+
+    def fetchone(self, query: str | Statement, params: tuple | None = None):
+        return self._fetch(query, params, RealDictCursor, one=True)
@@ -1,33 +1,66 @@
+from typing import List
+
 from app.repositories.base import BaseRepository
-from schemas.provider import Provider
+from db.statements import statement
+from schemas.provider import PROVIDER_COLUMNS, ProviderRecord
+
+_COLUMNS = ", ".join(PROVIDER_COLUMNS)
+
+# Hot lookups run as prepared statements (db/statements.py)
+
+SEARCH_BASIC = statement("repo_search_basic", f"""
+    SELECT {_COLUMNS}
+    FROM providers
+    WHERE name ILIKE %s
+    ORDER BY name
+    LIMIT %s
+""")
+
+SEARCH_FUZZY = statement("repo_search_fuzzy", f"""
+    SELECT {_COLUMNS}
+    FROM providers
+    WHERE similarity(name, %s) > 0.3
+    ORDER BY similarity(name, %s) DESC
+    LIMIT %s
+""")
+
+SEARCH_NEARBY = statement("repo_search_nearby", f"""
+    SELECT {_COLUMNS},
+           ROUND(
+               (ST_Distance(
+                   location::geography,
+                   ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
+               ) / 1609.34)::numeric, 2
+           )::float8 AS distance_miles
+    FROM providers
+    WHERE location IS NOT NULL
+      AND ST_DWithin(
+            location::geography,
+            ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
+            %s
+      )
+    ORDER BY distance_miles
+    LIMIT %s
+""")
+
+PROVIDER_BY_ID = statement("provider_by_id", f"SELECT {_COLUMNS} FROM providers WHERE id = %s")
 
 
 class ProviderRepository(BaseRepository):
     """
     Repository for provider search queries.
+
+    Selects the canonical columns explicitly and returns ProviderRecord
+    rows; conversion to the API shape happens in the route.
     """
 
-    def search_basic(self, query: str, limit: int = 50):
-        sql = """
-            SELECT *
-            FROM providers
-            WHERE name ILIKE %s
-            ORDER BY name
-            LIMIT %s
-        """
-        rows = self.fetchall(sql, (f"%{query}%", limit))
-        return [Provider(**row) for row in rows]
-
-    def search_fuzzy(self, query: str, limit: int = 50):
-        sql = """
-            SELECT *
-            FROM providers
-            WHERE similarity(name, %s) > 0.3
-            ORDER BY similarity(name, %s) DESC
-            LIMIT %s
-        """
-        rows = self.fetchall(sql, (query, query, limit))
-        return [Provider(**row) for row in rows]
+    def search_basic(self, query: str, limit: int = 50) -> List[ProviderRecord]:
+        rows = self.fetchrows(SEARCH_BASIC, (f"%{query}%", limit))
+        return [ProviderRecord.from_tuple(row) for row in rows]
+
+    def search_fuzzy(self, query: str, limit: int = 50) -> List[ProviderRecord]:
+        rows = self.fetchrows(SEARCH_FUZZY, (query, query, limit))
+        return [ProviderRecord.from_tuple(row) for row in rows]
 
     def search_nearby(
         self,
@@ -35,31 +68,14 @@ class ProviderRepository(BaseRepository):
         lon: float,
         radius_meters: float,
         limit: int = 50,
-    ):
+    ) -> List[ProviderRecord]:
         """
         Spatial nearby search using PostGIS.
         Uses `location` column.
         """
 
-        sql = """
-            SELECT *,
-                   ST_Distance(
-                       location::geography,
-                       ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography
-                   ) AS distance
-            FROM providers
-            WHERE location IS NOT NULL
-              AND ST_DWithin(
-                    location::geography,
-                    ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography,
-                    %s
-              )
-            ORDER BY distance
-            LIMIT %s
-        """
-
-        rows = self.fetchall(
-            sql,
+        rows = self.fetchrows(
+            SEARCH_NEARBY,
             (
                 lon,
                 lat,
@@ -70,4 +86,8 @@ class ProviderRepository(BaseRepository):
             ),
         )
 
-        return [Provider(**row) for row in rows]
+        return [ProviderRecord.from_tuple(row) for row in rows]
+
+    def get_by_id(self, provider_id: int) -> ProviderRecord | None:
+        rows = self.fetchrows(PROVIDER_BY_ID, (provider_id,))
+        return ProviderRecord.from_tuple(rows[0]) if rows else None
@@ -0,0 +1,356 @@
+"""
+Provider Catalog - Memory-mapped, read-only provider index
+Location: app/services/catalog.py
+
+`scripts/build_catalog.py` writes every provider plus prebuilt index arrays
+to one binary file. Each uvicorn worker mmaps it read-only, so N workers
+share one copy through the OS page cache and startup is a header parse.
+
+File layout (little-endian, every section 8-byte aligned):
+
+    header      magic, version, counts, (offset, length) per section
+    ids         int64[n]      provider id per row (rows sorted by name)
+    lat, lon    float64[n]    NaN when missing
+    rec_offsets uint64[n+1]   -> records (JSON array per row, PROVIDER_COLUMNS order)
+    id_index    uint32[n]     rows sorted by id (lookup by id)
+    tok_offsets uint32[t+1]   -> tokens (sorted name tokens, utf-8)
+    post_offsets uint32[t+1]  -> postings (uint32 row numbers, ascending)
+    cell_keys   int32[c]      1-degree lat/lon cells, sorted
+    cell_offsets uint32[c+1]  -> cell_rows (uint32 row numbers)
+    name_offsets uint32[n+1]  -> names (lowercased names, NUL-terminated)
+
+Rebuilds write a temp file and os.replace() it; CatalogHandle notices the
+new inode and remaps.
+"""
+
+import bisect
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+from schemas.provider import PROVIDER_COLUMNS, ProviderRecord
+
+# ============================================================
+# FORMAT
+# ============================================================
+
+MAGIC = b"AZCATLG\x00"
+VERSION = 3
+
+SECTIONS = (
+    "ids", "lat", "lon", "rec_offsets", "records", "id_index",
+    "tok_offsets", "tokens", "post_offsets", "postings",
+    "cell_keys", "cell_offsets", "cell_rows",
+    "name_offsets", "names",
+)
+
+# magic, version, rows, tokens, cells, then (offset, length) per section
+HEADER = struct.Struct("<8sIIII" + "QQ" * len(SECTIONS))
+
+RECORD_FIELDS = PROVIDER_COLUMNS
+
+EARTH_RADIUS_M = 6_371_000
+METERS_PER_MILE = 1609.34
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _cell_key(lat: float, lon: float) -> int:
+    return (math.floor(lat) + 90) * 360 + (math.floor(lon) + 180)
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _coord(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def write_catalog(path: str, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """Serialize provider rows into a catalog file, atomically replacing `path`."""
+    rows = sorted(records, key=lambda r: ((r.get("name") or "").lower(), r["id"]))
+    n = len(rows)
+
+    ids = array("q", (r["id"] for r in rows))
+    lat = array("d", (_coord(r.get("latitude")) for r in rows))
+    lon = array("d", (_coord(r.get("longitude")) for r in rows))
+
+    rec_offsets = array("Q", [0])
+    blob = bytearray()
+    name_offsets, names = array("I", [0]), bytearray()
+    postings_by_token: Dict[str, List[int]] = {}
+    cells: Dict[int, List[int]] = {}
+
+    for row_no, r in enumerate(rows):
+        blob += json.dumps([r.get(f) for f in RECORD_FIELDS], separators=(",", ":"), default=str).encode("utf-8")
+        rec_offsets.append(len(blob))
+
+        names += (r.get("name") or "").lower().encode("utf-8") + b"\x00"
+        name_offsets.append(len(names))
+
+        for tok in set(tokenize(r.get("name"))):
+            postings_by_token.setdefault(tok, []).append(row_no)
+
+        if not math.isnan(lat[row_no]) and not math.isnan(lon[row_no]):
+            cells.setdefault(_cell_key(lat[row_no], lon[row_no]), []).append(row_no)
+
+    id_index = array("I", sorted(range(n), key=lambda i: ids[i]))
+
+    tokens = sorted(postings_by_token)
+    tok_offsets, tok_blob = array("I", [0]), bytearray()
+    post_offsets, postings = array("I", [0]), array("I")
+    for tok in tokens:
+        tok_blob += tok.encode("utf-8")
+        tok_offsets.append(len(tok_blob))
+        postings.extend(postings_by_token[tok])
+        post_offsets.append(len(postings))
+
+    cell_keys = array("i", sorted(cells))
+    cell_offsets, cell_rows = array("I", [0]), array("I")
+    for key in cell_keys:
+        cell_rows.extend(cells[key])
+        cell_offsets.append(len(cell_rows))
+
+    payloads = {
+        "ids": ids.tobytes(), "lat": lat.tobytes(), "lon": lon.tobytes(),
+        "rec_offsets": rec_offsets.tobytes(), "records": bytes(blob),
+        "id_index": id_index.tobytes(),
+        "tok_offsets": tok_offsets.tobytes(), "tokens": bytes(tok_blob),
+        "post_offsets": post_offsets.tobytes(), "postings": postings.tobytes(),
+        "cell_keys": cell_keys.tobytes(), "cell_offsets": cell_offsets.tobytes(),
+        "cell_rows": cell_rows.tobytes(),
+        "name_offsets": name_offsets.tobytes(), "names": bytes(names),
+    }
+
+    layout, offset = [], HEADER.size
+    for name in SECTIONS:
+        offset += -offset % 8
+        layout += [offset, len(payloads[name])]
+        offset += len(payloads[name])
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n, len(tokens), len(cell_keys), *layout))
+        for i, name in enumerate(SECTIONS):
+            f.write(b"\x00" * (layout[2 * i] - f.tell()))
+            f.write(payloads[name])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    return {"rows": n, "tokens": len(tokens), "cells": len(cell_keys), "bytes": offset}
+
+# ============================================================
+# READ
+# ============================================================
+
+class _Tokens:
+    """Sorted token table as a lazy sequence, so bisect works without decoding it all."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+
+class ProviderCatalog:
+    """Read-only view over a catalog file; nothing is copied until a row is returned."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.stat = os.fstat(f.fileno())
+
+        buf = memoryview(self._mm)
+        magic, version, self.rows, n_tokens, n_cells, *layout = HEADER.unpack_from(buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a provider catalog (v{VERSION})")
+
+        def section(i: int, fmt: str) -> memoryview:
+            start, length = layout[2 * i], layout[2 * i + 1]
+            view = buf[start:start + length]
+            return view.cast(fmt) if fmt != "B" else view
+
+        self.ids = section(0, "q")
+        self.lat = section(1, "d")
+        self.lon = section(2, "d")
+        self._rec_offsets = section(3, "Q")
+        self._records = section(4, "B")
+        self._id_index = section(5, "I")
+        self._tokens = _Tokens(section(6, "I"), section(7, "B"))
+        self._post_offsets = section(8, "I")
+        self._postings = section(9, "I")
+        self._cell_keys = section(10, "i")
+        self._cell_offsets = section(11, "I")
+        self._cell_rows = section(12, "I")
+        self._name_offsets = section(13, "I")
+        self._names_start = layout[2 * 14]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    # ---------------- rows ----------------
+
+    def record(self, row: int) -> ProviderRecord:
+        start, end = self._rec_offsets[row], self._rec_offsets[row + 1]
+        return ProviderRecord.from_tuple(json.loads(bytes(self._records[start:end])))
+
+    def by_id(self, provider_id: int) -> Optional[ProviderRecord]:
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ids[self._id_index[mid]] < provider_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.rows and self.ids[self._id_index[lo]] == provider_id:
+            return self.record(self._id_index[lo])
+        return None
+
+    # ---------------- name search ----------------
+
+    def _prefix_rows(self, prefix: str) -> List[int]:
+        lo = bisect.bisect_left(self._tokens, prefix)
+        hi = bisect.bisect_left(self._tokens, prefix + "\uffff", lo)
+        lists = [self._postings[self._post_offsets[t]:self._post_offsets[t + 1]] for t in range(lo, hi)]
+        if len(lists) == 1:
+            return lists[0].tolist()
+        merged, last = [], -1
+        for row in heapq.merge(*lists):
+            if row != last:
+                merged.append(row)
+                last = row
+        return merged
+
+    def search_name(self, query: str, limit: int = 50) -> List[ProviderRecord]:
+        """
+        Rows whose name has a token starting with every query token,
+        in name order (rows are stored sorted by name).
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        candidates = sorted((self._prefix_rows(t) for t in set(tokens)), key=len)
+        rows = candidates[0]
+        for other in candidates[1:]:
+            keep = set(other)
+            rows = [r for r in rows if r in keep]
+            if not rows:
+                break
+
+        return [self.record(r) for r in rows[:limit]]
+
+    def search_substring(self, query: str, limit: int = 50) -> List[ProviderRecord]:
+        """
+        Rows whose name contains `query`, case-insensitively, in name order:
+        the same rows as `name ILIKE '%query%'` (repositories.provider).
+        One mmap.find() pass over the names section, no decoding.
+        """
+        needle = (query or "").lower().encode("utf-8")
+        if not needle:
+            return [self.record(r) for r in range(min(limit, self.rows))]
+
+        rows, pos = [], self._names_start
+        while len(rows) < limit:
+            pos = self._mm.find(needle, pos, self._names_start + self._name_offsets[self.rows])
+            if pos < 0:
+                break
+            row = bisect.bisect_right(self._name_offsets, pos - self._names_start) - 1
+            rows.append(row)
+            pos = self._names_start + self._name_offsets[row + 1]   # next name
+
+        return [self.record(r) for r in rows]
+
+    # ---------------- geo search ----------------
+
+    def _cell_rows_for(self, key: int) -> memoryview:
+        i = bisect.bisect_left(self._cell_keys, key)
+        if i < len(self._cell_keys) and self._cell_keys[i] == key:
+            return self._cell_rows[self._cell_offsets[i]:self._cell_offsets[i + 1]]
+        return self._cell_rows[0:0]
+
+    def nearby(self, lat: float, lon: float, radius_meters: float, limit: int = 50) -> List[ProviderRecord]:
+        """Rows within radius, nearest first, with distance_miles set."""
+        dlat = radius_meters / 111_320
+        dlon = radius_meters / (111_320 * max(math.cos(math.radians(lat)), 0.01))
+
+        hits = []
+        for cell_lat in range(math.floor(lat - dlat), math.floor(lat + dlat) + 1):
+            for cell_lon in range(math.floor(lon - dlon), math.floor(lon + dlon) + 1):
+                for row in self._cell_rows_for(_cell_key(cell_lat, cell_lon)):
+                    d = _haversine_m(lat, lon, self.lat[row], self.lon[row])
+                    if d <= radius_meters:
+                        hits.append((d, row))
+
+        results = []
+        for d, row in heapq.nsmallest(limit, hits):
+            record = self.record(row)
+            record.distance_miles = round(d / METERS_PER_MILE, 2)
+            results.append(record)
+        return results
+
+# ============================================================
+# HOT RELOAD
+# ============================================================
+
+class CatalogHandle:
+    """
+    Current catalog for a path; remaps after an atomic rebuild.
+
+    The file is stat()ed at most every `check_interval` seconds. Old maps
+    are released when the last reader drops them.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._catalog: Optional[ProviderCatalog] = None
+        self._checked_at = 0.0
+
+    def get(self) -> Optional[ProviderCatalog]:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._catalog
+        self._checked_at = now
+
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._catalog = None
+            return None
+
+        current = self._catalog
+        if current is None or (st.st_ino, st.st_mtime_ns) != (current.stat.st_ino, current.stat.st_mtime_ns):
+            try:
+                self._catalog = ProviderCatalog(self.path)
+            except (ValueError, OSError) as e:
+                print(f"⚠️ Catalog not loaded from {self.path}: {e}")
+        return self._catalog
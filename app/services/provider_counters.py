@@ -0,0 +1,221 @@
+"""
+Provider Counters - Hourly per-provider event counters in Redis
+Location: app/services/provider_counters.py
+
+Every provider event (view, phone / website / email click) increments a
+Redis hash at request time:
+
+    pc:{hour}:{provider_id}   event_type -> count    (hour = UTC YYYYMMDDHH)
+    pc:dirty:{hour}           set of provider ids seen in that hour
+    pc:hours                  zset of hours not yet compacted (score = epoch)
+
+compact() (run by the analytics worker) copies closed hours into
+provider_activity_hourly (migrations/0006_provider_activity_hourly.sql)
+and advances pc:compacted_until. window_counts() answers any `days`
+window from Postgres below that watermark and Redis above it, so the
+numbers are live without the worker catching up and without touching
+user_activity. Buckets stay in Redis for PROVIDER_COUNTER_TTL_HOURS after
+they are written, which has to outlast the compaction interval.
+
+History from before the counters existed lives only in user_activity;
+backfill() (scripts/backfill_provider_counters.py) copies it into
+provider_activity_hourly for the hours below the watermark.
+"""
+
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from psycopg2.extras import execute_values
+
+from app.utils.redis_client import redis_client
+from db.statements import execute, statement
+
+COUNTER_TTL = int(os.getenv("PROVIDER_COUNTER_TTL_HOURS", 48)) * 3600
+COMPACT_GRACE_SECONDS = 120   # leave a closed hour alone briefly for in-flight increments
+
+HOURS_KEY = "pc:hours"
+WATERMARK_KEY = "pc:compacted_until"
+
+HOURLY_TOTALS = statement("provider_counters_hourly_totals", """
+    SELECT event_type, SUM(count) AS count
+    FROM provider_activity_hourly
+    WHERE provider_id = %s
+      AND hour >= %s
+      AND hour < %s
+    GROUP BY event_type
+""")
+
+
+def _hour_start(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _hour_key(hour: datetime) -> str:
+    return f"{hour:%Y%m%d%H}"
+
+
+def _bucket_key(hour_key: str, provider_id) -> str:
+    return f"pc:{hour_key}:{provider_id}"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# ============================================================
+# WRITE PATH (REQUEST TIME)
+# ============================================================
+
+def record(provider_id: int, event_type: str, at: Optional[datetime] = None) -> None:
+    """Count one provider event in its hourly bucket. Never raises."""
+    hour = _hour_start(at or _now())
+    hour_key = _hour_key(hour)
+    bucket = _bucket_key(hour_key, provider_id)
+    dirty = f"pc:dirty:{hour_key}"
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.hincrby(bucket, event_type, 1)
+        pipe.expire(bucket, COUNTER_TTL)
+        pipe.sadd(dirty, provider_id)
+        pipe.expire(dirty, COUNTER_TTL)
+        pipe.zadd(HOURS_KEY, {hour_key: hour.replace(tzinfo=timezone.utc).timestamp()})
+        pipe.execute()
+    except Exception:
+        pass
+
+# ============================================================
+# READ PATH
+# ============================================================
+
+def _watermark() -> Optional[datetime]:
+    value = redis_client.get(WATERMARK_KEY)
+    return datetime.strptime(value, "%Y%m%d%H") if value else None
+
+
+def _redis_counts(provider_id: int, start: datetime, end: datetime) -> Counter:
+    counts: Counter = Counter()
+    hour = _hour_start(start)
+    keys = []
+    while hour <= end:
+        keys.append(_bucket_key(_hour_key(hour), provider_id))
+        hour += timedelta(hours=1)
+
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.hgetall(key)
+    for bucket in pipe.execute():
+        counts.update({k: int(v) for k, v in bucket.items()})
+    return counts
+
+
+def window_counts(cur, provider_id: int, days: int) -> Dict[str, int]:
+    """event_type -> count for the last `days` days (hour granularity)."""
+    now = _now()
+    since = _hour_start(now - timedelta(days=days))
+
+    try:
+        watermark, live = _watermark(), True
+    except Exception:
+        watermark, live = None, False
+
+    # Hours before db_until come from Postgres, the rest from Redis. With
+    # Redis down only the compacted hours are available.
+    if not live:
+        db_until = now
+    elif watermark is None:
+        db_until = since
+    else:
+        db_until = max(watermark, since)
+
+    counts: Counter = Counter()
+    if db_until > since:
+        execute(cur, HOURLY_TOTALS, (provider_id, since, db_until))
+        for row in cur.fetchall():
+            counts[row["event_type"]] += int(row["count"])
+
+    if live:
+        # Buckets older than the TTL have expired; without a watermark
+        # (before the first compaction, after a flush) don't ask for them
+        redis_from = max(db_until, now - timedelta(seconds=COUNTER_TTL))
+        try:
+            counts.update(_redis_counts(provider_id, redis_from, now))
+        except Exception:
+            pass
+
+    return dict(counts)
+
+# ============================================================
+# COMPACTION (ANALYTICS WORKER)
+# ============================================================
+
+def compact(conn) -> List[str]:
+    """Copy closed hours from Redis into provider_activity_hourly. Returns hours compacted."""
+    cutoff = _hour_start(_now() - timedelta(seconds=COMPACT_GRACE_SECONDS))
+    hour_keys = redis_client.zrangebyscore(
+        HOURS_KEY, "-inf", f"({cutoff.replace(tzinfo=timezone.utc).timestamp()}",
+    )
+
+    cur = conn.cursor()
+    for hour_key in hour_keys:
+        hour = datetime.strptime(hour_key, "%Y%m%d%H")
+        provider_ids = list(redis_client.smembers(f"pc:dirty:{hour_key}"))
+
+        pipe = redis_client.pipeline(transaction=False)
+        for provider_id in provider_ids:
+            pipe.hgetall(_bucket_key(hour_key, provider_id))
+        rows = [
+            (int(provider_id), hour, event_type, int(count))
+            for provider_id, bucket in zip(provider_ids, pipe.execute())
+            for event_type, count in bucket.items()
+        ]
+
+        if rows:
+            execute_values(cur, """
+                INSERT INTO provider_activity_hourly (provider_id, hour, event_type, count)
+                VALUES %s
+                ON CONFLICT (provider_id, hour, event_type) DO UPDATE SET count = EXCLUDED.count
+            """, rows)
+        conn.commit()
+        redis_client.zrem(HOURS_KEY, hour_key)
+
+    # Every hour before the cutoff is now either in Postgres or had no events
+    redis_client.set(WATERMARK_KEY, _hour_key(cutoff))
+    cur.close()
+    return hour_keys
+
+# ============================================================
+# BACKFILL (FROM user_activity)
+# ============================================================
+
+def backfill(conn, since: datetime) -> Optional[int]:
+    """
+    Fill provider_activity_hourly from user_activity for [since, watermark).
+
+    user_activity holds every provider event, so per hour its count is at
+    least the Redis one: GREATEST() fills hours from before the counters
+    existed (and the partial hour they started in) without lowering hours
+    already compacted. Hours above the watermark are left to compact().
+    Returns rows written, or None before the first compaction.
+    """
+    until = _watermark()
+    if until is None:
+        return None
+
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO provider_activity_hourly (provider_id, hour, event_type, count)
+        SELECT provider_id, date_trunc('hour', timestamp), event_type, COUNT(*)
+        FROM user_activity
+        WHERE provider_id IS NOT NULL
+          AND timestamp >= %s
+          AND timestamp < %s
+        GROUP BY 1, 2, 3
+        ON CONFLICT (provider_id, hour, event_type) DO UPDATE
+            SET count = GREATEST(provider_activity_hourly.count, EXCLUDED.count)
+    """, (_hour_start(since), until))
+    written = cur.rowcount
+    conn.commit()
+    cur.close()
+    return written
@@ -1,24 +1,40 @@
-from typing import List
+from typing import List, Optional
 
 from app.repositories.provider import ProviderRepository
-from schemas.provider import Provider
+from schemas.provider import ProviderRecord
 from app.services.cache import CacheService
+from app.services.catalog import CatalogHandle
 
 
 class SearchService:
+    """
+    Provider search. Basic and nearby searches are answered from the
+    memory-mapped catalog when one is built, otherwise from Postgres, with
+    the same matching either way (basic = case-insensitive substring).
+    """
+
     def __init__(
         self,
         repo: ProviderRepository,
         cache: CacheService,
+        catalog: Optional[CatalogHandle] = None,
     ):
         self.repo = repo
         self.cache = cache
+        self.catalog = catalog
+
+    def _catalog(self):
+        return self.catalog.get() if self.catalog else None
+
+    def basic_search(self, query: str, limit: int = 50) -> List[ProviderRecord]:
+        catalog = self._catalog()
+        if catalog is not None:
+            return catalog.search_substring(query, limit)
 
-    def basic_search(self, query: str, limit: int = 50) -> List[Provider]:
         results = self.repo.search_basic(query=query, limit=limit)
         return results[:limit]
 
-    def fuzzy_search(self, query: str, limit: int = 50) -> List[Provider]:
+    def fuzzy_search(self, query: str, limit: int = 50) -> List[ProviderRecord]:
         results = self.repo.search_fuzzy(query=query, limit=limit)
         return results[:limit]
 
@@ -28,8 +44,13 @@ class SearchService:
         lon: float,
         radius_miles: int,
         limit: int = 50,
-    ) -> List[Provider]:
+    ) -> List[ProviderRecord]:
         radius_meters = radius_miles * 1609.34
+
+        catalog = self._catalog()
+        if catalog is not None:
+            return catalog.nearby(lat, lon, radius_meters, limit)
+
         results = self.repo.search_nearby(
             lat=lat,
             lon=lon,
@@ -0,0 +1,122 @@
+"""
+Search Demand - Daily unmet-demand aggregates
+Location: app/services/search_demand.py
+
+search_demand_daily (migrations/0005_search_demand_daily.sql) holds one
+row per (day, canonical query, city, state) with the number of searches
+that came back empty (unmet) or thin (low_supply). The analytics worker
+calls record() for every search_unmet / search_low_supply event, so the
+report is a top-N over at most `days` rows per key instead of a JSONB
+GROUP BY over the whole event history.
+
+Queries are keyed by canonical_service() so "SLP" and "speech therapy"
+count as the same demand.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.controlled_vocabulary import canonical_service
+from db.statements import execute, statement
+
+DEMAND_EVENTS = {"search_unmet": "unmet", "search_low_supply": "low_supply"}
+
+UPSERT_DEMAND = statement("search_demand_upsert", """
+    INSERT INTO search_demand_daily (day, query, city, state, unmet, low_supply, searches, last_seen_at)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+    ON CONFLICT (day, query, city, state) DO UPDATE SET
+        unmet = search_demand_daily.unmet + EXCLUDED.unmet,
+        low_supply = search_demand_daily.low_supply + EXCLUDED.low_supply,
+        searches = search_demand_daily.searches + EXCLUDED.searches,
+        last_seen_at = NOW()
+""")
+
+TOP_DEMAND = statement("search_demand_top", """
+    SELECT
+        query,
+        NULLIF(city, '') AS city,
+        NULLIF(state, '') AS state,
+        SUM(searches) AS searches,
+        SUM(unmet) AS unmet,
+        SUM(low_supply) AS low_supply
+    FROM search_demand_daily
+    WHERE day >= %s
+    GROUP BY query, city, state
+    ORDER BY searches DESC
+    LIMIT %s
+""")
+
+DemandKey = Tuple[date, str, str, str]
+
+
+def demand_key(event: Dict[str, Any], day: Optional[date] = None) -> Optional[DemandKey]:
+    """(day, query, city, state) for a demand event, or None if it isn't one."""
+    event_type = event.get("event") or event.get("event_type") or ""
+    if event_type not in DEMAND_EVENTS:
+        return None
+
+    if day is None:
+        ts = event.get("ts")
+        try:
+            day = datetime.fromtimestamp(int(ts)).date() if ts else date.today()
+        except (TypeError, ValueError):
+            day = date.today()
+
+    return (
+        day,
+        canonical_service(event.get("query") or ""),
+        (event.get("city") or "").strip(),
+        (event.get("state") or "").strip().upper(),
+    )
+
+
+def record(cur, event: Dict[str, Any]) -> bool:
+    """Add one stream event to its daily bucket. Returns False for non-demand events."""
+    key = demand_key(event)
+    if key is None:
+        return False
+
+    kind = DEMAND_EVENTS[event.get("event") or event.get("event_type")]
+    execute(cur, UPSERT_DEMAND, (*key, int(kind == "unmet"), int(kind == "low_supply"), 1))
+    return True
+
+
+def top_demand(cur, days: int = 30, limit: int = 50) -> List[dict]:
+    execute(cur, TOP_DEMAND, (date.today() - timedelta(days=days), limit))
+    return cur.fetchall()
+
+# ============================================================
+# REBUILD (BACKFILL FROM user_activity)
+# ============================================================
+
+def rebuild(conn, since: date) -> int:
+    """
+    Recompute buckets from `since` onward out of user_activity.
+
+    Postgres pre-groups by the raw (day, query, city, state, event); the
+    canonical key is applied here, so the rows crossing the wire scale
+    with distinct searches, not with events. Returns buckets written.
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT timestamp::date, metadata->>'query', metadata->>'city', metadata->>'state',
+               event_type, COUNT(*)
+        FROM user_activity
+        WHERE event_type IN ('search_unmet', 'search_low_supply')
+          AND timestamp >= %s
+        GROUP BY 1, 2, 3, 4, 5
+    """, (since,))
+
+    buckets: Dict[DemandKey, List[int]] = defaultdict(lambda: [0, 0])
+    for day, query, city, state, event_type, count in cur.fetchall():
+        key = demand_key({"event": event_type, "query": query, "city": city, "state": state}, day=day)
+        buckets[key][0 if DEMAND_EVENTS[event_type] == "unmet" else 1] += count
+
+    cur.execute("DELETE FROM search_demand_daily WHERE day >= %s", (since,))
+    for key, (unmet, low_supply) in buckets.items():
+        execute(cur, UPSERT_DEMAND, (*key, unmet, low_supply, unmet + low_supply))
+
+    conn.commit()
+    cur.close()
+    return len(buckets)
@@ -1,9 +1,31 @@
 import json
+import uuid
 from typing import Any, Dict, Optional
 from fastapi import Request
 
+from app.core.timing import timed
+
 # DB connection (root-level db folder)
-from db.connection import get_db
+from db.connection import current_session, get_db
+from db.statements import execute, statement
+
+INSERT_EVENT = statement("insert_analytics_event", """
+    INSERT INTO analytics_events_v2
+    (
+        event_name,
+        provider_id,
+        specialty_id,
+        query_text,
+        city,
+        state,
+        radius_miles,
+        source,
+        metadata,
+        session_id,
+        device_id
+    )
+    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s::jsonb,%s,%s)
+""")
 
 
 def _safe_json(value: Any) -> Any:
@@ -14,6 +36,20 @@ def _safe_json(value: Any) -> Any:
         return str(value)
 
 
+def device_fingerprint(request: Request) -> str:
+    """
+    Stable anonymous device id from user agent, accept header and client IP.
+    Shared by everyone behind one NAT / office IP on the same browser build:
+    good for grouping, never for deciding who owns anonymous history.
+    """
+    ua = request.headers.get("user-agent", "")
+    accept = request.headers.get("accept", "")
+    ip = request.client.host if request.client else ""
+    raw = f"{ua}|{accept}|{ip}"
+    return uuid.uuid5(uuid.NAMESPACE_DNS, raw).hex
+
+
+@timed("log_event")
 async def log_event(
     request: Request,
     event_type: str,
@@ -30,7 +66,8 @@ async def log_event(
     """
     Async-safe analytics logger.
     Matches main.py exactly.
-    Writes to analytics_events_v2.
+    Writes to analytics_events_v2, tagged with the request's session and
+    device so identity stitching can attach it to the user on login.
     """
 
     payload = metadata or {}
@@ -43,25 +80,14 @@ async def log_event(
     payload["method"] = request.method
 
     # ✅ CORRECT: use get_db() as a context manager
-    with get_db() as conn:
+    # pin=False: the session never reads these rows back, so logging must
+    # not keep its reads on the primary (read-your-writes)
+    with get_db(pin=False) as conn:
         try:
             with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO analytics_events_v2
-                    (
-                        event_name,
-                        provider_id,
-                        specialty_id,
-                        query_text,
-                        city,
-                        state,
-                        radius_miles,
-                        source,
-                        metadata
-                    )
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s::jsonb)
-                    """,
+                execute(
+                    cur,
+                    INSERT_EVENT,
                     (
                         event_type,
                         provider_id,
@@ -72,6 +98,8 @@ async def log_event(
                         radius_miles,
                         source,
                         json.dumps(payload),
+                        current_session() or request.cookies.get("session_id"),
+                        device_fingerprint(request),
                     ),
                 )
             conn.commit()
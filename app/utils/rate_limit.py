@@ -1,4 +1,15 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["200/minute"])
+from app.core.timing import span
+
+
+class TimedLimiter(Limiter):
+    """slowapi Limiter whose per-request limit check shows up as the rate_limit span."""
+
+    def _check_request_limit(self, *args, **kwargs):
+        with span("rate_limit"):
+            return super()._check_request_limit(*args, **kwargs)
+
+
+limiter = TimedLimiter(key_func=get_remote_address, default_limits=["200/minute"])
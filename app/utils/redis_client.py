@@ -1,6 +1,20 @@
 import redis
 import os
 
+from app.core.timing import span
+
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 
-redis_client = redis.StrictRedis.from_url(REDIS_URL, decode_responses=True)
+# Redis command -> request span (see app/core/timing.py)
+_SPANS = {"GET": "cache", "SET": "cache", "SETEX": "cache", "MGET": "cache", "DEL": "cache", "XADD": "xadd"}
+
+
+class TimedRedis(redis.StrictRedis):
+    """StrictRedis that records every command in the current request's timings."""
+
+    def execute_command(self, *args, **options):
+        with span(_SPANS.get(str(args[0]).upper(), "redis")):
+            return super().execute_command(*args, **options)
+
+
+redis_client = TimedRedis.from_url(REDIS_URL, decode_responses=True)
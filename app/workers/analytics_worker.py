@@ -3,6 +3,9 @@ Analytics Worker
 - Consumes Redis analytics_stream
 - Persists events to Postgres (user_activity)
 - Updates provider_stats for dashboards + monetization
+- Updates search_demand_daily for the unmet-demand report
+- Compacts the Redis provider counters into provider_activity_hourly
+- Updates the decayed personalization profiles (analytics/profile_store.py)
 - Preserves full event metadata for attribution & geo demand
 """
 
@@ -14,7 +17,11 @@ from typing import Dict, Any
 import redis
 from psycopg2.extras import Json
 
+from analytics import profile_store
+from app.services import provider_counters, search_demand
 from db.connection import get_db
+from db.partitions import maintain as maintain_partitions
+from db.statements import execute, statement
 
 # ============================================================
 # REDIS CONFIG
@@ -53,6 +60,21 @@ def ensure_consumer_group():
 # DB: USER ACTIVITY (FULL EVENT STORAGE)
 # ============================================================
 
+INSERT_ACTIVITY = statement("worker_insert_activity", """
+    INSERT INTO user_activity (
+        event_type,
+        provider_id,
+        session_id,
+        device_id,
+        ip_hash,
+        source,
+        metadata,
+        timestamp
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
+""")
+
+
 def persist_user_activity(event: Dict[str, Any]) -> None:
     """
     Stores the FULL event payload in metadata.
@@ -63,39 +85,44 @@ def persist_user_activity(event: Dict[str, Any]) -> None:
     - future trend queries (7d / 30d)
     """
 
-    conn = get_db()
-    cur = conn.cursor()
-
-    cur.execute("""
-        INSERT INTO user_activity (
-            event_type,
-            provider_id,
-            session_id,
-            device_id,
-            ip_hash,
-            source,
-            metadata,
-            timestamp
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
-    """, (
-        event.get("event") or event.get("event_type"),
-        event.get("provider_id"),
-        event.get("session_id"),
-        event.get("device_id"),
-        event.get("ip_hash"),
-        event.get("source"),
-        Json(event)  # 🔑 FULL EVENT STORED (search_query, city, state, etc.)
-    ))
-
-    conn.commit()
-    conn.close()
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            execute(cur, INSERT_ACTIVITY, (
+                event.get("event") or event.get("event_type"),
+                event.get("provider_id"),
+                event.get("session_id"),
+                event.get("device_id"),
+                event.get("ip_hash"),
+                event.get("source"),
+                Json(event)  # 🔑 FULL EVENT STORED (search_query, city, state, etc.)
+            ))
+        conn.commit()
 
 
 # ============================================================
 # DB: PROVIDER STATS (REVENUE SIGNALS)
 # ============================================================
 
+UPSERT_PROVIDER_STATS = statement("worker_upsert_provider_stats", """
+    INSERT INTO provider_stats (
+        provider_id,
+        views,
+        searches,
+        conversions,
+        phone_clicks,
+        website_clicks,
+        last_event_at
+    )
+    VALUES (%s, %s, 0, %s, %s, %s, NOW())
+    ON CONFLICT (provider_id) DO UPDATE SET
+        views = provider_stats.views + EXCLUDED.views,
+        conversions = provider_stats.conversions + EXCLUDED.conversions,
+        phone_clicks = provider_stats.phone_clicks + EXCLUDED.phone_clicks,
+        website_clicks = provider_stats.website_clicks + EXCLUDED.website_clicks,
+        last_event_at = NOW()
+""")
+
+
 def update_provider_stats(event: Dict[str, Any]) -> None:
     event_type = event.get("event") or event.get("event_type") or ""
     provider_id_raw = event.get("provider_id")
@@ -118,30 +145,80 @@ def update_provider_stats(event: Dict[str, Any]) -> None:
 
     conversions_inc = phone_inc + website_inc
 
-    conn = get_db()
-    cur = conn.cursor()
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            execute(cur, UPSERT_PROVIDER_STATS, (provider_id, views_inc, conversions_inc, phone_inc, website_inc))
+        conn.commit()
 
-    cur.execute("""
-        INSERT INTO provider_stats (
-            provider_id,
-            views,
-            searches,
-            conversions,
-            last_event_at
-        )
-        VALUES (%s, %s, 0, %s, NOW())
-        ON CONFLICT (provider_id) DO UPDATE SET
-            views = provider_stats.views + EXCLUDED.views,
-            conversions = provider_stats.conversions + EXCLUDED.conversions,
-            last_event_at = NOW()
-    """, (
-        provider_id,
-        views_inc,
-        conversions_inc
-    ))
 
-    conn.commit()
-    conn.close()
+# ============================================================
+# DB: SEARCH DEMAND (UNMET / LOW SUPPLY)
+# ============================================================
+
+def update_search_demand(event: Dict[str, Any]) -> None:
+    if search_demand.demand_key(event) is None:
+        return
+
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            search_demand.record(cur, event)
+        conn.commit()
+
+
+# ============================================================
+# PERSONALIZATION PROFILES (DECAYED, IN REDIS)
+# ============================================================
+
+def update_profile(event: Dict[str, Any]) -> None:
+    # Best effort: a lost profile update must not re-deliver the event
+    try:
+        profile_store.record_event(event)
+    except Exception as e:
+        print(f"✗ Profile update error: {e}")
+
+
+# ============================================================
+# PROVIDER COUNTERS (REDIS HOURLY BUCKETS -> POSTGRES)
+# ============================================================
+
+COMPACT_SECONDS = 300
+_compacted_at = 0.0
+
+
+def compact_provider_counters() -> None:
+    global _compacted_at
+    if time.time() - _compacted_at < COMPACT_SECONDS:
+        return
+    _compacted_at = time.time()
+    try:
+        with get_db() as conn:
+            hours = provider_counters.compact(conn)
+        if hours:
+            print(f"🧮 Compacted provider counters for {len(hours)} hour(s)")
+    except Exception as e:
+        print(f"✗ Provider counter compaction error: {e}")
+
+
+# ============================================================
+# PARTITIONS (CREATE AHEAD; RETENTION RUNS FROM CRON)
+# ============================================================
+
+PARTITION_CHECK_SECONDS = 3600
+_partitions_checked_at = 0.0
+
+
+def ensure_partitions() -> None:
+    global _partitions_checked_at
+    if time.time() - _partitions_checked_at < PARTITION_CHECK_SECONDS:
+        return
+    _partitions_checked_at = time.time()
+    try:
+        with get_db() as conn:
+            for table, result in maintain_partitions(conn, retention=False).items():
+                for name in result.get("created", []):
+                    print(f"🗂 Created partition {name}")
+    except Exception as e:
+        print(f"✗ Partition maintenance error: {e}")
 
 
 # ============================================================
@@ -153,6 +230,9 @@ def run():
     print("📊 Analytics worker running...")
 
     while True:
+        ensure_partitions()
+        compact_provider_counters()
+
         messages = redis_client.xreadgroup(
             groupname=GROUP,
             consumername=CONSUMER,
@@ -169,6 +249,8 @@ def run():
                 try:
                     persist_user_activity(event)
                     update_provider_stats(event)
+                    update_search_demand(event)
+                    update_profile(event)
                     redis_client.xack(STREAM, GROUP, message_id)
                 except Exception as e:
                     print(f"✗ Analytics worker error: {e}")
@@ -0,0 +1,115 @@
+"""
+Identity Worker
+- Consumes Redis identity_stream (queued on login)
+- Stitches anonymous session history onto the user (device history
+  only within sessions the user already owns)
+  (user_activity + analytics_events_v2) in small indexed chunks
+- Folds the session's personalization profile into the user's
+- Collapses duplicate jobs within a batch (repeat logins)
+"""
+
+import os
+from typing import Dict, Tuple
+
+import redis
+
+from analytics import profile_store
+from analytics.identity_stitching import IDENTITY_STREAM, stitch
+from db.connection import get_db
+
+# ============================================================
+# REDIS CONFIG
+# ============================================================
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+
+GROUP = "identity_group"
+CONSUMER = os.getenv("IDENTITY_CONSUMER", "identity_worker_1")
+READ_COUNT = 50
+
+redis_client = redis.Redis(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    decode_responses=True
+)
+
+# ============================================================
+# REDIS GROUP INIT
+# ============================================================
+
+def ensure_consumer_group():
+    try:
+        redis_client.xgroup_create(
+            IDENTITY_STREAM,
+            GROUP,
+            id="0",
+            mkstream=True
+        )
+    except redis.exceptions.ResponseError:
+        pass  # group already exists
+
+
+# ============================================================
+# BATCH PROCESSING
+# ============================================================
+
+def process_batch(entries) -> None:
+    """Run one stitch per distinct (user, session, device); ack every message it covers."""
+    jobs: Dict[Tuple[int, str, str], list] = {}
+    for message_id, job in entries:
+        try:
+            key = (int(job["user_id"]), job.get("session_id", ""), job.get("device_id", ""))
+        except (KeyError, ValueError):
+            redis_client.xack(IDENTITY_STREAM, GROUP, message_id)  # malformed, drop
+            continue
+        jobs.setdefault(key, []).append(message_id)
+
+    with get_db() as conn:
+        for (user_id, session_id, device_id), message_ids in jobs.items():
+            try:
+                merged = stitch(conn, user_id, session_id or None, device_id or None)
+                if session_id:
+                    profile_store.merge_session_into_user(session_id, user_id)
+                redis_client.xack(IDENTITY_STREAM, GROUP, *message_ids)
+                if merged:
+                    print(f"🔗 Stitched {merged} events onto user {user_id}")
+            except Exception as e:
+                conn.rollback()
+                print(f"✗ Identity worker error (user {user_id}): {e}")
+
+
+# ============================================================
+# MAIN WORKER LOOP
+# ============================================================
+
+def run():
+    ensure_consumer_group()
+    print("🔗 Identity worker running...")
+
+    # Jobs left unacked by a previous run (crash / DB error) are retried
+    # once at startup, then only new ones are read
+    start_id = "0"
+    while True:
+        messages = redis_client.xreadgroup(
+            groupname=GROUP,
+            consumername=CONSUMER,
+            streams={IDENTITY_STREAM: start_id},
+            count=READ_COUNT,
+            block=5000
+        )
+
+        entries = [entry for _, batch in (messages or []) for entry in batch]
+        if start_id != ">":
+            # Page through our pending entries, then switch to new ones
+            start_id = entries[-1][0] if len(entries) == READ_COUNT else ">"
+        if entries:
+            process_batch(entries)
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+if __name__ == "__main__":
+    run()
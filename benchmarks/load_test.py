@@ -0,0 +1,353 @@
+"""
+HTTP Load Test - Mixed API traffic against the FastAPI app
+Location: benchmarks/load_test.py
+
+Drives a weighted mix of search / fuzzy / nearby / provider view / click
+tracking / analytics dashboard requests from N concurrent virtual users,
+either in-process (httpx ASGITransport, no network) or against a running
+uvicorn. Reports RPS, p50/p95/p99, error and rate-limit counts per
+endpoint, for two phases:
+
+- cold: parameters drawn from a large pool, Redis caches flushed first
+        (--flush-redis), so most requests miss the cache
+- warm: a small, pre-touched parameter pool, so most requests hit it
+
+Backing services are real but disposable: point DATABASE_URL / DB_* at
+a database seeded by `python -m benchmarks.sql_bench --seed` and
+REDIS_URL at a scratch Redis (database index of its own).
+
+Run from the repo root:
+    python -m benchmarks.load_test --app app.main:app --duration 30 --users 32
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --duration 60
+    python -m benchmarks.load_test --app app.main:app --baseline benchmarks/baselines/load.json
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.plans import percentile
+from benchmarks.seed import METROS, RARE_WORD
+
+# main.py rejects obvious bot user agents
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+SEARCH_TERMS = ["aba", "autism", "speech", "therapy", "behavior", "spectrum", "harbor", RARE_WORD.lower()]
+FUZZY_TERMS = ["abaa", "autsim", "theraphy", "behavor", "spectrm", "harber"]
+
+# ============================================================
+# TRAFFIC MIX
+# ============================================================
+
+@dataclass
+class Params:
+    """One phase's parameter pool."""
+
+    terms: List[str]
+    fuzzy: List[str]
+    points: List[Tuple[float, float]]
+    provider_ids: List[int]
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: float
+    build: Callable[[random.Random, Params], Tuple[str, str, Optional[dict]]]
+
+
+def _point(rng: random.Random, p: Params) -> Tuple[float, float]:
+    return rng.choice(p.points)
+
+
+MIX = [
+    Scenario("GET /providers/search", 18, lambda r, p: ("GET", f"/providers/search?query={r.choice(p.terms)}&limit=50", None)),
+    Scenario("GET /search/basic", 12, lambda r, p: ("GET", f"/search/basic?q={r.choice(p.terms)}&limit=50", None)),
+    Scenario("GET /providers/search_fuzzy", 6, lambda r, p: ("GET", f"/providers/search_fuzzy?q={r.choice(p.fuzzy)}&limit=50", None)),
+    Scenario("GET /search/fuzzy", 4, lambda r, p: ("GET", f"/search/fuzzy?q={r.choice(p.fuzzy)}&limit=50", None)),
+    Scenario("GET /providers/nearby", 14, lambda r, p: ("GET", "/providers/nearby?lat={}&lon={}&radius=25".format(*_point(r, p)), None)),
+    Scenario("GET /search/nearby", 8, lambda r, p: ("GET", "/search/nearby?lat={}&lon={}&radius_miles=25&limit=50".format(*_point(r, p)), None)),
+    Scenario("GET /providers/{id}", 20, lambda r, p: ("GET", f"/providers/{r.choice(p.provider_ids)}", None)),
+    Scenario("POST /analytics/track/click", 10, lambda r, p: (
+        "POST", "/analytics/track/click",
+        {"provider_id": r.choice(p.provider_ids), "click_type": r.choice(["phone", "website", "email"])},
+    )),
+    Scenario("GET /analytics/overview", 3, lambda r, p: ("GET", f"/analytics/overview?days={r.choice([1, 7, 30])}", None)),
+    Scenario("GET /analytics/providers/top", 2, lambda r, p: ("GET", "/analytics/providers/top?limit=25", None)),
+    Scenario("GET /analytics/provider/{id}/stats", 2, lambda r, p: ("GET", f"/analytics/provider/{r.choice(p.provider_ids)}/stats", None)),
+    Scenario("GET /analytics/unmet-demand", 1, lambda r, p: ("GET", "/analytics/unmet-demand?days=30", None)),
+]
+
+
+def cold_params(rng: random.Random, providers: int) -> Params:
+    """Large pool: jittered points and many provider ids -> mostly cache misses."""
+    points = []
+    for _ in range(5000):
+        _, _, _, lat, lon = rng.choice(METROS)
+        points.append((round(lat + rng.uniform(-0.4, 0.4), 4), round(lon + rng.uniform(-0.4, 0.4), 4)))
+    return Params(
+        terms=SEARCH_TERMS,
+        fuzzy=FUZZY_TERMS,
+        points=points,
+        provider_ids=[rng.randint(1, providers) for _ in range(5000)],
+    )
+
+
+def warm_params(rng: random.Random, providers: int) -> Params:
+    """Small pool: a few metros and popular providers -> mostly cache hits."""
+    return Params(
+        terms=SEARCH_TERMS[:3],
+        fuzzy=FUZZY_TERMS[:2],
+        points=[(lat, lon) for _, _, _, lat, lon in METROS[:5]],
+        provider_ids=list(range(1, min(providers, 20) + 1)),
+    )
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+
+    def add(self, endpoint: str, ms: float, status: str) -> None:
+        self.samples.setdefault(endpoint, []).append(ms)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        def stats(samples: List[float], statuses: Dict[str, int]) -> Dict[str, Any]:
+            total = len(samples)
+            errors = sum(n for s, n in statuses.items() if s == "exception" or s.startswith("5"))
+            limited = statuses.get("429", 0)
+            return {
+                "requests": total,
+                "rps": round(total / elapsed, 1) if elapsed else 0.0,
+                "p50_ms": round(percentile(samples, 50), 2),
+                "p95_ms": round(percentile(samples, 95), 2),
+                "p99_ms": round(percentile(samples, 99), 2),
+                "max_ms": round(max(samples), 2),
+                "error_rate": round(errors / total, 4),
+                "rate_limited": limited,
+                "statuses": dict(sorted(statuses.items())),
+            }
+
+        endpoints = {
+            name: stats(samples, self.statuses[name])
+            for name, samples in sorted(self.samples.items())
+        }
+        all_samples = [ms for samples in self.samples.values() for ms in samples]
+        all_statuses: Dict[str, int] = {}
+        for counts in self.statuses.values():
+            for s, n in counts.items():
+                all_statuses[s] = all_statuses.get(s, 0) + n
+
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "overall": stats(all_samples, all_statuses) if all_samples else {},
+            "endpoints": endpoints,
+        }
+
+
+async def virtual_user(client: httpx.AsyncClient, rng: random.Random, params: Params,
+                       recorder: Recorder, deadline: float, think: float) -> None:
+    weights = [s.weight for s in MIX]
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(MIX, weights)[0]
+        method, path, body = scenario.build(rng, params)
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, path, json=body)
+            status = str(resp.status_code)
+        except Exception:
+            status = "exception"
+        recorder.add(scenario.name, (time.perf_counter() - start) * 1000, status)
+        if think:
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+
+async def run_phase(make_client: Callable[[], httpx.AsyncClient], name: str, params: Params,
+                    users: int, duration: float, think: float, seed: int) -> Dict[str, Any]:
+    recorder = Recorder()
+    async with make_client() as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(
+            virtual_user(client, random.Random(seed * 1000 + i), params, recorder, deadline, think)
+            for i in range(users)
+        ))
+        elapsed = time.perf_counter() - start
+
+    result = recorder.summary(elapsed)
+    overall = result["overall"]
+    if overall:
+        print(f"📈 {name}: {overall['requests']} requests, {overall['rps']} rps, "
+              f"p50 {overall['p50_ms']} / p95 {overall['p95_ms']} / p99 {overall['p99_ms']} ms, "
+              f"errors {overall['error_rate']:.2%}, 429s {overall['rate_limited']}")
+    return result
+
+
+async def prime(make_client: Callable[[], httpx.AsyncClient], params: Params) -> None:
+    """Touch every warm-pool request once so the warm phase starts cached."""
+    rng = random.Random(0)
+    async with make_client() as client:
+        for scenario in MIX:
+            for _ in range(len(params.points) + len(params.terms)):
+                method, path, body = scenario.build(rng, params)
+                if method == "GET":
+                    try:
+                        await client.get(path)
+                    except Exception:
+                        pass
+
+# ============================================================
+# TARGETS
+# ============================================================
+
+def load_app(spec: str, rate_limits: bool):
+    module_name, _, attr = spec.partition(":")
+    module = importlib.import_module(module_name)
+    app = getattr(module, attr or "app")
+
+    if not rate_limits:
+        # One in-process client = one IP; the per-IP limits would cap the run
+        from app.api.v1 import search as search_routes
+        for limiter in (getattr(app.state, "limiter", None), search_routes.limiter):
+            if limiter is not None:
+                limiter.enabled = False
+    return app
+
+
+def client_factory(args) -> Callable[[], httpx.AsyncClient]:
+    headers = {"User-Agent": USER_AGENT}
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+
+    if args.url:
+        return lambda: httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=args.timeout)
+
+    app = load_app(args.app, args.rate_limits)
+    return lambda: httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://loadtest",
+        headers=headers,
+        timeout=args.timeout,
+    )
+
+
+def flush_redis() -> None:
+    from app.utils.redis_client import REDIS_URL, redis_client
+
+    redis_client.flushdb()
+    print(f"🧹 Flushed Redis ({REDIS_URL})")
+
+# ============================================================
+# COMPARISON
+# ============================================================
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    lines = []
+    for phase, result in current["phases"].items():
+        base_phase = baseline.get("phases", {}).get(phase)
+        if not base_phase:
+            continue
+        for endpoint, now in result["endpoints"].items():
+            was = base_phase["endpoints"].get(endpoint)
+            if not was:
+                continue
+            lines.append(
+                f"{phase:<5} {endpoint:<38} p95 {was['p95_ms']:>8.1f} -> {now['p95_ms']:>8.1f} ms   "
+                f"rps {was['rps']:>7.1f} -> {now['rps']:>7.1f}   "
+                f"errors {was['error_rate']:.2%} -> {now['error_rate']:.2%}"
+            )
+    return lines
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def run(args) -> Dict[str, Any]:
+    make_client = client_factory(args)
+    rng = random.Random(args.seed)
+    phases = {}
+
+    if "cold" in args.phases:
+        if args.flush_redis:
+            flush_redis()
+        phases["cold"] = await run_phase(make_client, "cold", cold_params(rng, args.providers),
+                                         args.users, args.duration, args.think, args.seed)
+
+    if "warm" in args.phases:
+        params = warm_params(rng, args.providers)
+        await prime(make_client, params)
+        phases["warm"] = await run_phase(make_client, "warm", params,
+                                         args.users, args.duration, args.think, args.seed + 1)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_revision(),
+            "target": args.url or f"in-process {args.app}",
+            "users": args.users,
+            "duration_s": args.duration,
+            "think_s": args.think,
+            "rate_limits": bool(args.url) or args.rate_limits,
+            "mix": {s.name: s.weight for s in MIX},
+        },
+        "phases": phases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-traffic HTTP load test")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--app", default="app.main:app", help="ASGI app to drive in-process")
+    target.add_argument("--url", help="base URL of a running server instead")
+    parser.add_argument("--users", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per phase")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between requests, s")
+    parser.add_argument("--phases", nargs="+", choices=["cold", "warm"], default=["cold", "warm"])
+    parser.add_argument("--providers", type=int, default=10_000, help="provider ids to draw from (seeded count)")
+    parser.add_argument("--flush-redis", action="store_true", help="FLUSHDB the app's Redis before the cold phase")
+    parser.add_argument("--rate-limits", action="store_true", help="keep slowapi limits on (in-process only)")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="benchmarks/results/load_latest.json")
+    parser.add_argument("--baseline", help="print deltas against a previous results file")
+    args = parser.parse_args()
+
+    if args.flush_redis and not os.getenv("REDIS_URL"):
+        sys.exit("❌ --flush-redis needs an explicit REDIS_URL pointing at a scratch Redis")
+
+    result = asyncio.run(run(args))
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"📁 Saved: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            for line in compare(result, json.load(f)):
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Query Plans - EXPLAIN (ANALYZE, BUFFERS) capture, timing and regression checks
+Location: benchmarks/plans.py
+
+For each named query:
+- one EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) -> plan shape, scans, buffers
+- `runs` timed executions (after warmup) -> p50/p95/p99 in ms
+
+Regressions against a baseline run:
+- a Seq Scan on a large relation that the baseline did not have (or, with
+  no baseline, one the query does not allow) -> failure
+- p95 slower than baseline by more than `max_slowdown` -> failure
+- plan shape changed -> reported, not fatal
+"""
+
+import json
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from benchmarks.queries import BenchQuery
+
+# Seq scans on relations smaller than this are the planner's right call
+DEFAULT_MIN_ROWS = 10_000
+
+# ============================================================
+# PLAN ANALYSIS
+# ============================================================
+
+def walk(node: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def plan_shape(node: Dict[str, Any]) -> str:
+    """Compact, stable plan signature, e.g. Limit(Index Scan[providers])."""
+    label = node["Node Type"]
+    if node.get("Relation Name"):
+        label += f"[{node['Relation Name']}]"
+    children = node.get("Plans", [])
+    if children:
+        label += "(" + ", ".join(plan_shape(c) for c in children) + ")"
+    return label
+
+
+def scans(node: Dict[str, Any]) -> Dict[str, List[str]]:
+    """relation -> scan node types used on it."""
+    out: Dict[str, List[str]] = {}
+    for n in walk(node):
+        if n.get("Relation Name"):
+            out.setdefault(n["Relation Name"], []).append(n["Node Type"])
+    return out
+
+
+def seq_scanned(node: Dict[str, Any], row_counts: Dict[str, int], min_rows: int) -> List[str]:
+    return sorted({
+        rel for rel, kinds in scans(node).items()
+        if "Seq Scan" in kinds and row_counts.get(rel, 0) >= min_rows
+    })
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+# ============================================================
+# CAPTURE
+# ============================================================
+
+def relation_rows(conn) -> Dict[str, int]:
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT c.relname, c.reltuples::bigint
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p') AND n.nspname = current_schema()
+    """)
+    rows = {name: int(count) for name, count in cur.fetchall()}
+    cur.close()
+    return rows
+
+
+def explain(conn, query: BenchQuery) -> Dict[str, Any]:
+    cur = conn.cursor()
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + query.sql, query.params)
+    result = cur.fetchone()[0]
+    cur.close()
+    conn.rollback()
+    return (json.loads(result) if isinstance(result, str) else result)[0]
+
+
+def time_query(conn, query: BenchQuery, runs: int, warmup: int) -> List[float]:
+    cur = conn.cursor()
+    samples = []
+    for i in range(warmup + runs):
+        start = time.perf_counter()
+        cur.execute(query.sql, query.params)
+        cur.fetchall()
+        elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            samples.append(elapsed)
+    cur.close()
+    conn.rollback()
+    return samples
+
+
+def measure(conn, query: BenchQuery, row_counts: Dict[str, int], runs: int = 30,
+            warmup: int = 3, min_rows: int = DEFAULT_MIN_ROWS) -> Dict[str, Any]:
+    explained = explain(conn, query)
+    plan = explained["Plan"]
+    samples = time_query(conn, query, runs, warmup)
+
+    return {
+        "source": query.source,
+        "shape": plan_shape(plan),
+        "scans": scans(plan),
+        "seq_scans": seq_scanned(plan, row_counts, min_rows),
+        "allow_seq_scan": list(query.allow_seq_scan),
+        "rows": plan.get("Actual Rows"),
+        "buffers": {
+            "shared_hit": plan.get("Shared Hit Blocks", 0),
+            "shared_read": plan.get("Shared Read Blocks", 0),
+        },
+        "planning_ms": round(explained.get("Planning Time", 0.0), 3),
+        "execution_ms": round(explained.get("Execution Time", 0.0), 3),
+        "latency_ms": {
+            "p50": round(percentile(samples, 50), 3),
+            "p95": round(percentile(samples, 95), 3),
+            "p99": round(percentile(samples, 99), 3),
+            "max": round(max(samples), 3),
+            "runs": len(samples),
+        },
+        "notes": query.notes,
+    }
+
+# ============================================================
+# REGRESSIONS
+# ============================================================
+
+def compare(current: Dict[str, Any], baseline: Optional[Dict[str, Any]], max_slowdown: float = 0.0) -> Dict[str, List[str]]:
+    """
+    Returns {"failures": [...], "warnings": [...]} for one run's "queries".
+    max_slowdown: allowed p95 ratio vs baseline (0 disables the latency check).
+    """
+    failures: List[str] = []
+    warnings: List[str] = []
+    base_queries = (baseline or {}).get("queries", {})
+
+    for name, result in current.items():
+        base = base_queries.get(name)
+        allowed = set(result["allow_seq_scan"]) | set(base["seq_scans"] if base else ())
+
+        for rel in result["seq_scans"]:
+            if rel not in allowed:
+                failures.append(f"{name}: Seq Scan on {rel} ({result['shape']})")
+
+        if base is None:
+            if baseline is not None:
+                warnings.append(f"{name}: not in baseline")
+            continue
+
+        if result["shape"] != base["shape"]:
+            warnings.append(f"{name}: plan changed\n      was: {base['shape']}\n      now: {result['shape']}")
+
+        if max_slowdown:
+            was, now = base["latency_ms"]["p95"], result["latency_ms"]["p95"]
+            # Sub-millisecond jitter is not a regression
+            if was > 0 and now / was > max_slowdown and now - was > 1.0:
+                failures.append(f"{name}: p95 {now:.2f}ms vs baseline {was:.2f}ms (x{now / was:.1f})")
+
+    return {"failures": failures, "warnings": warnings}
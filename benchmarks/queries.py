@@ -0,0 +1,215 @@
+"""
+Benchmark Queries - Named hot SQL from the API and analytics paths
+Location: benchmarks/queries.py
+
+ProviderRepository queries are captured from the repository itself, so
+they cannot drift from what the API runs. The inline SQL in app/main.py,
+app/api/v1/analytics.py and analytics/personalization_engine.py is
+mirrored here; keep both sides in sync when either changes.
+
+`allow_seq_scan` lists relations a query is known to scan sequentially
+(no usable index exists for it). A seq scan on any other large relation
+fails the run.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from app.repositories.provider import ProviderRepository
+from benchmarks.seed import RARE_WORD
+
+# Seeded metro used by the geo queries (Miami)
+LAT, LON = 25.77, -80.19
+
+
+@dataclass
+class BenchQuery:
+    name: str
+    source: str
+    sql: str
+    params: Tuple = ()
+    allow_seq_scan: Tuple[str, ...] = ()
+    notes: str = ""
+
+
+# ============================================================
+# REPOSITORY CAPTURE
+# ============================================================
+
+class _CapturingRepository(ProviderRepository):
+    """Records the SQL a repository method would run instead of running it.
+
+    Prepared statements (db/statements.py) are captured as their %s text.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.captured: List[Tuple[str, tuple]] = []
+
+    def fetchrows(self, query, params=None):
+        self.captured.append((getattr(query, "sql", query), params or ()))
+        return []
+
+    fetchall = fetchrows
+
+    def fetchone(self, query, params=None):
+        self.captured.append((getattr(query, "sql", query), params or ()))
+        return None
+
+
+def _capture(call: Callable[[ProviderRepository], object]) -> Tuple[str, tuple]:
+    repo = _CapturingRepository()
+    call(repo)
+    return repo.captured[-1]
+
+# ============================================================
+# QUERY SET
+# ============================================================
+
+def build_queries() -> List[BenchQuery]:
+    now = datetime.now()
+    last_30d = now - timedelta(days=30)
+    last_7d = now - timedelta(days=7)
+    last_hour = now - timedelta(hours=1)
+    term = f"%{RARE_WORD}%"
+
+    queries = [
+        # ---------------- app/main.py ----------------
+        BenchQuery(
+            "main.search", "app/main.py:search",
+            """
+            SELECT id, name, services, street, city, state, zip, phone, website, latitude, longitude
+            FROM providers
+            WHERE services ILIKE %s OR name ILIKE %s OR city ILIKE %s OR state ILIKE %s OR zip ILIKE %s
+            LIMIT %s
+            """,
+            (term, term, term, term, term, 50),
+        ),
+        BenchQuery(
+            "main.search_fuzzy", "app/main.py:search_fuzzy",
+            """
+            SELECT id, name, phone, email, website, street, city, state, zip,
+                   full_address, latitude, longitude, services,
+            greatest(similarity(name, %s), similarity(city, %s), similarity(services, %s)) AS score
+            FROM providers
+            WHERE name %% %s OR city %% %s OR services %% %s
+            ORDER BY score DESC
+            LIMIT %s
+            """,
+            (RARE_WORD,) * 6 + (50,),
+        ),
+        BenchQuery(
+            "main.nearby", "app/main.py:nearby",
+            """
+            SELECT id, name, phone, email, website, street, city, state, zip,
+                   full_address, latitude, longitude, services,
+                   ROUND(CAST(ST_Distance(location, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography)
+                              / 1609.34 AS numeric), 2) AS distance_miles
+            FROM providers
+            WHERE location IS NOT NULL
+              AND ST_DWithin(location, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, %s)
+            ORDER BY distance_miles ASC
+            """,
+            (LON, LAT, LON, LAT, 10 * 1609.34),
+        ),
+
+        # ---------------- analytics ----------------
+        BenchQuery(
+            "analytics.provider_breakdown", "app/services/provider_counters.py:window_counts",
+            """
+            SELECT event_type, SUM(count) AS count
+            FROM provider_activity_hourly
+            WHERE provider_id = %s AND hour >= %s AND hour < %s
+            GROUP BY event_type
+            """,
+            (1, last_30d, now),
+        ),
+        BenchQuery(
+            "analytics.providers_top", "app/api/v1/analytics.py:providers_top",
+            """
+            SELECT p.id, p.name, p.city, p.state, p.services, ps.views, ps.phone_clicks,
+                   ps.website_clicks, ps.conversions,
+                   ROUND(ps.conversions::numeric / NULLIF(ps.views, 0) * 100, 2) AS conversion_rate,
+                   ps.last_event_at
+            FROM provider_stats ps
+            JOIN providers p ON p.id = ps.provider_id
+            ORDER BY ps.views DESC, ps.conversions DESC
+            LIMIT %s
+            """,
+            (25,),
+        ),
+        BenchQuery(
+            "analytics.unmet_demand", "app/services/search_demand.py:top_demand",
+            """
+            SELECT query, NULLIF(city, '') AS city, NULLIF(state, '') AS state,
+                   SUM(searches) AS searches, SUM(unmet) AS unmet, SUM(low_supply) AS low_supply
+            FROM search_demand_daily
+            WHERE day >= %s
+            GROUP BY query, city, state
+            ORDER BY searches DESC
+            LIMIT %s
+            """,
+            (last_30d.date(), 50),
+        ),
+        BenchQuery(
+            "analytics.overview_events", "app/api/v1/analytics.py:get_overview",
+            """
+            SELECT event_type, COUNT(*) AS count
+            FROM user_activity
+            WHERE timestamp >= %s
+            GROUP BY event_type
+            """,
+            (last_7d,),
+        ),
+        BenchQuery(
+            "analytics.overview_sessions", "app/api/v1/analytics.py:get_overview",
+            "SELECT COUNT(DISTINCT session_id) AS sessions FROM user_activity WHERE timestamp >= %s",
+            (last_7d,),
+        ),
+        BenchQuery(
+            "analytics.window_hour", "app/api/v1/analytics.py:get_overview_window",
+            """
+            SELECT event_type, COUNT(*) AS count
+            FROM user_activity
+            WHERE timestamp >= %s
+            GROUP BY event_type
+            """,
+            (last_hour,),
+        ),
+        BenchQuery(
+            "personalization.session_history", "analytics/personalization_engine.py:get_user_preferences",
+            """
+            SELECT metadata, event_type
+            FROM user_activity
+            WHERE session_id = %s
+            ORDER BY timestamp DESC
+            LIMIT 20
+            """,
+            (hashlib.md5(b"session1").hexdigest(),),  # seed.py session ids
+        ),
+    ]
+
+    # ---------------- ProviderRepository ----------------
+    sql, params = _capture(lambda r: r.search_basic(RARE_WORD, 50))
+    queries.append(BenchQuery("repo.search_basic", "app/repositories/provider.py", sql, params))
+
+    sql, params = _capture(lambda r: r.search_fuzzy(RARE_WORD, 50))
+    queries.append(BenchQuery(
+        "repo.search_fuzzy", "app/repositories/provider.py", sql, params,
+        allow_seq_scan=("providers",),
+        notes="similarity(name, q) > 0.3 cannot use the trigram index; name % q can",
+    ))
+
+    sql, params = _capture(lambda r: r.search_nearby(LAT, LON, 10 * 1609.34, 50))
+    queries.append(BenchQuery("repo.search_nearby", "app/repositories/provider.py", sql, params))
+
+    sql, params = _capture(lambda r: r.get_by_id(42))
+    queries.append(BenchQuery("repo.get_by_id", "app/repositories/provider.py", sql, params))
+
+    return queries
+
+
+def by_name(queries: List[BenchQuery]) -> Dict[str, BenchQuery]:
+    return {q.name: q for q in queries}
@@ -0,0 +1,99 @@
+-- ============================================================
+--   Benchmark Schema — providers + analytics tables
+-- ============================================================
+-- Mirrors the production tables and the indexes the hot queries
+-- rely on. Loaded into a throwaway database by
+-- `python -m benchmarks.sql_bench --seed`; never run it against
+-- the application database (it drops the tables first).
+
+CREATE EXTENSION IF NOT EXISTS postgis;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+DROP TABLE IF EXISTS search_demand_daily;
+DROP TABLE IF EXISTS provider_activity_hourly;
+DROP TABLE IF EXISTS provider_stats;
+DROP TABLE IF EXISTS user_activity;
+DROP TABLE IF EXISTS providers;
+
+CREATE TABLE providers (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    phone TEXT,
+    email TEXT,
+    website TEXT,
+    street TEXT,
+    city TEXT,
+    state TEXT,
+    zip TEXT,
+    full_address TEXT,
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    services TEXT,
+    location GEOGRAPHY(Point, 4326),
+    ingest_key TEXT,
+    content_hash TEXT,
+    content_updated_at TIMESTAMP
+);
+
+CREATE TABLE provider_stats (
+    provider_id INTEGER PRIMARY KEY REFERENCES providers(id),
+    views INTEGER NOT NULL DEFAULT 0,
+    searches INTEGER NOT NULL DEFAULT 0,
+    conversions INTEGER NOT NULL DEFAULT 0,
+    phone_clicks INTEGER NOT NULL DEFAULT 0,
+    website_clicks INTEGER NOT NULL DEFAULT 0,
+    last_event_at TIMESTAMP
+);
+
+CREATE TABLE user_activity (
+    id BIGSERIAL PRIMARY KEY,
+    event_type TEXT NOT NULL,
+    provider_id INTEGER,
+    user_id INTEGER,
+    session_id TEXT,
+    device_id TEXT,
+    ip_hash TEXT,
+    source TEXT,
+    metadata JSONB,
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE search_demand_daily (
+    day DATE NOT NULL,
+    query TEXT NOT NULL,
+    city TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL DEFAULT '',
+    unmet INTEGER NOT NULL DEFAULT 0,
+    low_supply INTEGER NOT NULL DEFAULT 0,
+    searches INTEGER NOT NULL DEFAULT 0,
+    last_seen_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (day, query, city, state)
+);
+
+CREATE TABLE provider_activity_hourly (
+    provider_id INTEGER NOT NULL,
+    hour TIMESTAMP NOT NULL,
+    event_type TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (provider_id, hour, event_type)
+);
+
+-- Loaded after the data (bulk insert first, then build indexes)
+-- by seed.create_indexes()
+-- @indexes
+CREATE UNIQUE INDEX idx_providers_ingest_key ON providers(ingest_key);
+CREATE INDEX idx_providers_name_trgm ON providers USING gin (name gin_trgm_ops);
+CREATE INDEX idx_providers_city_trgm ON providers USING gin (city gin_trgm_ops);
+CREATE INDEX idx_providers_state_trgm ON providers USING gin (state gin_trgm_ops);
+CREATE INDEX idx_providers_zip_trgm ON providers USING gin (zip gin_trgm_ops);
+CREATE INDEX idx_providers_services_trgm ON providers USING gin (services gin_trgm_ops);
+CREATE INDEX idx_providers_location ON providers USING gist (location);
+
+CREATE INDEX idx_search_demand_daily_day ON search_demand_daily (day) INCLUDE (query, city, state, searches, unmet, low_supply);
+CREATE INDEX idx_provider_stats_rank ON provider_stats (views DESC, conversions DESC);
+
+CREATE INDEX idx_user_activity_ts ON user_activity (timestamp);
+CREATE INDEX idx_user_activity_provider_ts ON user_activity (provider_id, timestamp);
+CREATE INDEX idx_user_activity_type_ts ON user_activity (event_type, timestamp);
+CREATE INDEX idx_user_activity_session_ts ON user_activity (session_id, timestamp);
+CREATE INDEX idx_user_activity_user_ts ON user_activity (user_id, timestamp);
@@ -0,0 +1,220 @@
+"""
+Benchmark Seeding - Synthetic providers and analytics at a chosen scale
+Location: benchmarks/seed.py
+
+Everything is generated server-side with generate_series(), so a
+1M-row user_activity table seeds in seconds instead of minutes of
+client round-trips. setseed() makes every run produce the same data.
+
+Data shape (close enough to production for the planner):
+- providers spread over ~25 metro areas, ~0.2% with a rare name word
+  ("Kaleidoscope") so selective text searches have something to hit
+- user_activity spread over `days`, weighted towards searches and views,
+  with sessions reused across events
+- provider_stats, search_demand_daily and provider_activity_hourly
+  aggregated from user_activity
+"""
+
+import os
+import time
+from typing import Dict
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "schema.sql")
+
+# Rare name word used by the selective text-search queries
+RARE_WORD = "Kaleidoscope"
+
+# (city, state, zip prefix, lat, lon)
+METROS = [
+    ("Miami", "FL", "331", 25.77, -80.19), ("Tampa", "FL", "336", 27.95, -82.46),
+    ("Orlando", "FL", "328", 28.54, -81.38), ("Atlanta", "GA", "303", 33.75, -84.39),
+    ("Houston", "TX", "770", 29.76, -95.37), ("Dallas", "TX", "752", 32.78, -96.80),
+    ("Austin", "TX", "787", 30.27, -97.74), ("Phoenix", "AZ", "850", 33.45, -112.07),
+    ("Denver", "CO", "802", 39.74, -104.99), ("Seattle", "WA", "981", 47.61, -122.33),
+    ("Portland", "OR", "972", 45.52, -122.68), ("San Diego", "CA", "921", 32.72, -117.16),
+    ("Los Angeles", "CA", "900", 34.05, -118.24), ("San Jose", "CA", "951", 37.34, -121.89),
+    ("Chicago", "IL", "606", 41.88, -87.63), ("Detroit", "MI", "482", 42.33, -83.05),
+    ("Columbus", "OH", "432", 39.96, -83.00), ("Charlotte", "NC", "282", 35.23, -80.84),
+    ("Nashville", "TN", "372", 36.16, -86.78), ("New York", "NY", "100", 40.71, -74.01),
+    ("Boston", "MA", "021", 42.36, -71.06), ("Philadelphia", "PA", "191", 39.95, -75.17),
+    ("Baltimore", "MD", "212", 39.29, -76.61), ("Minneapolis", "MN", "554", 44.98, -93.27),
+    ("Salt Lake City", "UT", "841", 40.76, -111.89),
+]
+
+_PROVIDERS_SQL = """
+WITH metros AS (
+    SELECT * FROM unnest(%(cities)s::text[], %(states)s::text[], %(zips)s::text[],
+                         %(lats)s::float8[], %(lons)s::float8[])
+        WITH ORDINALITY AS m(city, state, zip3, lat, lon, n)
+),
+gen AS (
+    SELECT g,
+           1 + (g %% %(n_metros)s) AS metro,
+           random() - 0.5 AS dlat,
+           random() - 0.5 AS dlon
+    FROM generate_series(1, %(count)s) AS g
+)
+INSERT INTO providers (name, phone, email, website, street, city, state, zip,
+                       full_address, latitude, longitude, services, location,
+                       ingest_key, content_hash)
+SELECT
+    (ARRAY['Bright','Little','Spectrum','Blue','Harbor','Sunrise','Pathways','Northstar'])[1 + (g %% 8)]
+        || CASE WHEN g %% 500 = 0 THEN ' ' || %(rare)s ELSE '' END
+        || ' ' || (ARRAY['ABA','Autism','Behavior','Therapy','Learning'])[1 + (g / 8 %% 5)]
+        || ' Center ' || g,
+    '(' || (200 + g %% 700) || ') 555-' || lpad((g %% 10000)::text, 4, '0'),
+    'info' || g || '@example.org',
+    'https://provider' || g || '.example.org',
+    (100 + g %% 9000) || ' Main St',
+    m.city, m.state,
+    m.zip3 || lpad((g %% 100)::text, 2, '0'),
+    (100 + g %% 9000) || ' Main St, ' || m.city || ', ' || m.state,
+    m.lat + dlat, m.lon + dlon,
+    (ARRAY['ABA Therapy','Speech Therapy','Occupational Therapy','Diagnostic Evaluation',
+           'Parent Training','Social Skills Groups'])[1 + (g %% 6)],
+    ST_SetSRID(ST_MakePoint(m.lon + dlon, m.lat + dlat), 4326)::geography,
+    'bench:' || g,
+    md5(g::text)
+FROM gen JOIN metros m ON m.n = gen.metro
+"""
+
+_ACTIVITY_SQL = """
+WITH gen AS (
+    SELECT g, random() AS r, random() AS p, random() AS t
+    FROM generate_series(1, %(count)s) AS g
+)
+INSERT INTO user_activity (event_type, provider_id, user_id, session_id, device_id,
+                           ip_hash, source, metadata, timestamp)
+SELECT
+    e.event_type,
+    CASE WHEN e.event_type LIKE 'provider_%%' THEN 1 + floor(p * p * %(providers)s)::int END,
+    CASE WHEN g %% 10 = 0 THEN 1 + (g %% %(users)s) END,
+    md5('session' || (g %% %(sessions)s)),
+    md5('device' || (g %% %(sessions)s)),
+    md5('ip' || (g %% %(sessions)s)),
+    e.source,
+    jsonb_build_object(
+        'query', (ARRAY['aba','autism','speech therapy','abs','aba near me'])[1 + (g %% 5)],
+        'city', (%(cities)s::text[])[1 + (g %% %(n_metros)s)],
+        'state', (%(states)s::text[])[1 + (g %% %(n_metros)s)]
+    ),
+    NOW() - make_interval(secs => t * %(days)s * 86400)
+FROM gen
+CROSS JOIN LATERAL (
+    SELECT * FROM (VALUES
+        (0.30, 'search', 'search'),
+        (0.45, 'nearby_search', 'map'),
+        (0.75, 'provider_view', 'direct'),
+        (0.82, 'provider_phone_click', 'click'),
+        (0.88, 'provider_website_click', 'click'),
+        (0.93, 'search_satisfied', 'search_result'),
+        (0.97, 'search_low_supply', 'search_result'),
+        (1.01, 'search_unmet', 'search_result')
+    ) AS w(upper, event_type, source)
+    WHERE gen.r < w.upper
+    ORDER BY w.upper
+    LIMIT 1
+) e
+"""
+
+_STATS_SQL = """
+INSERT INTO provider_stats (provider_id, views, searches, conversions, phone_clicks, website_clicks, last_event_at)
+SELECT provider_id,
+       COUNT(*) FILTER (WHERE event_type = 'provider_view'),
+       0,
+       COUNT(*) FILTER (WHERE event_type IN ('provider_phone_click', 'provider_website_click')),
+       COUNT(*) FILTER (WHERE event_type = 'provider_phone_click'),
+       COUNT(*) FILTER (WHERE event_type = 'provider_website_click'),
+       MAX(timestamp)
+FROM user_activity
+WHERE provider_id IS NOT NULL
+GROUP BY provider_id
+"""
+
+# Same buckets the worker maintains (app/services/search_demand.py); the
+# seeded queries are already lowercase, so no vocabulary mapping here.
+_DEMAND_SQL = """
+INSERT INTO search_demand_daily (day, query, city, state, unmet, low_supply, searches, last_seen_at)
+SELECT timestamp::date,
+       lower(trim(metadata->>'query')),
+       COALESCE(metadata->>'city', ''),
+       COALESCE(metadata->>'state', ''),
+       COUNT(*) FILTER (WHERE event_type = 'search_unmet'),
+       COUNT(*) FILTER (WHERE event_type = 'search_low_supply'),
+       COUNT(*),
+       MAX(timestamp)
+FROM user_activity
+WHERE event_type IN ('search_unmet', 'search_low_supply')
+GROUP BY 1, 2, 3, 4
+"""
+
+# Compacted provider counters (app/services/provider_counters.py)
+_HOURLY_SQL = """
+INSERT INTO provider_activity_hourly (provider_id, hour, event_type, count)
+SELECT provider_id, date_trunc('hour', timestamp), event_type, COUNT(*)
+FROM user_activity
+WHERE provider_id IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+
+def _schema_parts() -> tuple:
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        tables, indexes = f.read().split("-- @indexes", 1)
+    return tables, indexes
+
+
+def _metro_params() -> Dict[str, list]:
+    return {
+        "cities": [m[0] for m in METROS],
+        "states": [m[1] for m in METROS],
+        "zips": [m[2] for m in METROS],
+        "lats": [m[3] for m in METROS],
+        "lons": [m[4] for m in METROS],
+        "n_metros": len(METROS),
+    }
+
+
+def seed(conn, providers: int = 10_000, activity: int = 100_000, days: int = 90, random_seed: float = 0.42) -> Dict[str, float]:
+    """
+    Drop and recreate the benchmark tables, fill them, build indexes, ANALYZE.
+
+    Returns seconds spent per step.
+    """
+    tables, indexes = _schema_parts()
+    timings: Dict[str, float] = {}
+    cur = conn.cursor()
+
+    def step(name, sql, params=None):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        timings[name] = round(time.perf_counter() - start, 2)
+        print(f"   {name}: {timings[name]}s")
+
+    print(f"🌱 Seeding {providers:,} providers / {activity:,} events over {days} days")
+    step("schema", tables)
+    cur.execute("SELECT setseed(%s)", (random_seed,))
+
+    metros = _metro_params()
+    step("providers", _PROVIDERS_SQL, {**metros, "count": providers, "rare": RARE_WORD})
+    step("user_activity", _ACTIVITY_SQL, {
+        **metros,
+        "count": activity,
+        "providers": providers,
+        "sessions": max(activity // 8, 1),
+        "users": max(activity // 200, 1),
+        "days": days,
+    })
+    step("provider_stats", _STATS_SQL)
+    step("search_demand_daily", _DEMAND_SQL)
+    step("provider_activity_hourly", _HOURLY_SQL)
+    step("indexes", indexes)
+    conn.commit()
+
+    # ANALYZE outside the seeding transaction so the planner sees the data
+    conn.autocommit = True
+    step("analyze", "ANALYZE providers, provider_stats, user_activity, search_demand_daily, provider_activity_hourly")
+    conn.autocommit = False
+
+    cur.close()
+    return timings
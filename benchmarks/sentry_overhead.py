@@ -0,0 +1,186 @@
+"""
+Sentry Overhead - Per-request cost of each tracing/profiling setting
+Location: benchmarks/sentry_overhead.py
+
+Each setting runs in its own interpreter (Sentry integrations patch
+FastAPI/Starlette globally), drives a small in-process app that looks
+like the hot endpoints (search results, provider view, dashboard), and
+reports wall time and CPU time per request. Events go to a null
+transport, so nothing leaves the machine and network cost is excluded.
+
+Settings:
+    off                 no Sentry at all
+    errors_only         DSN set, no tracing
+    legacy_full         traces 1.0 + profiles 1.0 (the old main.py setup)
+    adaptive            init_observability() defaults (endpoint sampling)
+    adaptive_profiling  adaptive, with the profiling toggle at 1.0
+
+Run from the repo root:
+    python -m benchmarks.sentry_overhead --requests 3000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SETTINGS = ["off", "errors_only", "legacy_full", "adaptive", "adaptive_profiling"]
+
+NULL_DSN = "http://public@127.0.0.1:9/1"
+
+# Hot paths dominate real traffic, as in production
+PATHS = ["/search/basic"] * 6 + ["/providers/42"] * 3 + ["/analytics/overview"]
+
+
+def _null_transport():
+    from sentry_sdk.transport import Transport
+
+    class NullTransport(Transport):
+        def capture_event(self, event):
+            pass
+
+        def capture_envelope(self, envelope):
+            pass
+
+    return NullTransport
+
+
+def _configure(setting: str) -> None:
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.starlette import StarletteIntegration
+
+    # The benchmark's own httpx client must not be instrumented, so
+    # auto-enabling is off and the ASGI integrations are listed explicitly
+    common = dict(dsn=NULL_DSN, transport=_null_transport(), auto_enabling_integrations=False)
+    web = [StarletteIntegration(), FastApiIntegration()]
+
+    if setting == "off":
+        return
+    if setting == "errors_only":
+        sentry_sdk.init(integrations=web, **common)
+    elif setting == "legacy_full":
+        sentry_sdk.init(
+            integrations=web,
+            traces_sample_rate=1.0,
+            profiles_sample_rate=1.0,
+            **common,
+        )
+    else:
+        from app.core.observability import init_observability
+
+        if setting == "adaptive_profiling":
+            os.environ["SENTRY_PROFILES_RATE"] = "1.0"
+        init_observability(**common)
+
+
+def _build_app():
+    from fastapi import FastAPI
+
+    from app.core.timing import TimedJSONResponse, TimingMiddleware
+    from schemas.provider import ProviderRecord, provider_payload
+
+    app = FastAPI(default_response_class=TimedJSONResponse)
+    app.add_middleware(TimingMiddleware)
+
+    records = [
+        ProviderRecord(id=i, name=f"Provider {i}", city="Miami", state="FL", latitude=25.7, longitude=-80.2,
+                       services="ABA Therapy", phone="(305) 555-0100", website="https://example.org")
+        for i in range(50)
+    ]
+
+    @app.get("/search/basic")
+    async def search():
+        await asyncio.sleep(0)   # yield like a real I/O call
+        return TimedJSONResponse(provider_payload(records))
+
+    @app.get("/providers/{provider_id}")
+    async def provider(provider_id: int):
+        return TimedJSONResponse(records[provider_id % 50].as_dict())
+
+    @app.get("/analytics/overview")
+    async def overview():
+        return {"sessions": 123, "events": {"search": 1000, "provider_view": 400}}
+
+    return app
+
+
+async def _drive(app, requests: int, warmup: int):
+    import httpx
+
+    wall, cpu = [], []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(warmup + requests):
+            path = PATHS[i % len(PATHS)]
+            w0, c0 = time.perf_counter(), time.process_time()
+            resp = await client.get(path)
+            w1, c1 = time.perf_counter(), time.process_time()
+            assert resp.status_code == 200, resp.status_code
+            if i >= warmup:
+                wall.append((w1 - w0) * 1e6)
+                cpu.append((c1 - c0) * 1e6)
+    return wall, cpu
+
+
+def run_child(setting: str, requests: int, warmup: int) -> dict:
+    _configure(setting)
+    app = _build_app()
+    cpu_start = time.process_time()
+    wall, cpu = asyncio.run(_drive(app, requests, warmup))
+    total_cpu = time.process_time() - cpu_start   # includes profiler/transport threads
+
+    ordered = sorted(wall)
+    return {
+        "setting": setting,
+        "requests": requests,
+        "wall_us_mean": round(statistics.mean(wall), 1),
+        "wall_us_p50": round(ordered[len(ordered) // 2], 1),
+        "wall_us_p95": round(ordered[int(len(ordered) * 0.95) - 1], 1),
+        "cpu_us_per_request": round(total_cpu / (requests + warmup) * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request Sentry overhead by setting")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--settings", nargs="+", choices=SETTINGS, default=SETTINGS)
+    parser.add_argument("--out", default="benchmarks/results/sentry_overhead.json")
+    parser.add_argument("--child", choices=SETTINGS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.requests, args.warmup)))
+        return
+
+    results = []
+    for setting in args.settings:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.sentry_overhead", "--child", setting,
+             "--requests", str(args.requests), "--warmup", str(args.warmup)],
+            capture_output=True, text=True, env={**os.environ, "SENTRY_DSN": ""},
+        )
+        if out.returncode != 0:
+            print(f"❌ {setting}: {out.stderr.strip().splitlines()[-1] if out.stderr.strip() else out.returncode}")
+            continue
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    base = next((r for r in results if r["setting"] == "off"), None)
+    print(f"{'setting':<20} {'wall mean':>10} {'p50':>8} {'p95':>8} {'cpu/req':>9} {'overhead':>9}")
+    for r in results:
+        overhead = f"{r['cpu_us_per_request'] - base['cpu_us_per_request']:+.0f}us" if base else "-"
+        print(f"{r['setting']:<20} {r['wall_us_mean']:>8.0f}us {r['wall_us_p50']:>6.0f}us "
+              f"{r['wall_us_p95']:>6.0f}us {r['cpu_us_per_request']:>7.0f}us {overhead:>9}")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+    print(f"📁 Saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
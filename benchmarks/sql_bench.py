@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import psycopg2
+
+from benchmarks.plans import DEFAULT_MIN_ROWS, compare, measure, relation_rows
+from benchmarks.queries import build_queries
+from benchmarks.seed import seed
+
+# Run from the repo root against a THROWAWAY Postgres+PostGIS database:
+#   python -m benchmarks.sql_bench --dsn postgresql://localhost/autizim_bench --seed --scale 100k
+#   python -m benchmarks.sql_bench --dsn ... --baseline benchmarks/baselines/sql_100k.json
+#   python -m benchmarks.sql_bench --dsn ... --write-baseline benchmarks/baselines/sql_100k.json
+# Exit code 1 when a plan regresses to a seq scan (or p95 regresses past --max-slowdown).
+
+# --scale presets: providers, user_activity rows
+SCALES = {
+    "1k": (1_000, 10_000),
+    "10k": (10_000, 100_000),
+    "100k": (100_000, 1_000_000),
+    "1m": (1_000_000, 10_000_000),
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN-based SQL benchmark for provider and analytics queries")
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DATABASE_URL"), help="benchmark database (BENCH_DATABASE_URL)")
+    parser.add_argument("--seed", action="store_true", help="drop, recreate and seed the benchmark tables")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k")
+    parser.add_argument("--providers", type=int, help="override the preset provider count")
+    parser.add_argument("--activity", type=int, help="override the preset user_activity count")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="query names to run")
+    parser.add_argument("--min-rows", type=int, default=DEFAULT_MIN_ROWS, help="ignore seq scans on smaller tables")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--max-slowdown", type=float, default=0.0, help="fail when p95 > baseline * N (0 = off)")
+    parser.add_argument("--out", default="benchmarks/results/sql_latest.json")
+    parser.add_argument("--write-baseline", help="also save this run as a baseline")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        sys.exit("❌ Set --dsn or BENCH_DATABASE_URL")
+    if args.seed and args.dsn == os.getenv("DATABASE_URL"):
+        sys.exit("❌ Refusing to seed DATABASE_URL; point --dsn at a throwaway database")
+
+    conn = psycopg2.connect(args.dsn)
+    providers, activity = SCALES[args.scale]
+    providers = args.providers or providers
+    activity = args.activity or activity
+
+    seed_timings = None
+    if args.seed:
+        seed_timings = seed(conn, providers=providers, activity=activity)
+
+    row_counts = relation_rows(conn)
+    queries = build_queries()
+    if args.only:
+        queries = [q for q in queries if q.name in set(args.only)]
+
+    print(f"⏱️  {len(queries)} queries x {args.runs} runs "
+          f"(providers={row_counts.get('providers', 0):,}, user_activity={row_counts.get('user_activity', 0):,})")
+
+    results = {}
+    for query in queries:
+        try:
+            result = measure(conn, query, row_counts, runs=args.runs, warmup=args.warmup, min_rows=args.min_rows)
+        except psycopg2.Error as e:
+            conn.rollback()
+            print(f"❌ {query.name}: {e}".strip())
+            results[query.name] = {"source": query.source, "error": str(e).strip()}
+            continue
+        results[query.name] = result
+        lat = result["latency_ms"]
+        flag = "  ⚠️ seq scan: " + ", ".join(result["seq_scans"]) if result["seq_scans"] else ""
+        print(f"   {query.name:<36} p50 {lat['p50']:>8.2f}  p95 {lat['p95']:>8.2f}  p99 {lat['p99']:>8.2f} ms{flag}")
+
+    cur = conn.cursor()
+    cur.execute("SHOW server_version")
+    server_version = cur.fetchone()[0]
+    cur.close()
+    conn.close()
+
+    run = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_revision(),
+            "server_version": server_version,
+            "scale": args.scale,
+            "row_counts": {k: row_counts.get(k, 0) for k in ("providers", "provider_stats", "user_activity")},
+            "runs": args.runs,
+            "seed_seconds": seed_timings,
+        },
+        "queries": results,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    measured = {k: v for k, v in results.items() if "error" not in v}
+    report = compare(measured, baseline, args.max_slowdown)
+    report["failures"] += [f"{k}: {v['error']}" for k, v in results.items() if "error" in v]
+    run["regressions"] = report
+
+    for path in filter(None, (args.out, args.write_baseline)):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2, default=str)
+        print(f"📁 Saved: {path}")
+
+    for line in report["warnings"]:
+        print(f"⚠️  {line}")
+    for line in report["failures"]:
+        print(f"❌ {line}")
+
+    if report["failures"]:
+        sys.exit(1)
+    print("✅ No plan regressions")
+
+
+if __name__ == "__main__":
+    main()
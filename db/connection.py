@@ -1,27 +1,395 @@
-from sqlalchemy import create_engine
+import os
+import threading
+import time
+from dataclasses import dataclass
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import psycopg2
+import psycopg2.extensions
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
-from config.settings import DATABASE_URL
+from config.settings import DATABASE_REPLICA_URLS, DATABASE_URL, DB_READ_YOUR_WRITES_SECONDS
+from app.core.timing import REGISTRY, Counter, Gauge, Histogram, span
+
+# ============================================================
+# TIMED DBAPI CONNECTIONS
+# ============================================================
+# Every cursor (whatever cursor_factory the caller asks for) records
+# execute/fetch time as the db_query span of the current request.
+
+_TIMED_METHODS = ("execute", "executemany", "callproc", "copy_expert", "fetchone", "fetchmany", "fetchall")
+
+
+@lru_cache(maxsize=None)
+def _timed_cursor_class(factory):
+    def wrap(name):
+        method = getattr(factory, name)
+
+        def timed_method(self, *args, **kwargs):
+            with span("db_query"):
+                return method(self, *args, **kwargs)
+        return timed_method
+
+    return type(f"Timed{factory.__name__}", (factory,), {name: wrap(name) for name in _TIMED_METHODS})
+
+
+_CURSOR_ARGS = ("name", "cursor_factory", "withhold", "scrollable")   # connection.cursor() positionals
+
+
+class TimedConnection(psycopg2.extensions.connection):
+    def cursor(self, *args, **kwargs):
+        kwargs.update(zip(_CURSOR_ARGS, args))
+        factory = kwargs.pop("cursor_factory", None) or self.cursor_factory or psycopg2.extensions.cursor
+        return super().cursor(cursor_factory=_timed_cursor_class(factory), **kwargs)
+
+
+# ============================================================
+# POOL SIZING
+# ============================================================
+# One engine per process, shared by db.connection and app.core.database.
+# Every API process on every host draws from the same Postgres budget:
+#
+#   per_process = (DB_MAX_CONNECTIONS - DB_RESERVED_CONNECTIONS)
+#                 // (WEB_CONCURRENCY * API_INSTANCES)
+#
+# capped at DB_POOL_MAX_PER_PROCESS and split 2:1 into pool_size
+# (steady state) and max_overflow (burst). DB_POOL_SIZE / DB_MAX_OVERFLOW
+# override the computed values. The server's real max_connections is
+# checked on the first connect and a warning printed if the configured
+# budget is larger.
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class PoolSizing:
+    pool_size: int
+    max_overflow: int
+    processes: int
+    budget: int
+
+    @property
+    def per_process(self) -> int:
+        return self.pool_size + self.max_overflow
+
+
+def pool_sizing(
+    max_connections: int,
+    reserved: int,
+    processes: int,
+    cap: int = 30,
+) -> PoolSizing:
+    processes = max(1, processes)
+    budget = max(2, max_connections - reserved)
+    per_process = max(2, min(cap, budget // processes))
+    pool_size = max(1, per_process * 2 // 3)
+    return PoolSizing(pool_size, per_process - pool_size, processes, budget)
+
+
+def sizing_from_env() -> PoolSizing:
+    sizing = pool_sizing(
+        max_connections=_env_int("DB_MAX_CONNECTIONS", 100),
+        reserved=_env_int("DB_RESERVED_CONNECTIONS", 10),   # superuser, migrations, workers, psql
+        processes=_env_int("WEB_CONCURRENCY", 1) * _env_int("API_INSTANCES", 1),
+        cap=_env_int("DB_POOL_MAX_PER_PROCESS", 30),
+    )
+    return PoolSizing(
+        _env_int("DB_POOL_SIZE", sizing.pool_size),
+        _env_int("DB_MAX_OVERFLOW", sizing.max_overflow),
+        sizing.processes,
+        sizing.budget,
+    )
+
+# ============================================================
+# POOL METRICS
+# ============================================================
+# Labelled by pool: "primary", "replica0", "replica1", ...
+
+POOL_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "db_pool_checkout_wait_seconds", "Time to get a connection from the pool (incl. new connects)", ("pool",),
+))
+POOL_EVENTS = REGISTRY.register(Counter(
+    "db_pool_events_total", "Pool events", ("pool", "event"),   # connect, timeout, invalidate, validate_failed
+))
+ROUTED = REGISTRY.register(Counter(
+    "db_routed_total", "Checkouts by intent and chosen pool", ("intent", "pool"),
+))
+
+
+def _register_pool_gauges(name: str, pool: QueuePool) -> None:
+    for metric, help, fn in (
+        ("db_pool_size", "Configured steady-state pool size", pool.size),
+        ("db_pool_checked_out", "Connections currently checked out", pool.checkedout),
+        ("db_pool_checked_in", "Idle connections in the pool", pool.checkedin),
+        ("db_pool_overflow", "Connections open beyond pool_size (negative = not yet opened)", pool.overflow),
+    ):
+        REGISTRY.register(Gauge(metric, help, labels=("pool",))).track(fn, name)
+
+# ============================================================
+# BACKGROUND VALIDATION
+# ============================================================
+# Replaces pool_pre_ping (one extra round trip on every checkout). Every
+# DB_POOL_VALIDATE_SECONDS an idle connection at a time is checked out,
+# pinged and returned; dead ones are invalidated. The queue is FIFO, so
+# consecutive checkouts visit each idle connection once. A connection that
+# dies between passes is caught in acquire()/release() instead.
+
+class PoolValidator:
+    def __init__(self, engine, interval: float):
+        self.engine = engine
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"db-pool-validator-{self.engine.pool_name}", daemon=True,
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.validate_idle()
+            except Exception as e:
+                print(f"⚠️ Pool validation error ({self.engine.pool_name}): {e}")
+
+    def validate_idle(self) -> int:
+        """Ping every currently idle connection. Returns how many were dropped."""
+        pool = self.engine.pool
+        dropped = 0
+        for _ in range(pool.checkedin()):
+            if pool.checkedin() == 0:
+                break   # requests took them in the meantime
+            conn = pool.connect()
+            try:
+                cur = conn.dbapi_connection.cursor()
+                cur.execute("SELECT 1")
+                cur.close()
+                conn.dbapi_connection.rollback()
+            except Exception:
+                POOL_EVENTS.inc(self.engine.pool_name, "validate_failed")
+                conn.invalidate()
+                dropped += 1
+            finally:
+                conn.close()
+        return dropped
 
 # ============================================================
 # DATABASE ENGINE WITH CONNECTION POOLING
 # ============================================================
-# Production-safe configuration for ~10k active users.
-# Includes defensive protection against connection leaks.
+
+def build_engine(url: str, name: str = "primary", sizing: Optional[PoolSizing] = None):
+    sizing = sizing or sizing_from_env()
+    engine = create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=sizing.pool_size,
+        max_overflow=sizing.max_overflow,
+        pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),   # seconds to wait for a connection
+        pool_recycle=1800,                              # recycle connections every 30 min
+        pool_pre_ping=False,                            # see PoolValidator
+        connect_args={"connection_factory": TimedConnection},
+    )
+    engine.pool_name = name
+    engine.sizing = sizing
+    engine.validator = PoolValidator(engine, _env_int("DB_POOL_VALIDATE_SECONDS", 30))
+    checked_budget = []
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_conn, record):
+        POOL_EVENTS.inc(name, "connect")
+        engine.validator.start()
+        if not checked_budget:
+            checked_budget.append(True)
+            _check_budget(name, dbapi_conn, sizing)
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_conn, record, exception):
+        POOL_EVENTS.inc(name, "invalidate")
+
+    _register_pool_gauges(name, engine.pool)
+    return engine
+
+
+def _check_budget(name: str, dbapi_conn, sizing: PoolSizing) -> None:
+    try:
+        cur = dbapi_conn.cursor()
+        cur.execute("SHOW max_connections")
+        server_max = int(cur.fetchone()[0])
+        cur.close()
+        dbapi_conn.rollback()
+    except Exception:
+        return
+    if sizing.per_process * sizing.processes > server_max:
+        print(
+            f"⚠️ DB pool {name} over-commits max_connections: {sizing.processes} processes x "
+            f"{sizing.per_process} connections > {server_max} (set DB_MAX_CONNECTIONS)"
+        )
+
+# ============================================================
+# READ / WRITE ROUTING
 # ============================================================
+# Callers declare intent: get_db() / get_db(WRITE) always uses the primary;
+# get_db(READ) uses a replica when DATABASE_REPLICA_URLS is set. Replicas
+# are picked round-robin; one that fails to hand out a connection is
+# skipped for REPLICA_RETRY_SECONDS and the read falls back to the next
+# replica, then the primary.
+#
+# Read-your-writes (DB_READ_YOUR_WRITES_SECONDS > 0): a write made while a
+# session is bound (bind_session, called by the session helpers in the
+# routes) pins that session's reads to the primary for that long. Pins
+# live in Redis so every worker sees them, plus a local copy so the
+# writing worker does not need the round trip. Writes the session never
+# reads back (analytics logging on every request) pass pin=False, or
+# every active session would stay pinned to the primary.
+#
+# Local check with two servers (a streaming replica, or any second
+# database for routing only):
+#   DATABASE_REPLICA_URLS=postgresql://postgres:pw@localhost:5433/autizim_app \
+#   python -m scripts.db_routing
+
+READ = "read"
+WRITE = "write"
+
+REPLICA_RETRY_SECONDS = 30.0
+PIN_PREFIX = "db:pin:"
+
+_session: ContextVar[Optional[str]] = ContextVar("db_session", default=None)
+
+
+def bind_session(session_id: Optional[str]) -> None:
+    """Associate the current request with a session for read-your-writes."""
+    _session.set(session_id)
+
+
+def current_session() -> Optional[str]:
+    """Session bound to the current request, if any."""
+    return _session.get()
+
+
+class ReadYourWrites:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._local: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.seconds > 0
+
+    def pin(self, session_id: str) -> None:
+        from app.utils.redis_client import redis_client
+
+        self._local[session_id] = time.monotonic() + self.seconds
+        if len(self._local) > 10000:
+            now = time.monotonic()
+            self._local = {s: t for s, t in self._local.items() if t > now}
+        try:
+            redis_client.set(PIN_PREFIX + session_id, 1, px=int(self.seconds * 1000))
+        except Exception:
+            pass
+
+    def pinned(self, session_id: str) -> bool:
+        from app.utils.redis_client import redis_client
+
+        deadline = self._local.get(session_id)
+        if deadline is not None and deadline > time.monotonic():
+            return True
+        try:
+            return bool(redis_client.exists(PIN_PREFIX + session_id))
+        except Exception:
+            return False
+
+
+class Router:
+    def __init__(self, primary, replicas: List, pins: ReadYourWrites):
+        self.primary = primary
+        self.replicas = replicas
+        self.pins = pins
+        self._next = 0
+        self._down_until: Dict[str, float] = {}
+
+    def _replica_order(self) -> List:
+        start = self._next
+        self._next = (self._next + 1) % len(self.replicas)
+        now = time.monotonic()
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [e for e in ordered if self._down_until.get(e.pool_name, 0.0) <= now]
+
+    def candidates(self, intent: str, pin: bool = True) -> List:
+        """Engines to try, in order, for this intent."""
+        session_id = _session.get()
+        if intent != READ or not self.replicas:
+            if intent != READ and pin and session_id and self.pins.enabled:
+                self.pins.pin(session_id)
+            return [self.primary]
+        if session_id and self.pins.enabled and self.pins.pinned(session_id):
+            return [self.primary]
+        return self._replica_order() + [self.primary]
+
+    def mark_down(self, engine) -> None:
+        self._down_until[engine.pool_name] = time.monotonic() + REPLICA_RETRY_SECONDS
+        print(f"⚠️ Replica {engine.pool_name} unavailable; routing reads elsewhere for {REPLICA_RETRY_SECONDS:.0f}s")
+
+
+engine = build_engine(DATABASE_URL)
+replica_engines = [build_engine(url, f"replica{i}") for i, url in enumerate(DATABASE_REPLICA_URLS)]
+router = Router(engine, replica_engines, ReadYourWrites(DB_READ_YOUR_WRITES_SECONDS))
+
+
+def _checkout(target):
+    start = time.perf_counter()
+    try:
+        return target.raw_connection()
+    except PoolTimeoutError:
+        POOL_EVENTS.inc(target.pool_name, "timeout")
+        raise
+    finally:
+        POOL_WAIT_SECONDS.observe(time.perf_counter() - start, target.pool_name)
+
+
+def acquire(intent: str = WRITE, pin: bool = True):
+    """
+    Check out a pooled DBAPI connection for `intent` (records wait time and
+    timeouts). pin=False: a write that does not pin the bound session.
+    """
+    with span("db_acquire"):
+        candidates = router.candidates(intent, pin)
+        for target in candidates[:-1]:
+            try:
+                conn = _checkout(target)
+            except (OperationalError, psycopg2.OperationalError, PoolTimeoutError):
+                router.mark_down(target)
+                continue
+            ROUTED.inc(intent, target.pool_name)
+            return conn
+        conn = _checkout(candidates[-1])
+        ROUTED.inc(intent, candidates[-1].pool_name)
+        return conn
+
+
+def release(conn) -> None:
+    """Return a connection; one the server closed is dropped, not pooled."""
+    if conn.dbapi_connection is not None and conn.dbapi_connection.closed:
+        conn.invalidate()
+    conn.close()
 
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=20,          # steady-state connections
-    max_overflow=10,       # burst capacity
-    pool_timeout=30,       # seconds to wait for a connection
-    pool_recycle=1800,     # recycle connections every 30 min
-    pool_pre_ping=True     # auto-heal stale connections
-)
 
 @contextmanager
-def get_db():
+def get_db(intent: str = WRITE, pin: bool = True):
     """
     Context-managed database connection.
 
@@ -29,9 +397,11 @@ def get_db():
     - Connection is ALWAYS returned to the pool
     - Prevents connection leaks
     - Safe for high-concurrency FastAPI usage
+    - get_db(READ) may be served by a read replica
+    - get_db(pin=False) writes without pinning the session's reads
     """
-    conn = engine.raw_connection()
+    conn = acquire(intent, pin)
     try:
         yield conn
     finally:
-        conn.close()
+        release(conn)
@@ -0,0 +1,194 @@
+"""
+Schema Migrations - Versioned SQL migrations + startup schema check
+Location: db/migrations.py
+
+Migrations are the files in migrations/ named NNNN_description.sql,
+applied in version order, each in its own transaction, and recorded in
+schema_migrations (version, name, checksum, applied_at). A Postgres
+advisory lock keeps two deploys from migrating at once. Every migration
+is written to be idempotent, so databases that were migrated by hand
+before this table existed simply re-run them once.
+
+verify_schema() runs at API startup: a catalog query checks that the
+database is at the required version and has the canonical analytics
+columns, so request handlers never need to inspect the schema.
+
+    python -m scripts.migrate            # apply pending migrations
+    python -m scripts.migrate --status   # applied / pending / drifted
+"""
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+_FILENAME = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+_LOCK_ID = 4_046_001   # pg_advisory_lock key for the migration runner
+
+# Columns the analytics queries rely on (migrations/0003_canonical_analytics_tables.sql)
+REQUIRED_COLUMNS: Dict[str, tuple] = {
+    "provider_stats": ("provider_id", "views", "searches", "conversions", "phone_clicks",
+                       "website_clicks", "last_event_at"),
+    "user_activity": ("id", "event_type", "provider_id", "user_id", "session_id", "device_id",
+                      "ip_hash", "source", "metadata", "timestamp"),
+    "analytics_events_v2": ("id", "event_name", "provider_id", "specialty_id", "query_text", "city",
+                            "state", "radius_miles", "source", "metadata", "created_at",
+                            # migrations/0007_identity_stitching.sql
+                            "session_id", "device_id", "user_id"),
+    # migrations/0005_search_demand_daily.sql
+    "search_demand_daily": ("day", "query", "city", "state", "unmet", "low_supply", "searches"),
+    # migrations/0006_provider_activity_hourly.sql
+    "provider_activity_hourly": ("provider_id", "hour", "event_type", "count"),
+}
+
+
+class SchemaError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    path: str
+
+    @property
+    def sql(self) -> str:
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode("utf-8")).hexdigest()[:16]
+
+# ============================================================
+# DISCOVERY
+# ============================================================
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise SchemaError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def latest_version(directory: str = MIGRATIONS_DIR) -> int:
+    migrations = discover(directory)
+    return migrations[-1].version if migrations else 0
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def _ensure_table(cur) -> None:
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+
+
+def applied(conn) -> Dict[int, dict]:
+    cur = conn.cursor()
+    _ensure_table(cur)
+    conn.commit()
+    cur.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    rows = {v: {"name": n, "checksum": c, "applied_at": a} for v, n, c, a in cur.fetchall()}
+    cur.close()
+    return rows
+
+
+def status(conn, directory: str = MIGRATIONS_DIR) -> List[dict]:
+    done = applied(conn)
+    out = []
+    for m in discover(directory):
+        row = done.get(m.version)
+        state = "pending" if row is None else "drifted" if row["checksum"] != m.checksum else "applied"
+        out.append({"version": m.version, "name": m.name, "state": state,
+                    "applied_at": row["applied_at"] if row else None})
+    return out
+
+
+def migrate(conn, directory: str = MIGRATIONS_DIR, target: Optional[int] = None, dry_run: bool = False) -> List[Migration]:
+    """Apply pending migrations up to `target` (default: all). Returns what ran."""
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_lock(%s)", (_LOCK_ID,))
+    try:
+        done = applied(conn)
+        pending = [
+            m for m in discover(directory)
+            if m.version not in done and (target is None or m.version <= target)
+        ]
+        if dry_run:
+            return pending
+
+        for m in pending:
+            try:
+                cur.execute(m.sql)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                    (m.version, m.name, m.checksum),
+                )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise SchemaError(f"Migration {m.version:04d}_{m.name} failed: {e}") from e
+            print(f"✅ Applied {m.version:04d}_{m.name}")
+        return pending
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (_LOCK_ID,))
+        conn.commit()
+        cur.close()
+
+# ============================================================
+# STARTUP CHECK
+# ============================================================
+
+def verify_schema(conn, required_version: Optional[int] = None) -> None:
+    """Raise SchemaError unless the database is migrated and has the canonical columns."""
+    required_version = latest_version() if required_version is None else required_version
+
+    cur = conn.cursor()
+    cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    row = None
+    if cur.fetchone()[0]:
+        cur.execute("""
+            SELECT
+                (SELECT MAX(version) FROM schema_migrations),
+                (SELECT COALESCE(json_object_agg(table_name, cols), '{}'::json) FROM (
+                    SELECT table_name, array_agg(column_name::text) AS cols
+                    FROM information_schema.columns
+                    WHERE table_schema = current_schema() AND table_name = ANY(%s)
+                    GROUP BY table_name
+                ) t)
+        """, (list(REQUIRED_COLUMNS),))
+        row = cur.fetchone()
+    cur.close()
+    conn.rollback()
+
+    if row is None or row[0] is None:
+        raise SchemaError("schema_migrations is missing or empty; run: python -m scripts.migrate")
+    version, columns = row
+    if version < required_version:
+        raise SchemaError(f"Database schema is at {version:04d}, code needs {required_version:04d}; run: python -m scripts.migrate")
+
+    missing = [
+        f"{table}.{col}"
+        for table, cols in REQUIRED_COLUMNS.items()
+        for col in cols
+        if col not in set(columns.get(table, ()))
+    ]
+    if missing:
+        raise SchemaError(f"Missing columns: {', '.join(missing)}")
@@ -1,18 +1,4 @@
-from pydantic import BaseModel
-from typing import Optional
+# The provider schema lives in schemas/provider.py; kept for old imports.
+from schemas.provider import PROVIDER_COLUMNS, Provider, ProviderRecord
 
-class Provider(BaseModel):
-    id: int
-    name: str
-    phone: Optional[str]
-    email: Optional[str]
-    website: Optional[str]
-    street: Optional[str]
-    city: Optional[str]
-    state: Optional[str]
-    zip: Optional[str]
-    full_address: Optional[str]
-    latitude: Optional[float]
-    longitude: Optional[float]
-    services: Optional[str]
-    distance_miles: Optional[float] = None
+__all__ = ["PROVIDER_COLUMNS", "Provider", "ProviderRecord"]
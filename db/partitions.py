@@ -0,0 +1,243 @@
+"""
+Partition Management - Future partitions and retention for event tables
+Location: db/partitions.py
+
+user_activity and analytics_events_v2 are RANGE-partitioned on their time
+column (migrations/0004_partition_activity_tables.sql). This module:
+
+- creates the partitions for the current and the next `premake` periods
+  (day or month). A partition is named after its lower bound:
+  user_activity_p20261101. Where an existing partition (e.g. the
+  legacy one) already covers the start of a period, only the remainder
+  is created.
+- moves rows that landed in <table>_default into the partition created
+  for their range (the default partition only catches inserts when
+  maintenance has fallen behind).
+- drops whole partitions whose upper bound is older than the retention
+  window (DETACH + DROP instead of DELETE: no bloat, no vacuum).
+
+Called hourly by the analytics worker (creation only) and by
+scripts/manage_partitions.py from cron (creation + retention).
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from psycopg2 import sql
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    name: str
+    column: str
+    unit: str              # "day" | "month"
+    retention_days: int    # 0 = keep forever
+    premake: int           # periods created ahead of the current one
+
+
+TABLES = (
+    PartitionedTable("user_activity", "timestamp", "month", retention_days=730, premake=2),
+    PartitionedTable("analytics_events_v2", "created_at", "day", retention_days=180, premake=14),
+)
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    lower: Optional[date]   # None = MINVALUE
+    upper: Optional[date]   # None = MAXVALUE
+    is_default: bool = False
+
+# ============================================================
+# PERIODS
+# ============================================================
+
+def period_start(unit: str, day: date) -> date:
+    return day.replace(day=1) if unit == "month" else day
+
+
+def next_period(unit: str, start: date) -> date:
+    if unit == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def periods(table: PartitionedTable, today: date) -> List[Tuple[date, date]]:
+    """[lower, upper) for the current period and `premake` after it."""
+    out = []
+    lower = period_start(table.unit, today)
+    for _ in range(table.premake + 1):
+        upper = next_period(table.unit, lower)
+        out.append((lower, upper))
+        lower = upper
+    return out
+
+
+def partition_name(table: PartitionedTable, lower: date) -> str:
+    return f"{table.name}_p{lower:%Y%m%d}"
+
+# ============================================================
+# CATALOG
+# ============================================================
+
+_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def _bound(value: str) -> Optional[date]:
+    value = value.strip().strip("'")
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return date.fromisoformat(value[:10])
+
+
+def list_partitions(cur, table: PartitionedTable) -> List[Partition]:
+    cur.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname
+    """, (table.name,))
+    out = []
+    for name, bound in cur.fetchall():
+        if bound == "DEFAULT":
+            out.append(Partition(name, None, None, is_default=True))
+            continue
+        match = _BOUND.search(bound)
+        if match:
+            out.append(Partition(name, _bound(match.group(1)), _bound(match.group(2))))
+    return out
+
+
+def _covered_until(partitions: List[Partition], lower: date, upper: date) -> date:
+    """First day in [lower, upper) not covered by an existing partition."""
+    start = lower
+    for p in sorted((p for p in partitions if not p.is_default), key=lambda p: p.lower or date.min):
+        p_lower = p.lower or date.min
+        p_upper = p.upper or date.max
+        if p_lower <= start < p_upper:
+            start = p_upper
+    return min(start, upper)
+
+# ============================================================
+# CREATE
+# ============================================================
+
+def _create_partition(cur, table: PartitionedTable, lower: date, upper: date, default: Optional[str]) -> str:
+    name = partition_name(table, lower)
+    parent, part = sql.Identifier(table.name), sql.Identifier(name)
+    column = sql.Identifier(table.column)
+
+    stranded = False
+    if default:
+        cur.execute(
+            sql.SQL("SELECT 1 FROM {} WHERE {} >= %s AND {} < %s LIMIT 1").format(
+                sql.Identifier(default), column, column,
+            ),
+            (lower, upper),
+        )
+        stranded = cur.fetchone() is not None
+
+    if not stranded:
+        cur.execute(
+            sql.SQL("CREATE TABLE {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(part, parent),
+            (lower.isoformat(), upper.isoformat()),
+        )
+        return name
+
+    # Rows for this range sit in the default partition: detach it, create
+    # the partition, move the rows over, re-attach.
+    default_id = sql.Identifier(default)
+    cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(parent, default_id))
+    cur.execute(
+        sql.SQL("CREATE TABLE {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(part, parent),
+        (lower.isoformat(), upper.isoformat()),
+    )
+    cur.execute(
+        sql.SQL("WITH moved AS (DELETE FROM {} WHERE {} >= %s AND {} < %s RETURNING *) "
+                "INSERT INTO {} SELECT * FROM moved").format(default_id, column, column, part),
+        (lower, upper),
+    )
+    print(f"   ↪ moved {cur.rowcount} rows from {default} into {name}")
+    cur.execute(sql.SQL("ALTER TABLE {} ATTACH PARTITION {} DEFAULT").format(parent, default_id))
+    return name
+
+
+def ensure_partitions(conn, table: PartitionedTable, today: Optional[date] = None) -> List[str]:
+    """Create missing partitions for the current and upcoming periods."""
+    cur = conn.cursor()
+    if today is None:
+        cur.execute("SELECT current_date")
+        today = cur.fetchone()[0]
+
+    partitions = list_partitions(cur, table)
+    default = next((p.name for p in partitions if p.is_default), None)
+    created = []
+
+    for lower, upper in periods(table, today):
+        start = _covered_until(partitions, lower, upper)
+        if start >= upper:
+            continue
+        name = _create_partition(cur, table, start, upper, default)
+        partitions.append(Partition(name, start, upper))
+        created.append(name)
+
+    conn.commit()
+    cur.close()
+    return created
+
+# ============================================================
+# RETENTION
+# ============================================================
+
+def drop_expired(conn, table: PartitionedTable, today: Optional[date] = None, dry_run: bool = False) -> List[str]:
+    """Detach and drop partitions entirely older than the retention window."""
+    if table.retention_days <= 0:
+        return []
+
+    cur = conn.cursor()
+    if today is None:
+        cur.execute("SELECT current_date")
+        today = cur.fetchone()[0]
+    cutoff = today - timedelta(days=table.retention_days)
+
+    expired = [
+        p.name for p in list_partitions(cur, table)
+        if not p.is_default and p.upper is not None and p.upper <= cutoff
+    ]
+    if not dry_run:
+        for name in expired:
+            cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                sql.Identifier(table.name), sql.Identifier(name),
+            ))
+            cur.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+        conn.commit()
+    cur.close()
+    return expired
+
+
+def is_partitioned(conn, table: PartitionedTable) -> bool:
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.oid = to_regclass(%s)
+    """, (table.name,))
+    found = cur.fetchone() is not None
+    cur.close()
+    return found
+
+
+def maintain(conn, tables=TABLES, retention: bool = True, dry_run: bool = False) -> dict:
+    """ensure_partitions (+ drop_expired) for every partitioned table."""
+    report = {}
+    for table in tables:
+        if not is_partitioned(conn, table):
+            report[table.name] = {"skipped": "not partitioned (run the migration)"}
+            continue
+        created = [] if dry_run else ensure_partitions(conn, table)
+        dropped = drop_expired(conn, table, dry_run=dry_run) if retention else []
+        report[table.name] = {"created": created, "dropped": dropped}
+    return report
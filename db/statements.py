@@ -0,0 +1,132 @@
+"""
+Prepared Statements - Registry of hot queries, prepared once per connection
+Location: db/statements.py
+
+psycopg2 sends every query as text, so Postgres parses and plans it on
+each execution. For sub-millisecond lookups (provider by id, search,
+nearby, the analytics INSERTs) that is a large share of the time spent.
+
+Hot statements are declared once at import time:
+
+    PROVIDER_BY_ID = statement("provider_by_id", "SELECT ... WHERE id = %s")
+
+and run with:
+
+    execute(cur, PROVIDER_BY_ID, (provider_id,))
+
+On a connection's first use of a statement it is sent as a named
+PREPARE; later executions send only `EXECUTE name (params)`. The names
+prepared on a connection are tracked on the connection object, so a
+recycled or invalidated connection starts again from an empty set.
+Prepared statements are session state and survive ROLLBACK.
+
+Each execution is recorded in `db_statement_seconds{statement=...}`
+(served by /metrics).
+
+Set DB_PREPARED_STATEMENTS=false behind a transaction-mode pooler
+(PgBouncer), where session state does not follow the client; statements
+then run as plain text through the same call.
+"""
+
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Sequence
+
+import psycopg2.errors
+
+from app.core.timing import REGISTRY, Counter, Histogram
+
+ENABLED = os.getenv("DB_PREPARED_STATEMENTS", "true").lower() == "true"
+
+STATEMENT_SECONDS = REGISTRY.register(Histogram(
+    "db_statement_seconds", "Execution time per registered statement", ("statement",),
+))
+STATEMENT_PREPARES = REGISTRY.register(Counter(
+    "db_statement_prepares_total", "PREPAREs sent (once per statement per connection)", ("statement",),
+))
+
+_PLACEHOLDER = re.compile(r"%(%|s)")
+_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    sql: str                           # psycopg2 style: %s placeholders, %% for a literal %
+    server_sql: str = field(init=False, repr=False)
+    param_count: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        count = 0
+
+        def number(match):
+            nonlocal count
+            if match.group(1) == "%":
+                return "%"
+            count += 1
+            return f"${count}"
+
+        server_sql = _PLACEHOLDER.sub(number, self.sql.strip().rstrip(";"))
+        object.__setattr__(self, "server_sql", server_sql)
+        object.__setattr__(self, "param_count", count)
+
+    @property
+    def execute_sql(self) -> str:
+        if not self.param_count:
+            return f"EXECUTE {self.name}"
+        return f"EXECUTE {self.name} ({', '.join(['%s'] * self.param_count)})"
+
+# ============================================================
+# REGISTRY
+# ============================================================
+
+STATEMENTS: Dict[str, Statement] = {}
+
+
+def statement(name: str, sql: str) -> Statement:
+    """Declare a hot statement. Names are global across the app."""
+    if not _NAME.match(name):
+        raise ValueError(f"Invalid statement name: {name!r}")
+    stmt = Statement(name, sql)
+    existing = STATEMENTS.get(name)
+    if existing is not None and existing.server_sql != stmt.server_sql:
+        raise ValueError(f"Statement {name!r} is already registered with different SQL")
+    return STATEMENTS.setdefault(name, stmt)
+
+# ============================================================
+# EXECUTION
+# ============================================================
+
+def _prepared(conn):
+    """Names prepared on this DBAPI connection (None if it cannot hold them)."""
+    try:
+        return conn.__dict__.setdefault("prepared_statements", set())
+    except AttributeError:
+        return None   # plain psycopg2 connection without an instance dict
+
+
+def execute(cur, stmt: Statement, params: Sequence = ()) -> None:
+    """Run `stmt` on `cur`, preparing it on the connection first if needed."""
+    if len(params) != stmt.param_count:
+        raise ValueError(f"{stmt.name}: expected {stmt.param_count} params, got {len(params)}")
+
+    prepared = _prepared(cur.connection) if ENABLED else None
+    start = time.perf_counter()
+    try:
+        if prepared is None:
+            cur.execute(stmt.sql, params)
+            return
+
+        if stmt.name not in prepared:
+            cur.execute(f"PREPARE {stmt.name} AS {stmt.server_sql}")
+            prepared.add(stmt.name)
+            STATEMENT_PREPARES.inc(stmt.name)
+        try:
+            cur.execute(stmt.execute_sql, params)
+        except psycopg2.errors.InvalidSqlStatementName:
+            prepared.discard(stmt.name)   # DEALLOCATE/DISCARD ALL from elsewhere; re-prepare next time
+            raise
+    finally:
+        STATEMENT_SECONDS.observe(time.perf_counter() - start, stmt.name)
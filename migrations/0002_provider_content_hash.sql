@@ -0,0 +1,13 @@
+-- ============================================================
+--   Incremental Ingestion — Provider Content Hashes
+-- ============================================================
+-- ingest_key   : normalized identity (name + address) of a record
+-- content_hash : normalized hash of every content field
+-- Together they let a refresh classify rows as new / changed /
+-- unchanged and write only the deltas.
+
+ALTER TABLE providers ADD COLUMN IF NOT EXISTS ingest_key TEXT;
+ALTER TABLE providers ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE providers ADD COLUMN IF NOT EXISTS content_updated_at TIMESTAMP;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_providers_ingest_key ON providers(ingest_key);
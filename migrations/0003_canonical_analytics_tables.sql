@@ -0,0 +1,98 @@
+-- ============================================================
+--   Canonical Analytics Tables — provider_stats, user_activity,
+--   analytics_events_v2
+-- ============================================================
+-- Databases were created by hand over time, so provider_stats exists
+-- in two shapes (views/conversions vs total_views/total_*_clicks) and
+-- user_activity's time column is either `timestamp` or `created_at`.
+-- The API used to probe information_schema and branch per request.
+-- This brings every database to one shape; the queries in
+-- app/api/v1/analytics.py assume it and the startup check
+-- (db/migrations.py: verify_schema) enforces it.
+--
+-- Idempotent: creates what is missing, folds legacy columns into the
+-- canonical ones, then drops them.
+
+-- ---------------- provider_stats ----------------
+CREATE TABLE IF NOT EXISTS provider_stats (
+    provider_id INTEGER PRIMARY KEY
+);
+
+ALTER TABLE provider_stats ADD COLUMN IF NOT EXISTS views INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE provider_stats ADD COLUMN IF NOT EXISTS searches INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE provider_stats ADD COLUMN IF NOT EXISTS conversions INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE provider_stats ADD COLUMN IF NOT EXISTS phone_clicks INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE provider_stats ADD COLUMN IF NOT EXISTS website_clicks INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE provider_stats ADD COLUMN IF NOT EXISTS last_event_at TIMESTAMP;
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'provider_stats' AND column_name = 'total_views'
+    ) THEN
+        UPDATE provider_stats SET
+            views = GREATEST(views, COALESCE(total_views, 0)),
+            phone_clicks = GREATEST(phone_clicks, COALESCE(total_phone_clicks, 0)),
+            website_clicks = GREATEST(website_clicks, COALESCE(total_website_clicks, 0)),
+            conversions = GREATEST(conversions, COALESCE(total_phone_clicks, 0) + COALESCE(total_website_clicks, 0));
+
+        ALTER TABLE provider_stats DROP COLUMN total_views;
+        ALTER TABLE provider_stats DROP COLUMN IF EXISTS total_phone_clicks;
+        ALTER TABLE provider_stats DROP COLUMN IF EXISTS total_website_clicks;
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'provider_stats' AND column_name = 'last_updated'
+    ) THEN
+        UPDATE provider_stats SET last_event_at = COALESCE(last_event_at, last_updated);
+        ALTER TABLE provider_stats DROP COLUMN last_updated;
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_provider_stats_rank ON provider_stats (views DESC, conversions DESC);
+
+-- ---------------- user_activity ----------------
+CREATE TABLE IF NOT EXISTS user_activity (
+    id BIGSERIAL PRIMARY KEY,
+    event_type TEXT NOT NULL
+);
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'user_activity' AND column_name = 'created_at'
+    ) AND NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'user_activity' AND column_name = 'timestamp'
+    ) THEN
+        ALTER TABLE user_activity RENAME COLUMN created_at TO "timestamp";
+    END IF;
+END $$;
+
+ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS provider_id INTEGER;
+ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS user_id INTEGER;
+ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS session_id TEXT;
+ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS device_id TEXT;
+ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS ip_hash TEXT;
+ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS source TEXT;
+ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS metadata JSONB;
+ALTER TABLE user_activity ADD COLUMN IF NOT EXISTS "timestamp" TIMESTAMP NOT NULL DEFAULT NOW();
+
+-- ---------------- analytics_events_v2 ----------------
+CREATE TABLE IF NOT EXISTS analytics_events_v2 (
+    id BIGSERIAL PRIMARY KEY,
+    event_name TEXT NOT NULL
+);
+
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS provider_id INTEGER;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS specialty_id INTEGER;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS query_text TEXT;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS city TEXT;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS state TEXT;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS radius_miles INTEGER;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS source TEXT;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS metadata JSONB;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS created_at TIMESTAMP NOT NULL DEFAULT NOW();
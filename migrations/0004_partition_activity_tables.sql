@@ -0,0 +1,85 @@
+-- ============================================================
+--   Time Partitioning — user_activity + analytics_events_v2
+-- ============================================================
+-- Turns both event tables into RANGE-partitioned parents on their time
+-- column. Existing rows are not copied: the old heap is renamed to
+-- <table>_legacy and attached as the partition FROM (MINVALUE) TO
+-- (tomorrow). A CHECK constraint proves the bound first, so ATTACH does
+-- not scan again. The scan for that constraint runs under the table
+-- lock; run this in a low-traffic window.
+--
+-- After this migration (scripts.migrate runs it for you):
+--   python -m scripts.manage_partitions      # create upcoming partitions
+-- Until then rows land in <table>_default; the script moves them into
+-- their partition when it creates it. The analytics worker keeps future
+-- partitions created; retention (DROP of whole partitions) is run by the
+-- same script from cron.
+--
+-- Indexes:
+--   BRIN on the time column, built on every partition including legacy
+--   (tiny, and time-ordered inserts keep it selective).
+--   Btree lookups are declared ON ONLY the parent: partitions created
+--   from now on get them; the legacy partition keeps its own indexes
+--   (hence the _part names, which do not collide with them).
+--
+-- Idempotent: a table that is already partitioned is skipped. Runs in
+-- one transaction (python -m scripts.migrate).
+
+CREATE OR REPLACE FUNCTION pg_temp.partition_by_range(tbl TEXT, col TEXT) RETURNS VOID AS $$
+DECLARE
+    legacy TEXT := tbl || '_legacy';
+    cutover TIMESTAMP := date_trunc('day', now()::timestamp) + INTERVAL '1 day';
+    seq TEXT;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = tbl AND c.relnamespace = current_schema()::regnamespace
+    ) THEN
+        RAISE NOTICE '% is already partitioned, skipping', tbl;
+        RETURN;
+    END IF;
+
+    EXECUTE format('LOCK TABLE %I IN ACCESS EXCLUSIVE MODE', tbl);
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', tbl, legacy);
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS) PARTITION BY RANGE (%I)',
+        tbl, legacy, col
+    );
+
+    -- The id sequence must outlive the legacy partition (retention drops it)
+    seq := pg_get_serial_sequence(legacy, 'id');
+    IF seq IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', seq, tbl);
+    END IF;
+
+    EXECUTE format(
+        'ALTER TABLE %I ADD CONSTRAINT %I CHECK (%I IS NOT NULL AND %I < %L)',
+        legacy, legacy || '_bound', col, col, cutover
+    );
+    EXECUTE format(
+        'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (MINVALUE) TO (%L)',
+        tbl, legacy, cutover
+    );
+    EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', legacy, legacy || '_bound');
+
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', tbl || '_default', tbl);
+
+    EXECUTE format(
+        'CREATE INDEX %I ON %I USING brin (%I) WITH (pages_per_range = 32)',
+        'idx_' || tbl || '_' || col || '_brin', tbl, col
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT pg_temp.partition_by_range('user_activity', 'timestamp');
+SELECT pg_temp.partition_by_range('analytics_events_v2', 'created_at');
+
+-- Lookups used by the dashboards and personalization (new partitions)
+CREATE INDEX IF NOT EXISTS idx_user_activity_provider_ts_part ON ONLY user_activity (provider_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_user_activity_type_ts_part ON ONLY user_activity (event_type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_user_activity_session_ts_part ON ONLY user_activity (session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_user_activity_user_ts_part ON ONLY user_activity (user_id, timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_events_v2_name_ts_part ON ONLY analytics_events_v2 (event_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_events_v2_provider_ts_part ON ONLY analytics_events_v2 (provider_id, created_at);
@@ -0,0 +1,30 @@
+-- ============================================================
+--   search_demand_daily — incrementally maintained unmet demand
+-- ============================================================
+-- One row per (day, canonical query, city, state) for searches that
+-- returned no or too few providers. The analytics worker upserts into it
+-- as search_unmet / search_low_supply events arrive
+-- (app/services/search_demand.py), and /analytics/unmet-demand reads
+-- top-N from it instead of grouping JSONB over user_activity.
+--
+-- city/state are '' when unknown so they can be part of the key.
+--
+-- Rebuild or backfill from user_activity with:
+--   python -m scripts.rebuild_search_demand --days 365
+
+CREATE TABLE IF NOT EXISTS search_demand_daily (
+    day DATE NOT NULL,
+    query TEXT NOT NULL,
+    city TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL DEFAULT '',
+    unmet INTEGER NOT NULL DEFAULT 0,
+    low_supply INTEGER NOT NULL DEFAULT 0,
+    searches INTEGER NOT NULL DEFAULT 0,
+    last_seen_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (day, query, city, state)
+);
+
+-- Window scans (TOP_DEMAND) read only this index: day range -> keys and
+-- every summed count, so the report can be an index-only scan
+CREATE INDEX IF NOT EXISTS idx_search_demand_daily_day
+    ON search_demand_daily (day) INCLUDE (query, city, state, searches, unmet, low_supply);
@@ -0,0 +1,20 @@
+-- ============================================================
+--   provider_activity_hourly — compacted provider event counters
+-- ============================================================
+-- Provider events are counted in Redis as they arrive, one hash per
+-- (hour, provider) (app/services/provider_counters.py). The analytics
+-- worker periodically copies closed hours here; the provider stats
+-- endpoint sums this table for hours before the compaction watermark
+-- and the live Redis buckets after it, so dashboards never scan
+-- user_activity.
+--
+-- `hour` is the UTC start of the bucket. Compaction writes the full
+-- bucket count (not an increment), so re-running it is harmless.
+
+CREATE TABLE IF NOT EXISTS provider_activity_hourly (
+    provider_id INTEGER NOT NULL,
+    hour TIMESTAMP NOT NULL,
+    event_type TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (provider_id, hour, event_type)
+);
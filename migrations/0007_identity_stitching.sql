@@ -0,0 +1,32 @@
+-- ============================================================
+--   Identity stitching — identity columns + anonymous-row indexes
+-- ============================================================
+-- Logins attach earlier anonymous activity to the user
+-- (analytics/identity_stitching.py, run by app/workers/identity_worker.py).
+-- The stitching updates look rows up by session_id or device_id among
+-- rows that have no user yet, in small chunks. The partial indexes below
+-- match exactly those rows, so each chunk is an index lookup rather than
+-- a table scan, and they shrink as history is stitched.
+--
+-- analytics_events_v2 gains the same identity columns as user_activity;
+-- log_event fills session_id / device_id, stitching fills user_id.
+--
+-- On partitioned tables CREATE INDEX on the parent builds the index on
+-- every partition, and later partitions inherit it.
+
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS session_id TEXT;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS device_id TEXT;
+ALTER TABLE analytics_events_v2 ADD COLUMN IF NOT EXISTS user_id INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_user_activity_anon_session
+    ON user_activity (session_id) WHERE user_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_user_activity_anon_device
+    ON user_activity (device_id) WHERE user_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_events_v2_anon_session
+    ON analytics_events_v2 (session_id) WHERE user_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_events_v2_anon_device
+    ON analytics_events_v2 (device_id) WHERE user_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_events_v2_user_ts
+    ON analytics_events_v2 (user_id, created_at);
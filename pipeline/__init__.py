@@ -0,0 +1 @@
+# Data pipeline package
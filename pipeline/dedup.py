@@ -0,0 +1,381 @@
+"""
+Provider Entity Resolution - Blocking + fuzzy matching + golden records
+Location: pipeline/dedup.py
+
+The same clinic arrives from ABAFinder, YellowPages, BHCOE and SerpAPI with
+slightly different names, addresses and phone formats. Records are first
+grouped into small blocks (zip, geohash cell, phone digits) and compared
+pairwise only inside a block, which keeps resolution near-linear. Matches
+are clustered with union-find and each cluster becomes one golden record
+that keeps the provenance of every field.
+"""
+
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pipeline.ingest import clean_value, normalize_phone
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+MAX_BLOCK_SIZE = 200        # larger blocks are split further (see _split_block)
+GEOHASH_PRECISION = 6       # ~1.2km x 0.6km cells
+
+NAME_MATCH = 0.88           # name similarity alone (with zip / geo agreement)
+NAME_WITH_PHONE = 0.7       # name similarity when phone digits agree
+ADDRESS_MATCH = 0.75        # street similarity backing a name match
+PHONE_STREET_MATCH = 0.5    # street similarity backing a phone match
+
+# Lower number wins ties when picking golden field values
+SOURCE_PRIORITY = {
+    "abafinder": 0,
+    "bhcoe": 1,
+    "serpapi": 2,
+    "google": 2,
+    "yellowpages": 3,
+}
+
+GOLDEN_FIELDS = (
+    "name", "phone", "email", "website", "street", "city",
+    "state", "zip", "full_address", "latitude", "longitude", "services",
+)
+
+_NAME_STOPWORDS = {
+    "llc", "inc", "pllc", "pc", "pa", "ltd", "co", "corp", "the", "and", "of",
+}
+
+_ADDRESS_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "drive": "dr",
+    "lane": "ln", "court": "ct", "boulevard": "blvd", "parkway": "pkwy",
+    "place": "pl", "terrace": "ter", "circle": "cir", "highway": "hwy",
+    "suite": "ste", "north": "n", "south": "s", "east": "e", "west": "w",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_ZIP_RE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# ============================================================
+# NORMALIZATION
+# ============================================================
+
+def name_tokens(name: Any) -> List[str]:
+    tokens = _TOKEN_RE.findall((clean_value(name) or "").lower())
+    return [t for t in tokens if t not in _NAME_STOPWORDS]
+
+
+def street_tokens(street: Any) -> List[str]:
+    tokens = _TOKEN_RE.findall((clean_value(street) or "").lower())
+    return [_ADDRESS_ABBREVIATIONS.get(t, t) for t in tokens]
+
+
+def zip5(record: Dict[str, Any]) -> str:
+    for value in (record.get("zip"), record.get("full_address")):
+        match = _ZIP_RE.search(clean_value(value) or "")
+        if match:
+            return match.group(1)
+    return ""
+
+
+def _coord(value: Any) -> Optional[float]:
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if f != f else f  # NaN check
+
+
+def geohash(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Standard base32 geohash (no external dependency)."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars, bits, bit_count, even = [], 0, 0, True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                bits = (bits << 1) | 1
+                lon_lo = mid
+            else:
+                bits <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+
+    return "".join(chars)
+
+# ============================================================
+# PREPARED RECORDS
+# ============================================================
+
+@dataclass
+class _Prepared:
+    index: int
+    record: Dict[str, Any]
+    name_tokens: List[str]
+    name_key: str
+    street_key: str
+    phone: str
+    zip: str
+    cell: str
+
+
+def _street_of(record: Dict[str, Any]) -> str:
+    street = clean_value(record.get("street"))
+    if street:
+        return street
+    full = clean_value(record.get("full_address")) or ""
+    return full.split(",")[0]
+
+
+def _prepare(index: int, record: Dict[str, Any]) -> _Prepared:
+    lat, lon = _coord(record.get("latitude")), _coord(record.get("longitude"))
+    tokens = name_tokens(record.get("name"))
+    phone = normalize_phone(record.get("phone"))
+    return _Prepared(
+        index=index,
+        record=record,
+        name_tokens=tokens,
+        name_key=" ".join(tokens),
+        street_key=" ".join(street_tokens(_street_of(record))),
+        phone=phone if len(phone) == 10 else "",
+        zip=zip5(record),
+        cell=geohash(lat, lon) if lat is not None and lon is not None else "",
+    )
+
+# ============================================================
+# BLOCKING
+# ============================================================
+
+def _block_keys(p: _Prepared) -> List[str]:
+    keys = []
+    if p.zip:
+        keys.append(f"zip:{p.zip}")
+    if p.cell:
+        keys.append(f"geo:{p.cell}")
+    if p.phone:
+        keys.append(f"phone:{p.phone}")
+    return keys
+
+
+# Oversized blocks (dense metro zip) are split by each key in turn
+_SUB_BLOCK_KEYS = (
+    lambda p: p.name_tokens[0] if p.name_tokens else "",
+    lambda p: " ".join(p.name_tokens[:2]),
+    lambda p: p.cell,
+)
+
+
+def _split_block(members: List[_Prepared], depth: int, windowed: List[int]) -> List[List[_Prepared]]:
+    if len(members) <= MAX_BLOCK_SIZE:
+        return [members] if len(members) > 1 else []
+
+    if depth == len(_SUB_BLOCK_KEYS):
+        # Still too large: overlapping windows over name order, so every
+        # record is compared with its nearest names instead of dropped
+        members = sorted(members, key=lambda p: p.name_key)
+        windowed[0] += len(members)
+        step = MAX_BLOCK_SIZE // 2
+        return [members[i:i + MAX_BLOCK_SIZE] for i in range(0, len(members) - step, step)]
+
+    sub: Dict[str, List[_Prepared]] = defaultdict(list)
+    for p in members:
+        sub[_SUB_BLOCK_KEYS[depth](p)].append(p)
+    return [block for m in sub.values() for block in _split_block(m, depth + 1, windowed)]
+
+
+def build_blocks(prepared: List[_Prepared]) -> List[List[_Prepared]]:
+    """Group records sharing a zip, geohash cell or phone number."""
+    blocks: Dict[str, List[_Prepared]] = defaultdict(list)
+    for p in prepared:
+        for key in _block_keys(p):
+            blocks[key].append(p)
+
+    result, windowed = [], [0]
+    for members in blocks.values():
+        result.extend(_split_block(members, 0, windowed))
+    if windowed[0]:
+        print(f"   ⚠️ {windowed[0]} records in blocks still over {MAX_BLOCK_SIZE} after sub-blocking; "
+              f"compared within sorted-name windows")
+    return result
+
+# ============================================================
+# PAIR SCORING
+# ============================================================
+
+def name_similarity(a: _Prepared, b: _Prepared) -> float:
+    if not a.name_key or not b.name_key:
+        return 0.0
+    if a.name_key == b.name_key:
+        return 1.0
+    set_a, set_b = set(a.name_tokens), set(b.name_tokens)
+    jaccard = len(set_a & set_b) / len(set_a | set_b)
+    containment = len(set_a & set_b) / min(len(set_a), len(set_b))
+    ratio = SequenceMatcher(None, a.name_key, b.name_key).ratio()
+    return max(ratio, (jaccard + containment) / 2)
+
+
+def street_similarity(a: _Prepared, b: _Prepared) -> float:
+    if not a.street_key or not b.street_key:
+        return 0.0
+    # Different building numbers are different places
+    num_a = a.street_key.split(" ", 1)[0]
+    num_b = b.street_key.split(" ", 1)[0]
+    if num_a.isdigit() and num_b.isdigit() and num_a != num_b:
+        return 0.0
+    return SequenceMatcher(None, a.street_key, b.street_key).ratio()
+
+
+def _same_area(a: _Prepared, b: _Prepared) -> bool:
+    return bool((a.cell and a.cell == b.cell) or (a.zip and a.zip == b.zip))
+
+
+def is_match(a: _Prepared, b: _Prepared) -> bool:
+    name_sim = name_similarity(a, b)
+
+    street_sim = street_similarity(a, b)
+    both_streets = bool(a.street_key and b.street_key)
+
+    # Chains share one central number across branches, so a phone match
+    # only counts when the streets do not contradict it
+    if a.phone and a.phone == b.phone:
+        if both_streets:
+            return street_sim >= PHONE_STREET_MATCH and name_sim >= NAME_WITH_PHONE
+        return _same_area(a, b) and name_sim >= NAME_WITH_PHONE
+
+    if name_sim < NAME_MATCH:
+        return False
+
+    if street_sim >= ADDRESS_MATCH:
+        return True
+
+    # No usable street on one side: fall back to same cell / zip
+    if not both_streets:
+        return _same_area(a, b)
+
+    return False
+
+# ============================================================
+# CLUSTERING (UNION-FIND)
+# ============================================================
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def cluster(records: List[Dict[str, Any]]) -> List[List[int]]:
+    """Indices of records grouped into entity clusters."""
+    prepared = [_prepare(i, r) for i, r in enumerate(records)]
+    uf = _UnionFind(len(prepared))
+    compared = set()
+
+    for block in build_blocks(prepared):
+        for i in range(len(block)):
+            for j in range(i + 1, len(block)):
+                a, b = block[i], block[j]
+                pair = (a.index, b.index)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                if uf.find(a.index) == uf.find(b.index):
+                    continue
+                if is_match(a, b):
+                    uf.union(a.index, b.index)
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for p in prepared:
+        groups[uf.find(p.index)].append(p.index)
+    return list(groups.values())
+
+# ============================================================
+# GOLDEN RECORDS
+# ============================================================
+
+def _source_rank(record: Dict[str, Any]) -> int:
+    return SOURCE_PRIORITY.get((record.get("source") or "").lower(), 99)
+
+
+def _pick(values: List[Tuple[Any, Dict[str, Any]]]) -> Tuple[Any, Optional[str]]:
+    """Most frequent value; ties go to source priority, then length."""
+    present = [(v, r) for v, r in values if clean_value(v) is not None]
+    if not present:
+        return None, None
+
+    counts = Counter(str(clean_value(v)) for v, _ in present)
+    best_value, best_record = min(
+        present,
+        key=lambda vr: (
+            -counts[str(clean_value(vr[0]))],
+            _source_rank(vr[1]),
+            -len(str(vr[0])),
+        ),
+    )
+    return best_value, best_record.get("source")
+
+
+def _source_id(value: Any) -> Optional[str]:
+    """Source ids as text; parquet float columns give 123.0 and NaN."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return clean_value(value)
+
+
+def golden_record(members: List[Dict[str, Any]], cluster_id: int) -> Dict[str, Any]:
+    golden: Dict[str, Any] = {"cluster_id": cluster_id}
+    field_sources: Dict[str, Optional[str]] = {}
+
+    for f in GOLDEN_FIELDS:
+        value, source = _pick([(m.get(f), m) for m in members])
+        golden[f] = value
+        if value is not None:
+            field_sources[f] = source
+
+    golden["sources"] = sorted({m.get("source") or "unknown" for m in members})
+    golden["source_ids"] = [i for i in (_source_id(m.get("source_id")) for m in members) if i]
+    golden["member_count"] = len(members)
+    golden["field_sources"] = field_sources
+    return golden
+
+
+def resolve(records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Deduplicate provider records into golden records.
+
+    Each input record should carry a `source` label (abafinder, yellowpages,
+    bhcoe, serpapi, ...) and optionally a `source_id`.
+    """
+    records = list(records)
+    clusters = cluster(records)
+    clusters.sort(key=min)
+    return [
+        golden_record([records[i] for i in members], cluster_id)
+        for cluster_id, members in enumerate(clusters)
+    ]
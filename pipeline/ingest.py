@@ -0,0 +1,359 @@
+"""
+Incremental Provider Ingestion - Change detection via content hashes
+Location: pipeline/ingest.py
+
+Every incoming record gets two fingerprints:
+- ingest_key   : normalized identity (name + address)
+- content_hash : normalized hash of every content field
+
+Rows are classified against the `providers` table as new, changed or
+unchanged, and only the deltas are written. Formatting noise (whitespace,
+phone punctuation, URL scheme) never changes either fingerprint.
+"""
+
+import hashlib
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from psycopg2.extras import execute_values
+
+# ============================================================
+# PROVIDER FIELDS
+# ============================================================
+
+CONTENT_FIELDS = (
+    "name",
+    "phone",
+    "email",
+    "website",
+    "street",
+    "city",
+    "state",
+    "zip",
+    "full_address",
+    "latitude",
+    "longitude",
+    "services",
+)
+
+CHANGES_STREAM = "provider_changes_stream"
+
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_NON_DIGIT_RE = re.compile(r"\D+")
+_URL_PREFIX_RE = re.compile(r"^(https?://)?(www\.)?")
+
+# ============================================================
+# NORMALIZATION
+# ============================================================
+
+def _is_missing(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return False
+
+
+def clean_value(value: Any) -> Optional[str]:
+    """Collapse whitespace; missing / blank values become None."""
+    if _is_missing(value):
+        return None
+    text = _WS_RE.sub(" ", str(value)).strip()
+    return text or None
+
+
+def _norm_key_text(value: Any) -> str:
+    text = clean_value(value)
+    if not text:
+        return ""
+    return _NON_ALNUM_RE.sub(" ", text.lower()).strip()
+
+
+def normalize_phone(value: Any) -> str:
+    """Digits only, US country code dropped."""
+    digits = _NON_DIGIT_RE.sub("", clean_value(value) or "")
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits
+
+
+def _norm_website(value: Any) -> str:
+    text = (clean_value(value) or "").lower()
+    return _URL_PREFIX_RE.sub("", text).rstrip("/")
+
+
+def _norm_coord(value: Any) -> str:
+    if _is_missing(value) or value == "":
+        return ""
+    try:
+        return f"{float(value):.6f}"
+    except (TypeError, ValueError):
+        return ""
+
+
+_FIELD_NORMALIZERS = {
+    "phone": normalize_phone,
+    "website": _norm_website,
+    "latitude": _norm_coord,
+    "longitude": _norm_coord,
+}
+
+
+def _address_of(record: Dict[str, Any]) -> str:
+    full = clean_value(record.get("full_address"))
+    if full:
+        return full
+    parts = [clean_value(record.get(k)) for k in ("street", "city", "state", "zip")]
+    return ", ".join(p for p in parts if p)
+
+
+def ingest_key(record: Dict[str, Any]) -> str:
+    """Stable identity of a provider record: normalized name + address."""
+    raw = f"{_norm_key_text(record.get('name'))}|{_norm_key_text(_address_of(record))}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """Hash of every content field after normalization."""
+    normalized = {}
+    for f in CONTENT_FIELDS:
+        normalizer = _FIELD_NORMALIZERS.get(f)
+        if normalizer:
+            normalized[f] = normalizer(record.get(f))
+        else:
+            normalized[f] = _norm_key_text(record.get(f))
+    raw = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def prepare_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a raw row onto provider fields and attach its fingerprints."""
+    row = {f: clean_value(record.get(f)) for f in CONTENT_FIELDS}
+    for coord in ("latitude", "longitude"):
+        row[coord] = float(row[coord]) if _norm_coord(row[coord]) else None
+    row["ingest_key"] = ingest_key(row)
+    row["content_hash"] = content_hash(row)
+    return row
+
+# ============================================================
+# CLASSIFICATION
+# ============================================================
+
+@dataclass
+class IngestResult:
+    new: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged: int = 0
+    duplicates: int = 0
+    inserted_ids: List[int] = field(default_factory=list)
+    updated_ids: List[int] = field(default_factory=list)
+
+    @property
+    def changed_ids(self) -> Set[int]:
+        """Provider ids whose cached representations are now stale."""
+        return set(self.inserted_ids) | set(self.updated_ids)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "new": len(self.new),
+            "changed": len(self.changed),
+            "unchanged": self.unchanged,
+            "duplicates": self.duplicates,
+        }
+
+
+def classify(
+    records: Iterable[Dict[str, Any]],
+    existing: Dict[str, tuple],
+) -> IngestResult:
+    """
+    Classify prepared records against existing fingerprints.
+
+    Args:
+        records: Output of prepare_record()
+        existing: {ingest_key: (provider_id, content_hash)}
+    """
+    result = IngestResult()
+    seen: Set[str] = set()
+
+    for row in records:
+        key = row["ingest_key"]
+        if key in seen:
+            result.duplicates += 1
+            continue
+        seen.add(key)
+
+        current = existing.get(key)
+        if current is None:
+            result.new.append(row)
+        elif current[1] != row["content_hash"]:
+            result.changed.append({**row, "id": current[0]})
+        else:
+            result.unchanged += 1
+
+    return result
+
+# ============================================================
+# DB: FINGERPRINTS
+# ============================================================
+
+def backfill_fingerprints(conn) -> int:
+    """Compute ingest_key / content_hash for legacy rows that lack them."""
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT id, {", ".join(CONTENT_FIELDS)}
+        FROM providers
+        WHERE ingest_key IS NULL
+    """)
+    rows = cur.fetchall()
+
+    updates = []
+    claimed: Set[str] = set()
+    for r in rows:
+        record = dict(zip(CONTENT_FIELDS, r[1:]))
+        key = ingest_key(record)
+        if key in claimed:
+            continue  # legacy duplicate: leave unkeyed
+        claimed.add(key)
+        updates.append((r[0], key, content_hash(record)))
+
+    if updates:
+        execute_values(cur, """
+            UPDATE providers p
+            SET ingest_key = v.ingest_key,
+                content_hash = v.content_hash
+            FROM (VALUES %s) AS v(id, ingest_key, content_hash)
+            WHERE p.id = v.id
+              AND NOT EXISTS (
+                  SELECT 1 FROM providers o WHERE o.ingest_key = v.ingest_key
+              )
+        """, updates)
+
+    conn.commit()
+    cur.close()
+    return len(updates)
+
+
+def load_fingerprints(conn) -> Dict[str, tuple]:
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT ingest_key, id, content_hash
+        FROM providers
+        WHERE ingest_key IS NOT NULL
+    """)
+    existing = {key: (pid, chash) for key, pid, chash in cur.fetchall()}
+    cur.close()
+    return existing
+
+# ============================================================
+# DB: DELTA WRITES
+# ============================================================
+
+WRITE_FIELDS = CONTENT_FIELDS + ("ingest_key", "content_hash")
+
+LOCATION_SQL = """
+    CASE WHEN {lat} IS NOT NULL AND {lon} IS NOT NULL
+         THEN ST_SetSRID(ST_MakePoint({lon}, {lat}), 4326)::geography
+    END
+"""
+
+
+def insert_new(conn, rows: List[Dict[str, Any]], page_size: int = 500) -> List[int]:
+    if not rows:
+        return []
+    cur = conn.cursor()
+    cols = ", ".join(WRITE_FIELDS)
+    location = LOCATION_SQL.format(lat="v.latitude", lon="v.longitude")
+    ids = execute_values(
+        cur,
+        f"""
+        INSERT INTO providers ({cols}, location, content_updated_at)
+        SELECT {", ".join(f"v.{c}" for c in WRITE_FIELDS)}, {location}, NOW()
+        FROM (VALUES %s) AS v({cols})
+        ON CONFLICT (ingest_key) DO NOTHING
+        RETURNING id
+        """,
+        [tuple(r[c] for c in WRITE_FIELDS) for r in rows],
+        template=_values_template(),
+        page_size=page_size,
+        fetch=True,
+    )
+    cur.close()
+    return [r[0] for r in ids]
+
+
+def update_changed(conn, rows: List[Dict[str, Any]], page_size: int = 500) -> List[int]:
+    if not rows:
+        return []
+    cur = conn.cursor()
+    cols = ", ".join(WRITE_FIELDS)
+    assignments = ",\n            ".join(f"{c} = v.{c}" for c in WRITE_FIELDS)
+    location = LOCATION_SQL.format(lat="v.latitude", lon="v.longitude")
+    ids = execute_values(
+        cur,
+        f"""
+        UPDATE providers p SET
+            {assignments},
+            location = {location},
+            content_updated_at = NOW()
+        FROM (VALUES %s) AS v(id, {cols})
+        WHERE p.id = v.id
+        RETURNING p.id
+        """,
+        [(r["id"],) + tuple(r[c] for c in WRITE_FIELDS) for r in rows],
+        template="(%s, " + _values_template()[1:],
+        page_size=page_size,
+        fetch=True,
+    )
+    cur.close()
+    return [r[0] for r in ids]
+
+
+def _values_template() -> str:
+    # latitude / longitude need explicit casts inside a VALUES list
+    parts = []
+    for c in WRITE_FIELDS:
+        parts.append("%s::double precision" if c in ("latitude", "longitude") else "%s")
+    return "(" + ", ".join(parts) + ")"
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def ingest(conn, records: Iterable[Dict[str, Any]], dry_run: bool = False) -> IngestResult:
+    """
+    Run one incremental ingestion pass.
+
+    New rows are inserted, changed rows updated in place, unchanged rows
+    left untouched. The transaction is committed unless dry_run is set.
+    """
+    backfill_fingerprints(conn)
+    prepared = [prepare_record(r) for r in records]
+    result = classify(prepared, load_fingerprints(conn))
+
+    if dry_run:
+        return result
+
+    try:
+        result.inserted_ids = insert_new(conn, result.new)
+        result.updated_ids = update_changed(conn, result.changed)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return result
+
+
+def publish_changes(redis_client, provider_ids: Iterable[int], chunk_size: int = 500) -> int:
+    """Emit changed provider ids on a Redis stream for cache invalidation."""
+    ids = sorted(provider_ids)
+    for i in range(0, len(ids), chunk_size):
+        redis_client.xadd(CHANGES_STREAM, {
+            "provider_ids": ",".join(str(pid) for pid in ids[i:i + chunk_size]),
+        })
+    return len(ids)
@@ -0,0 +1,247 @@
+"""
+Vectorized CSV Normalization - Phone, text and address cleanup on whole columns
+Location: pipeline/normalize.py
+
+Replaces per-row iterrows() cleanup with pandas string ops so a merge of
+every state file is bounded by I/O. Inputs are read in chunks and written
+incrementally to CSV and Parquet.
+"""
+
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 50_000
+
+GLIDE_COLUMNS = [
+    "name", "phone", "website", "email",
+    "address", "city", "state", "zip", "source_state",
+]
+
+# ============================================================
+# COLUMN CLEANERS (VECTORIZED)
+# ============================================================
+
+def clean_text(values: pd.Series) -> pd.Series:
+    """Missing -> "", every CR and LF -> a space (CRLF -> two), outer whitespace stripped."""
+    return (
+        values.fillna("")
+        .astype(str)
+        .str.replace(r"[\r\n]", " ", regex=True)
+        .str.strip()
+    )
+
+
+def clean_phone(values: pd.Series) -> pd.Series:
+    """Digits only; 10-digit numbers formatted as (xxx) xxx-xxxx."""
+    digits = values.fillna("").astype(str).str.replace(r"\D", "", regex=True)
+    return digits.str.replace(r"^(\d{3})(\d{3})(\d{4})$", r"(\1) \2-\3", regex=True)
+
+
+def extract_address_parts(values: pd.Series) -> pd.DataFrame:
+    """
+    Split messy combined locations into address / city / state / zip.
+
+    Same rules as the old per-row helper:
+    - address is the first comma part
+    - city is the second-to-last part (3+ parts only)
+    - state / zip come from the last part ("FL 33101")
+    """
+    full = clean_text(values)
+
+    address = full.str.extract(r"^([^,]*)", expand=False).fillna("").str.strip()
+    city = full.str.extract(r",([^,]*),[^,]*$", expand=False).fillna("").str.strip()
+    last = full.str.extract(r",([^,]*)$", expand=False).fillna("").str.strip()
+    state_zip = last.str.extract(r"^([A-Z]{2})\s*(\d{5})?")
+
+    return pd.DataFrame({
+        "address": address,
+        "city": city,
+        "state": state_zip[0].fillna(""),
+        "zip": state_zip[1].fillna(""),
+    }, index=values.index)
+
+# ============================================================
+# FRAME NORMALIZATION
+# ============================================================
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series("", index=df.index, dtype=object)
+
+
+def normalize_glide_frame(df: pd.DataFrame, source_state: str) -> pd.DataFrame:
+    """Normalize one raw ABAFinder chunk into the Glide-ready layout."""
+    parts = extract_address_parts(_column(df, "location"))
+
+    out = pd.DataFrame({
+        "name": clean_text(_column(df, "name")),
+        "phone": clean_phone(_column(df, "phone")),
+        "website": clean_text(_column(df, "website")),
+        "email": clean_text(_column(df, "email")),
+        "address": parts["address"],
+        "city": parts["city"],
+        "state": parts["state"].where(parts["state"] != "", source_state),
+        "zip": parts["zip"],
+        "source_state": source_state,
+    }, index=df.index)
+
+    return out[GLIDE_COLUMNS]
+
+# ============================================================
+# CHUNKED INPUT
+# ============================================================
+
+def state_files(folder: str, prefix: str = "abafinder_") -> List[str]:
+    """Per-state CSVs such as abafinder_FL.csv (merged outputs excluded)."""
+    names = []
+    for f in sorted(os.listdir(folder)):
+        if not (f.startswith(prefix) and f.endswith(".csv")):
+            continue
+        code = f[len(prefix):-len(".csv")]
+        if len(code) == 2 and code.isalpha() and code.isupper():
+            names.append(os.path.join(folder, f))
+    return names
+
+
+def source_state_of(path: str, prefix: str = "abafinder_") -> str:
+    return os.path.basename(path).replace(prefix, "").replace(".csv", "")
+
+
+def read_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    yield from pd.read_csv(
+        path,
+        dtype=str,
+        keep_default_na=False,
+        chunksize=chunksize,
+    )
+
+
+def union_columns(paths: Iterable[str]) -> List[str]:
+    """Ordered union of headers (header rows only, no data read)."""
+    columns: List[str] = []
+    for path in paths:
+        for col in pd.read_csv(path, nrows=0).columns:
+            if col not in columns:
+                columns.append(col)
+    return columns
+
+# ============================================================
+# INCREMENTAL OUTPUT (CSV + PARQUET)
+# ============================================================
+
+class FrameWriter:
+    """
+    Appends chunks to a CSV and (optionally) a Parquet file.
+
+    Parquet output needs pyarrow; every chunk must share one column layout.
+    """
+
+    def __init__(self, csv_path: Optional[str], parquet_path: Optional[str] = None):
+        self.csv_path = csv_path
+        self.parquet_path = parquet_path
+        self.rows = 0
+        self._csv_started = False
+        self._parquet_writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+
+        if self.csv_path:
+            df.to_csv(
+                self.csv_path,
+                mode="a" if self._csv_started else "w",
+                header=not self._csv_started,
+                index=False,
+            )
+            self._csv_started = True
+
+        if self.parquet_path:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._schema = table.schema
+                self._parquet_writer = pq.ParquetWriter(self.parquet_path, self._schema)
+            self._parquet_writer.write_table(table.cast(self._schema))
+
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ============================================================
+# MERGES
+# ============================================================
+
+def merge_glide_ready(
+    paths: Iterable[str],
+    writer: FrameWriter,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    snapshot=None,
+) -> Dict[str, int]:
+    """
+    Normalize + dedupe (name, address) across every state file.
+
+    snapshot: optional pipeline.snapshot.SnapshotWriter fed the same rows.
+    """
+    seen: Set[int] = set()
+    stats = {"files": 0, "rows_in": 0, "duplicates": 0}
+
+    for path in paths:
+        source_state = source_state_of(path)
+        stats["files"] += 1
+
+        for chunk in read_chunks(path, chunksize):
+            stats["rows_in"] += len(chunk)
+            cleaned = normalize_glide_frame(chunk, source_state)
+            cleaned = cleaned.drop_duplicates(subset=["name", "address"])
+
+            keys = pd.util.hash_pandas_object(cleaned[["name", "address"]], index=False)
+            fresh = ~keys.isin(seen)
+            stats["duplicates"] += int((~fresh).sum())
+            seen.update(keys[fresh].tolist())
+
+            writer.write(cleaned[fresh.values])
+            if snapshot is not None:
+                snapshot.write_frame(cleaned[fresh.values], source="abafinder")
+
+    stats["rows_out"] = writer.rows
+    return stats
+
+
+def merge_state_files(
+    paths: List[str],
+    writer: FrameWriter,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    snapshot=None,
+) -> Dict[str, int]:
+    """Stream-concatenate raw state files, tagging each row with its state."""
+    columns = [c for c in union_columns(paths) if c != "state"] + ["state"]
+    stats = {"files": 0}
+
+    for path in paths:
+        stats["files"] += 1
+        state_code = source_state_of(path)
+        for chunk in read_chunks(path, chunksize):
+            chunk = chunk.reindex(columns=columns, fill_value="")
+            chunk["state"] = state_code
+            writer.write(chunk)
+            if snapshot is not None:
+                snapshot.write_frame(chunk, source="abafinder")
+
+    stats["rows_out"] = writer.rows
+    return stats
@@ -0,0 +1,308 @@
+"""
+Provider Snapshots - Canonical columnar interchange between pipeline stages
+Location: pipeline/snapshot.py
+
+Every stage (normalize, dedup, geocode, load) hands the next one a
+snapshot instead of a CSV:
+- one canonical schema with typed columns (float coordinates, no "nan" text)
+- source headers mapped once (location -> full_address, lat/lng -> latitude/
+  longitude, zipcode -> zip, ...)
+- ingest_key / content_hash computed once, at snapshot time
+- Parquet for storage, Arrow IPC (.arrow) for memory-mapped reads
+
+The loader COPYs a snapshot into a staging table and diffs it against
+`providers` in SQL.
+"""
+
+import io
+import os
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from pipeline.ingest import (
+    CONTENT_FIELDS,
+    LOCATION_SQL,
+    WRITE_FIELDS,
+    IngestResult,
+    backfill_fingerprints,
+    prepare_record,
+)
+
+# ============================================================
+# CANONICAL SCHEMA
+# ============================================================
+
+_FLOAT_FIELDS = ("latitude", "longitude")
+
+PROVIDER_SCHEMA = pa.schema(
+    [pa.field("source", pa.string()), pa.field("source_id", pa.string())]
+    + [
+        pa.field(f, pa.float64() if f in _FLOAT_FIELDS else pa.string())
+        for f in CONTENT_FIELDS
+    ]
+    + [pa.field("ingest_key", pa.string(), nullable=False), pa.field("content_hash", pa.string(), nullable=False)],
+    metadata={b"format": b"autizim.provider_snapshot", b"version": b"1"},
+)
+
+SNAPSHOT_COLUMNS = PROVIDER_SCHEMA.names
+
+# Source headers -> canonical field names
+COLUMN_ALIASES = {
+    "title": "name",
+    "location": "full_address",
+    "zipcode": "zip",
+    "zip_code": "zip",
+    "postal_code": "zip",
+    "lat": "latitude",
+    "lng": "longitude",
+    "lon": "longitude",
+    "gps_lat": "latitude",
+    "gps_lng": "longitude",
+    "place_id": "source_id",
+}
+
+
+def canonical_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename known header variants; never overwrite a canonical column."""
+    df = df.rename(columns={k: v for k, v in COLUMN_ALIASES.items() if v not in df.columns})
+    # "address" is a street when city is separate, otherwise the full address
+    if "street" not in df.columns and "address" in df.columns:
+        target = "street" if "city" in df.columns else "full_address"
+        if target not in df.columns:
+            df = df.rename(columns={"address": target})
+    return df
+
+
+def to_snapshot_table(df: pd.DataFrame, source: Optional[str] = None) -> pa.Table:
+    """Any provider frame -> typed, fingerprinted snapshot table."""
+    df = canonical_columns(df)
+    if source is not None or "source" not in df.columns:
+        df = df.assign(source=source)
+
+    rows = []
+    for record in df.to_dict("records"):
+        row = prepare_record(record)
+        row["source"] = record.get("source")
+        source_id = record.get("source_id")
+        row["source_id"] = None if source_id is None or source_id != source_id else str(source_id)
+        rows.append(row)
+
+    return pa.Table.from_pylist(rows, schema=PROVIDER_SCHEMA)
+
+# ============================================================
+# WRITE
+# ============================================================
+
+def _ipc_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".arrow"
+
+
+class SnapshotWriter:
+    """
+    Streams snapshot chunks to Parquet (+ optional Arrow IPC for mmap).
+
+    The schema is fixed, so chunks from different sources cannot drift.
+    Files are written under a temp name and swapped in on close.
+    """
+
+    def __init__(self, path: str, arrow: bool = True):
+        self.path = path
+        self.ipc_path = _ipc_path(path) if arrow else None
+        self.rows = 0
+        self._parquet = pq.ParquetWriter(f"{path}.tmp", PROVIDER_SCHEMA, compression="zstd")
+        self._ipc_sink = None
+        self._ipc = None
+        if self.ipc_path:
+            self._ipc_sink = pa.OSFile(f"{self.ipc_path}.tmp", "wb")
+            self._ipc = pa.ipc.new_file(self._ipc_sink, PROVIDER_SCHEMA)
+
+    def write(self, table: pa.Table) -> None:
+        if table.num_rows == 0:
+            return
+        table = table.select(SNAPSHOT_COLUMNS).cast(PROVIDER_SCHEMA)
+        self._parquet.write_table(table)
+        if self._ipc:
+            self._ipc.write_table(table)
+        self.rows += table.num_rows
+
+    def write_frame(self, df: pd.DataFrame, source: Optional[str] = None) -> None:
+        self.write(to_snapshot_table(df, source))
+
+    def close(self) -> None:
+        self._parquet.close()
+        os.replace(f"{self.path}.tmp", self.path)
+        if self._ipc:
+            self._ipc.close()
+            self._ipc_sink.close()
+            os.replace(f"{self.ipc_path}.tmp", self.ipc_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+
+
+def write_snapshot(table: pa.Table, path: str, arrow: bool = True) -> str:
+    with SnapshotWriter(path, arrow=arrow) as writer:
+        writer.write(table)
+    return path
+
+# ============================================================
+# READ
+# ============================================================
+
+def open_mmap(path: str) -> pa.Table:
+    """Zero-copy table over an Arrow IPC snapshot (.arrow)."""
+    source = pa.memory_map(path, "r")
+    return ipc.open_file(source).read_all()
+
+
+def read_snapshot(path: str) -> pa.Table:
+    """Snapshot from .arrow (memory-mapped) or .parquet."""
+    if path.endswith(".arrow"):
+        table = open_mmap(path)
+    else:
+        table = pq.read_table(path)
+    missing = set(SNAPSHOT_COLUMNS) - set(table.column_names)
+    if missing:
+        raise ValueError(f"{path} is not a provider snapshot (missing {sorted(missing)})")
+    return table.select(SNAPSHOT_COLUMNS).cast(PROVIDER_SCHEMA)
+
+
+def read_any(path: str, source: Optional[str] = None) -> pa.Table:
+    """Snapshot as-is, or a legacy CSV / raw Parquet converted on the fly."""
+    if path.endswith(".arrow"):
+        return read_snapshot(path)
+    if path.endswith(".parquet"):
+        if set(SNAPSHOT_COLUMNS) <= set(pq.read_schema(path).names):
+            return read_snapshot(path)
+        return to_snapshot_table(pd.read_parquet(path), source)
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return to_snapshot_table(df.replace({"": None}), source)
+
+# ============================================================
+# LOAD: COPY INTO STAGING + SQL DIFF
+# ============================================================
+
+_STAGING = "providers_staging"
+
+
+def copy_to_staging(conn, table: pa.Table) -> int:
+    """COPY a snapshot into a session-local staging table."""
+    columns = list(WRITE_FIELDS)
+    types = {f: "DOUBLE PRECISION" if f in _FLOAT_FIELDS else "TEXT" for f in columns}
+
+    cur = conn.cursor()
+    cur.execute(f"DROP TABLE IF EXISTS {_STAGING}")
+    cur.execute(
+        f"CREATE TEMP TABLE {_STAGING} ("
+        + ", ".join(f"{c} {types[c]}" for c in columns)
+        + ") ON COMMIT DROP"
+    )
+
+    buffer = io.BytesIO()
+    pa_csv.write_csv(table.select(columns), buffer, pa_csv.WriteOptions(include_header=False))
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {_STAGING} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+    # One row per identity; the first one wins, as in ingest.classify()
+    cur.execute(f"""
+        DELETE FROM {_STAGING} s
+        USING (
+            SELECT ctid, ROW_NUMBER() OVER (PARTITION BY ingest_key ORDER BY ctid) AS rn
+            FROM {_STAGING}
+        ) d
+        WHERE s.ctid = d.ctid AND d.rn > 1
+    """)
+    duplicates = cur.rowcount
+    cur.close()
+    return duplicates
+
+
+def _classify_staged(conn) -> Dict[str, List[Dict[str, Any]]]:
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT s.ingest_key,
+               CASE WHEN p.id IS NULL THEN 'new'
+                    WHEN p.content_hash IS DISTINCT FROM s.content_hash THEN 'changed'
+                    ELSE 'unchanged' END AS status,
+               p.id
+        FROM {_STAGING} s
+        LEFT JOIN providers p ON p.ingest_key = s.ingest_key
+    """)
+    out: Dict[str, List[Dict[str, Any]]] = {"new": [], "changed": [], "unchanged": []}
+    for key, status, pid in cur.fetchall():
+        out[status].append({"ingest_key": key, "id": pid})
+    cur.close()
+    return out
+
+
+def ingest_snapshot(conn, table: pa.Table, dry_run: bool = False) -> IngestResult:
+    """
+    Incremental load of a snapshot: COPY -> staging -> set-based diff.
+
+    Same semantics as pipeline.ingest.ingest(), without per-row Python work
+    or VALUES lists.
+    """
+    backfill_fingerprints(conn)
+
+    try:
+        duplicates = copy_to_staging(conn, table)
+        staged = _classify_staged(conn)
+        result = IngestResult(
+            new=staged["new"],
+            changed=staged["changed"],
+            unchanged=len(staged["unchanged"]),
+            duplicates=duplicates,
+        )
+
+        if dry_run:
+            conn.rollback()
+            return result
+
+        cols = ", ".join(WRITE_FIELDS)
+        location = LOCATION_SQL.format(lat="s.latitude", lon="s.longitude")
+        cur = conn.cursor()
+
+        cur.execute(f"""
+            INSERT INTO providers ({cols}, location, content_updated_at)
+            SELECT {", ".join(f"s.{c}" for c in WRITE_FIELDS)}, {location}, NOW()
+            FROM {_STAGING} s
+            WHERE NOT EXISTS (SELECT 1 FROM providers p WHERE p.ingest_key = s.ingest_key)
+            ON CONFLICT (ingest_key) DO NOTHING
+            RETURNING id
+        """)
+        result.inserted_ids = [r[0] for r in cur.fetchall()]
+
+        assignments = ",\n                ".join(f"{c} = s.{c}" for c in WRITE_FIELDS)
+        cur.execute(f"""
+            UPDATE providers p SET
+                {assignments},
+                location = {location},
+                content_updated_at = NOW()
+            FROM {_STAGING} s
+            WHERE p.ingest_key = s.ingest_key
+              AND p.content_hash IS DISTINCT FROM s.content_hash
+            RETURNING p.id
+        """)
+        result.updated_ids = [r[0] for r in cur.fetchall()]
+        cur.close()
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return result
+
+
+def source_counts(table: pa.Table) -> Dict[str, int]:
+    counts = table.column("source").value_counts().to_pylist()
+    return {row["values"] or "unknown": row["counts"] for row in counts}
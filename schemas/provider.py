@@ -1,8 +1,20 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
 from pydantic import BaseModel
-from typing import Optional
+
+# Canonical provider columns, in storage order. Repositories SELECT exactly
+# these, the catalog stores them positionally, caches store them as lists.
+PROVIDER_COLUMNS = (
+    "id", "name", "phone", "email", "website", "street", "city",
+    "state", "zip", "full_address", "latitude", "longitude", "services",
+)
 
 
 class Provider(BaseModel):
+    """API response shape (OpenAPI docs / request-side validation only)."""
+
     id: int
     name: str
     phone: Optional[str] = None
@@ -20,3 +32,82 @@ class Provider(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+_RECORD_FIELDS = PROVIDER_COLUMNS + ("distance_miles",)
+
+
+def _float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    value = float(value)
+    return None if value != value else value
+
+
+@dataclass(slots=True)
+class ProviderRecord:
+    """
+    Internal provider row used by repositories, caches and the catalog.
+
+    No per-instance __dict__ and no validation; turned into the API shape
+    once, by as_dict(), when the response is written.
+    """
+
+    id: int
+    name: str
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    website: Optional[str] = None
+    street: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip: Optional[str] = None
+    full_address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    services: Optional[str] = None
+    distance_miles: Optional[float] = None
+
+    @classmethod
+    def from_tuple(cls, row: Sequence[Any]) -> "ProviderRecord":
+        """Row in PROVIDER_COLUMNS order, optionally followed by distance_miles."""
+        record = cls(*row)
+        record.latitude = _float(record.latitude)
+        record.longitude = _float(record.longitude)
+        if isinstance(record.distance_miles, Decimal):
+            record.distance_miles = float(record.distance_miles)
+        return record
+
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any]) -> "ProviderRecord":
+        """Mapping with at least the canonical columns (extra keys ignored)."""
+        values = [row.get(c) for c in PROVIDER_COLUMNS]
+        values.append(row.get("distance_miles"))
+        return cls.from_tuple(values)
+
+    def to_row(self) -> List[Any]:
+        """Positional form for caches; the inverse of from_tuple()."""
+        return [getattr(self, f) for f in _RECORD_FIELDS]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "phone": self.phone,
+            "email": self.email,
+            "website": self.website,
+            "street": self.street,
+            "city": self.city,
+            "state": self.state,
+            "zip": self.zip,
+            "full_address": self.full_address,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "services": self.services,
+            "distance_miles": self.distance_miles,
+        }
+
+
+def provider_payload(records: Iterable[ProviderRecord]) -> List[Dict[str, Any]]:
+    """Records -> JSON-ready API shape."""
+    return [r.as_dict() for r in records]
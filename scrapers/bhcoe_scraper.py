@@ -1,8 +1,15 @@
+import argparse
 import asyncio
 import csv
-import random
 import time
-from playwright.async_api import async_playwright
+
+from scrapers.browser_pool import (
+    BrowserPool, fixture_url, list_signature, wait_for_count_above, wait_for_list_change, wait_for_settle,
+)
+
+# Run from the repo root:
+#   python -m scrapers.bhcoe_scraper
+#   python -m scrapers.bhcoe_scraper --directory-url fixtures/bhcoe/directory.html --states florida
 
 STATES = [
     "alabama","alaska","arizona","arkansas","california","colorado",
@@ -18,133 +25,126 @@ STATES = [
 ]
 
 OUTPUT = "bhcoe_all_states.csv"
+DIRECTORY_URL = "https://www.bhcoe.org/aba-therapy-directory/"
+CARD = ".provider-card"
 
+FIELDNAMES = [
+    "name","city","state","description",
+    "website","source_state","latitude","longitude"
+]
 
-async def human_type(element, text):
-    """Type text into a field like a real human."""
-    for char in text:
-        await element.type(char, delay=random.randint(50, 150))
-        await asyncio.sleep(random.uniform(0.05, 0.2))
-
-
-async def human_move_mouse(page):
-    """Move mouse around randomly to appear human."""
-    for _ in range(4):
-        x = random.randint(50, 800)
-        y = random.randint(100, 900)
-        await page.mouse.move(x, y, steps=15)
-        await asyncio.sleep(random.uniform(0.1, 0.4))
+# All cards in one round-trip instead of four query_selector calls per card
+CARD_FIELDS_JS = """
+cards => cards.map(card => {
+    const text = sel => { const el = card.querySelector(sel); return el ? el.innerText : ""; };
+    const link = card.querySelector("a");
+    return {
+        name: text("h3"),
+        location: text("p"),
+        description: text("div"),
+        website: link ? (link.getAttribute("href") || "") : "",
+    };
+})
+"""
 
 
 async def click_load_more(page):
-    """Repeatedly click LOAD MORE."""
+    """Click LOAD MORE until it disappears or stops adding cards."""
     while True:
         btn = await page.query_selector("button:has-text('LOAD MORE')")
         if not btn:
             return
+        before = await page.locator(CARD).count()
         await btn.click()
-        await page.wait_for_timeout(2000)
+        if not await wait_for_count_above(page, CARD, before):
+            return
 
 
-async def scrape_one_state(page, state):
-    print(f"\n📍 Scraping state: {state.upper()}")
+def to_row(card, state):
+    city = ""
+    st = ""
 
-    await page.goto("https://www.bhcoe.org/aba-therapy-directory/", timeout=60000)
+    location = card["location"]
+    if "," in location:
+        parts = location.split(",")
+        city = parts[0].strip()
+        st = parts[1].strip()
 
-    await human_move_mouse(page)
-    await page.wait_for_timeout(1500)
+    return {
+        "name": card["name"],
+        "city": city,
+        "state": st,
+        "description": card["description"],
+        "website": card["website"],
+        "source_state": state,
+        "latitude": "",
+        "longitude": ""
+    }
 
-    # Focus the search box
-    search_box = await page.wait_for_selector("input[type='search']", timeout=25000)
-    await search_box.click()
-    await human_move_mouse(page)
 
-    # Clear
-    await search_box.fill("")
-    await asyncio.sleep(0.8)
+async def scrape_one_state(page, state, directory_url=DIRECTORY_URL):
+    print(f"\n📍 Scraping state: {state.upper()}")
 
-    # Human-like typing of state name
-    await human_type(search_box, state)
-    await asyncio.sleep(1.8)
+    # Pooled pages stay on the directory between states
+    if page.url != directory_url:
+        await page.goto(directory_url, wait_until="domcontentloaded", timeout=60000)
 
-    # Scroll to trigger JS events
-    await page.evaluate("window.scrollTo(0, document.body.scrollHeight/3);")
-    await asyncio.sleep(1.5)
+    search_box = await page.wait_for_selector("input[type='search']", timeout=25000)
 
+    # The directory filters client-side (no request, so networkidle proves
+    # nothing): wait until the card list is no longer the previous state's
+    before = await list_signature(page, CARD)
+    await search_box.fill(state)
+    if not await wait_for_list_change(page, CARD, before, timeout=10000):
+        print(f"   ⚠️ {state}: result list did not change after filtering")
+
+    # Scroll to trigger lazy-loading JS, then wait for the results to settle
     await page.evaluate("window.scrollTo(0, document.body.scrollHeight);")
-    await asyncio.sleep(1.5)
+    await wait_for_settle(page)
 
-    # Load more
     await click_load_more(page)
 
-    cards = await page.query_selector_all(".provider-card")
-    print(f"   ➜ Found: {len(cards)} providers")
-
-    results = []
-
-    for card in cards:
-        name_tag = await card.query_selector("h3")
-        name = await name_tag.inner_text() if name_tag else ""
-
-        loc_tag = await card.query_selector("p")
-        location = await loc_tag.inner_text() if loc_tag else ""
-
-        desc_tag = await card.query_selector("div")
-        description = await desc_tag.inner_text() if desc_tag else ""
-
-        link_tag = await card.query_selector("a")
-        link = await link_tag.get_attribute("href") if link_tag else ""
-
-        city = ""
-        st = ""
-
-        if "," in location:
-            parts = location.split(",")
-            city = parts[0].strip()
-            st = parts[1].strip()
-
-        results.append({
-            "name": name,
-            "city": city,
-            "state": st,
-            "description": description,
-            "website": link,
-            "source_state": state,
-            "latitude": "",
-            "longitude": ""
-        })
+    cards = await page.eval_on_selector_all(CARD, CARD_FIELDS_JS)
+    print(f"   ➜ {state}: {len(cards)} providers")
 
-    return results
+    return [to_row(card, state) for card in cards]
 
 
-async def main():
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=False, slow_mo=80)
-        page = await browser.new_page()
+async def main(args):
+    directory_url = args.directory_url
+    if "://" not in directory_url:
+        directory_url = fixture_url(directory_url)
 
-        all_data = []
+    states = args.states or STATES
+    start = time.time()
 
-        for state in STATES:
-            try:
-                state_results = await scrape_one_state(page, state)
-                all_data.extend(state_results)
-            except Exception as e:
-                print(f"❌ Error in {state}: {e}")
+    async with BrowserPool(size=args.workers, headless=not args.headed) as pool:
+        results = await pool.map(
+            lambda page, state: scrape_one_state(page, state, directory_url),
+            states,
+        )
 
-        with open(OUTPUT, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                "name","city","state","description",
-                "website","source_state","latitude","longitude"
-            ])
-            writer.writeheader()
-            for row in all_data:
-                writer.writerow(row)
+    all_data = []
+    for state, rows, error in results:
+        if error:
+            print(f"❌ Error in {state}: {error}")
+        else:
+            all_data.extend(rows)
 
-        print("\n✅ COMPLETE!")
-        print("➡️ Saved to:", OUTPUT)
+    with open(OUTPUT, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for row in all_data:
+            writer.writerow(row)
 
-        await browser.close()
+    print(f"\n✅ COMPLETE! {len(all_data)} providers from {len(states)} states in {time.time() - start:.0f}s")
+    print("➡️ Saved to:", OUTPUT)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Scrape the BHCOE ABA directory")
+    parser.add_argument("--workers", type=int, default=4, help="parallel browser pages")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--directory-url", default=DIRECTORY_URL, help="URL or local HTML fixture")
+    parser.add_argument("--states", nargs="*", help="subset of states (default: all 50)")
+    asyncio.run(main(parser.parse_args()))
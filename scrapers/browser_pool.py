@@ -0,0 +1,196 @@
+"""
+Browser Pool - Shared Playwright runtime for browser-based scrapers
+Location: scrapers/browser_pool.py
+
+One Chromium process, N isolated contexts, one reusable page per context:
+- pages are checked out / returned instead of opened per task
+- images, fonts and media are blocked at the network layer
+- crashed or closed pages are replaced transparently
+- map() fans work (e.g. one state per task) out over all pages
+
+Usage:
+    async with BrowserPool(size=4) as pool:
+        results = await pool.map(scrape_one_state, STATES)
+
+Scrapers can point at local HTML fixtures with fixture_url(path).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+# Requests for these resource types are aborted before they hit the network
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+
+def fixture_url(path: str) -> str:
+    """file:// URL for a local HTML fixture."""
+    return Path(path).resolve().as_uri()
+
+
+class BrowserPool:
+    """
+    Args:
+        size: number of contexts/pages (= parallel tasks)
+        headless: run without a window
+        block: resource types to abort (images/fonts/media by default)
+        init_script: JS injected into every page before site scripts run
+        timeout: default Playwright timeout per action, ms
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        headless: bool = True,
+        block: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+        init_script: Optional[str] = None,
+        timeout: float = 30000,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.size = size
+        self.headless = headless
+        self.block = frozenset(block)
+        self.init_script = init_script
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+        self._pw = None
+        self._browser = None
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._blocked = 0
+
+    # ---------------- lifecycle ----------------
+
+    async def __aenter__(self) -> "BrowserPool":
+        from playwright.async_api import async_playwright
+
+        self._pw = await async_playwright().start()
+        self._browser = await self._pw.chromium.launch(headless=self.headless)
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_page())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._browser:
+            await self._browser.close()
+        if self._pw:
+            await self._pw.stop()
+        if self._blocked:
+            print(f"🧱 Blocked {self._blocked} image/font/media requests")
+
+    async def _route(self, route) -> None:
+        if route.request.resource_type in self.block:
+            self._blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _new_page(self):
+        context = await self._browser.new_context(user_agent=self.user_agent)
+        context.set_default_timeout(self.timeout)
+        if self.block:
+            await context.route("**/*", self._route)
+        if self.init_script:
+            await context.add_init_script(self.init_script)
+        return await context.new_page()
+
+    # ---------------- checkout ----------------
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a page; it goes back to the pool (or is replaced if it died)."""
+        page = await self._idle.get()
+        try:
+            yield page
+        finally:
+            if page.is_closed():
+                await page.context.close()
+                page = await self._new_page()
+            self._idle.put_nowait(page)
+
+    async def map(
+        self,
+        fn: Callable[[Any, Any], Awaitable[Any]],
+        items: Iterable[Any],
+    ) -> List[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        Run fn(page, item) for every item, at most `size` at a time.
+
+        Returns (item, result, error) in input order; one failing item does
+        not stop the others.
+        """
+
+        async def run(item):
+            async with self.page() as page:
+                try:
+                    return item, await fn(page, item), None
+                except Exception as e:
+                    return item, None, e
+
+        return await asyncio.gather(*(run(item) for item in items))
+
+# ============================================================
+# EVENT-DRIVEN WAITS
+# ============================================================
+
+async def wait_for_count_above(page, selector: str, count: int, timeout: float = 15000) -> bool:
+    """Wait until more than `count` elements match (e.g. after LOAD MORE)."""
+    try:
+        await page.wait_for_function(
+            "([sel, n]) => document.querySelectorAll(sel).length > n",
+            arg=[selector, count],
+            timeout=timeout,
+        )
+        return True
+    except Exception:
+        return False
+
+
+# Text of every match, in order: changes whenever a client-side filter
+# replaces the list, even when no request is made
+LIST_SIGNATURE_JS = "sel => Array.from(document.querySelectorAll(sel), e => e.innerText).join('\\u0001')"
+
+
+async def list_signature(page, selector: str) -> str:
+    return await page.evaluate(LIST_SIGNATURE_JS, selector)
+
+
+async def wait_for_list_change(page, selector: str, before: str, timeout: float = 15000, quiet: float = 500) -> bool:
+    """
+    Wait until the matched list differs from `before`, then until it stops
+    changing for `quiet` ms (debounced filters re-render in steps).
+    False if it never changed, e.g. the filter kept the same results.
+    """
+    try:
+        await page.wait_for_function(
+            f"([sel, before]) => ({LIST_SIGNATURE_JS})(sel) !== before",
+            arg=[selector, before],
+            timeout=timeout,
+        )
+    except Exception:
+        return False
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout / 1000
+    current = await list_signature(page, selector)
+    while loop.time() < deadline:
+        await asyncio.sleep(quiet / 1000)
+        latest = await list_signature(page, selector)
+        if latest == current:
+            break
+        current = latest
+    return True
+
+
+async def wait_for_settle(page, timeout: float = 10000) -> None:
+    """Network idle, but never fail the scrape because a tracker kept polling."""
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout)
+    except Exception:
+        pass
@@ -0,0 +1,252 @@
+"""
+Site Crawler - Bounded breadth-first crawl with resume
+Location: scrapers/crawler.py
+
+Replaces recursive depth-first crawling:
+- URL frontier (asyncio queue) walked breadth-first, no recursion
+- canonical URLs (fragment, tracking params, default ports, case)
+- fixed worker pool sharing one session, per-host limits via DomainLimiter
+- depth and page budgets
+- results streamed to JSONL as pages finish
+- state file so an interrupted crawl picks up where it stopped
+
+Pages are fetched through any job-framework fetcher (scrapers/jobs.py),
+so the same crawl runs live, through the HTTP cache, or against fixtures.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+# ============================================================
+# URL CANONICALIZATION
+# ============================================================
+
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid", "ref", "replytocom"}
+
+SKIP_EXTENSIONS = (
+    ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".pdf",
+    ".css", ".js", ".zip", ".mp4", ".mp3", ".woff", ".woff2", ".xml",
+)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """Absolute, normalized URL, or None if it is not a crawlable page."""
+    if base:
+        url = urljoin(base, url)
+    parts = urlparse(url.strip())
+
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS:
+        return None  # mailto:, tel:, javascript:, ...
+
+    host = (parts.hostname or "").lower()
+    if not host:
+        return None
+    netloc = host
+    if parts.port and parts.port != _DEFAULT_PORTS[scheme]:
+        netloc = f"{host}:{parts.port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if path.lower().endswith(SKIP_EXTENSIONS):
+        return None
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunparse((scheme, netloc, path, "", urlencode(query), ""))
+
+# ============================================================
+# PAGE ANALYSIS (NO FULL DOM PARSE)
+# ============================================================
+
+_HREF_RE = re.compile(r"""<a\s[^>]*?href\s*=\s*["']([^"'#][^"']*)["']""", re.IGNORECASE)
+_INVISIBLE_RE = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def extract_links(html: str, page_url: str) -> List[str]:
+    links = []
+    for href in _HREF_RE.findall(html):
+        url = canonicalize_url(unescape(href), page_url)
+        if url:
+            links.append(url)
+    return links
+
+
+def keyword_matcher(keywords: Iterable[str]):
+    """One compiled regex for all keywords; returns the distinct hits in a page."""
+    pattern = re.compile("|".join(re.escape(k.lower()) for k in keywords), re.IGNORECASE)
+
+    def match(html: str) -> List[str]:
+        text = _TAG_RE.sub(" ", _INVISIBLE_RE.sub(" ", html))
+        return sorted({m.group(0).lower() for m in pattern.finditer(text)})
+
+    return match
+
+# ============================================================
+# CRAWL STATE (RESUME)
+# ============================================================
+
+@dataclass
+class CrawlState:
+    done: Set[str] = field(default_factory=set)
+    pending: Dict[str, int] = field(default_factory=dict)   # url -> depth, queued or in flight
+    pages: int = 0
+    matched: int = 0
+
+    @property
+    def seen(self) -> Set[str]:
+        return self.done | set(self.pending)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "CrawlState":
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            done=set(data["done"]),
+            pending=data["pending"],
+            pages=data.get("pages", 0),
+            matched=data.get("matched", 0),
+        )
+
+    def save(self, path: Optional[str]) -> None:
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "done": sorted(self.done),
+                "pending": self.pending,
+                "pages": self.pages,
+                "matched": self.matched,
+            }, f)
+        os.replace(tmp, path)
+
+# ============================================================
+# CRAWLER
+# ============================================================
+
+class Crawler:
+    """
+    Args:
+        fetcher: any scrapers.jobs fetcher (HttpFetcher, CachingFetcher, FixtureFetcher)
+        keywords: page matches if any keyword appears in its visible text
+        output_path: JSONL, one line per fetched page
+        state_path: resume file (optional)
+        allowed_hosts: hosts to follow links into (default: the start URLs' hosts)
+    """
+
+    def __init__(
+        self,
+        fetcher,
+        keywords: Iterable[str],
+        output_path: str,
+        state_path: Optional[str] = None,
+        max_depth: int = 5,
+        max_pages: int = 5000,
+        workers: int = 8,
+        allowed_hosts: Optional[Iterable[str]] = None,
+        save_every: int = 50,
+    ):
+        self.fetcher = fetcher
+        self.match = keyword_matcher(keywords)
+        self.output_path = output_path
+        self.state_path = state_path
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = workers
+        self.allowed_hosts = set(allowed_hosts or ())
+        self.save_every = save_every
+
+        self.state = CrawlState.load(state_path)
+        self._seen: Set[str] = self.state.seen
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._out = None
+
+    def _allowed(self, url: str) -> bool:
+        return urlparse(url).netloc in self.allowed_hosts
+
+    def _enqueue(self, url: str, depth: int) -> None:
+        if url in self._seen or depth > self.max_depth:
+            return
+        if len(self._seen) >= self.max_pages:
+            return  # page budget covers everything ever queued
+        self._seen.add(url)
+        self.state.pending[url] = depth
+        self._queue.put_nowait((url, depth))
+
+    async def _visit(self, url: str, depth: int) -> None:
+        record = {"url": url, "depth": depth, "status": None, "matched": [], "links": 0}
+        try:
+            resp = await self.fetcher.get(url)
+            record["status"] = resp.status
+            content_type = (resp.headers.get("Content-Type") or "text/html").lower()
+            if resp.status == 200 and "html" in content_type:
+                html = resp.text
+                record["matched"] = self.match(html)
+                links = [u for u in extract_links(html, url) if self._allowed(u)]
+                record["links"] = len(links)
+                for link in links:
+                    self._enqueue(link, depth + 1)
+        except Exception as e:
+            record["error"] = str(e)[:200]
+
+        self._out.write(json.dumps(record) + "\n")
+        self.state.pending.pop(url, None)
+        self.state.done.add(url)
+        self.state.pages += 1
+        if record["matched"]:
+            self.state.matched += 1
+        if self.state.pages % self.save_every == 0:
+            self._out.flush()
+            self.state.save(self.state_path)
+
+    async def _worker(self) -> None:
+        while True:
+            url, depth = await self._queue.get()
+            try:
+                await self._visit(url, depth)
+            finally:
+                self._queue.task_done()
+
+    async def run(self, start_urls: Iterable[str]) -> CrawlState:
+        start = [canonicalize_url(u) for u in start_urls]
+        start = [u for u in start if u]
+        if not self.allowed_hosts:
+            self.allowed_hosts = {urlparse(u).netloc for u in start}
+
+        # Resume: anything queued or in flight last time goes back in the queue
+        for url, depth in self.state.pending.items():
+            self._queue.put_nowait((url, depth))
+        for url in start:
+            self._enqueue(url, 0)
+
+        began = time.time()
+        with open(self.output_path, "a", encoding="utf-8") as out:
+            self._out = out
+            tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+            try:
+                await self._queue.join()
+            finally:
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self.state.save(self.state_path)
+                self._out = None
+
+        elapsed = time.time() - began
+        print(f"🕸️ Crawled {self.state.pages} pages ({self.state.matched} matched) in {elapsed:.1f}s")
+        return self.state
@@ -0,0 +1,336 @@
+"""
+Geocoding Stage - Concurrent, cached geocoding fed by scrapers
+Location: scrapers/geocoding.py
+
+Scrapers no longer geocode inline. They push raw records into a
+GeocodeStage queue and keep scraping; stage workers resolve addresses
+concurrently (aiohttp, nothing blocking on the event loop) and fill the
+record's geo fields in place.
+
+- one cache lookup per normalized address (SQLite, negatives included)
+- identical in-flight addresses share a single request
+- per-geocoder politeness (Nominatim: 1 req/s)
+- StubGeocoder for offline runs and fixtures
+
+Usage:
+    async with GeocodeStage(make_geocoder("nominatim"), fields=PT_FIELDS) as stage:
+        for row in rows:
+            await stage.submit(row, row["address"])
+    # all rows geocoded here
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from scrapers.jobs import DomainLimiter
+
+# ============================================================
+# RESULT
+# ============================================================
+
+@dataclass
+class GeoResult:
+    lat: Any = ""
+    lon: Any = ""
+    city: str = ""
+    state: str = ""
+    zip: str = ""
+    country: str = ""
+
+
+def normalize_address(address: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", (address or "").lower())).strip()
+
+# ============================================================
+# GEOCODERS
+# ============================================================
+
+class Geocoder:
+    """Async geocoder; subclasses set their endpoint and politeness limits."""
+
+    name = "base"
+    endpoint = ""
+    max_concurrent = 4
+    min_interval = 0.0
+
+    async def geocode(self, session, address: str) -> Optional[GeoResult]:
+        raise NotImplementedError
+
+
+class GoogleGeocoder(Geocoder):
+    name = "google"
+    endpoint = "https://maps.googleapis.com/maps/api/geocode/json"
+    max_concurrent = 8
+    min_interval = 0.02
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    async def geocode(self, session, address: str) -> Optional[GeoResult]:
+        async with session.get(self.endpoint, params={"address": address, "key": self.api_key}) as resp:
+            data = await resp.json()
+
+        if data.get("status") == "ZERO_RESULTS":
+            return None
+        if data.get("status") != "OK":
+            raise RuntimeError(f"Google geocode status {data.get('status')}")
+
+        result = data["results"][0]
+        geo = GeoResult(
+            lat=result["geometry"]["location"]["lat"],
+            lon=result["geometry"]["location"]["lng"],
+        )
+        for comp in result["address_components"]:
+            if "locality" in comp["types"]:
+                geo.city = comp["long_name"]
+            if "administrative_area_level_1" in comp["types"]:
+                geo.state = comp["short_name"]
+            if "postal_code" in comp["types"]:
+                geo.zip = comp["long_name"]
+            if "country" in comp["types"]:
+                geo.country = comp["long_name"]
+        return geo
+
+
+class NominatimGeocoder(Geocoder):
+    name = "nominatim"
+    endpoint = "https://nominatim.openstreetmap.org/search"
+    max_concurrent = 1
+    min_interval = 1.0   # OSM usage policy
+
+    def __init__(self, user_agent: str = "AutizimBot-Geocoder/1.0"):
+        self.user_agent = user_agent
+
+    async def geocode(self, session, address: str) -> Optional[GeoResult]:
+        params = {"q": address, "format": "json", "limit": 1, "addressdetails": 1}
+        async with session.get(self.endpoint, params=params, headers={"User-Agent": self.user_agent}) as resp:
+            data = await resp.json()
+
+        if not data:
+            return None
+        hit = data[0]
+        details = hit.get("address", {})
+        return GeoResult(
+            lat=hit["lat"],
+            lon=hit["lon"],
+            city=details.get("city") or details.get("town") or details.get("village") or "",
+            state=details.get("state", ""),
+            zip=details.get("postcode", ""),
+            country=details.get("country", ""),
+        )
+
+
+class StubGeocoder(Geocoder):
+    """
+    Offline geocoder: looks addresses up in a table, otherwise derives a
+    stable fake point from the address hash. Optional delay simulates latency.
+    """
+
+    name = "stub"
+    endpoint = "stub://geocoder"
+    max_concurrent = 16
+
+    def __init__(self, table: Optional[Dict[str, GeoResult]] = None, delay: float = 0.0):
+        self.table = {normalize_address(k): v for k, v in (table or {}).items()}
+        self.delay = delay
+        self.calls = 0
+
+    async def geocode(self, session, address: str) -> Optional[GeoResult]:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        key = normalize_address(address)
+        if key in self.table:
+            return self.table[key]
+        digest = int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16)
+        return GeoResult(lat=round(25 + (digest % 10000) / 1000, 6), lon=round(-80 - (digest >> 16) % 10000 / 1000, 6))
+
+
+def make_geocoder(name: str, api_key: Optional[str] = None) -> Geocoder:
+    if name == "google":
+        key = api_key or os.getenv("GOOGLE_MAPS_API_KEY")
+        if not key:
+            raise ValueError("❌ GOOGLE_MAPS_API_KEY is not set")
+        return GoogleGeocoder(key)
+    if name == "nominatim":
+        return NominatimGeocoder()
+    if name == "stub":
+        return StubGeocoder()
+    raise ValueError(f"Unknown geocoder: {name}")
+
+# ============================================================
+# CACHE
+# ============================================================
+
+class GeocodeCache:
+    """
+    Address -> GeoResult (or None for "no match"), persisted in SQLite.
+
+    Loaded into memory on open; new entries are written in batches, so
+    lookups never touch the disk while the stage is running.
+    """
+
+    def __init__(self, path: str = "geocode_cache.sqlite", flush_every: int = 100):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocodes (geocoder TEXT, address TEXT, result TEXT, "
+            "PRIMARY KEY (geocoder, address))"
+        )
+        self.flush_every = flush_every
+        self._memory: Dict[tuple, Optional[GeoResult]] = {}
+        self._pending: List[tuple] = []
+
+        for geocoder, address, result in self.conn.execute("SELECT geocoder, address, result FROM geocodes"):
+            self._memory[(geocoder, address)] = GeoResult(**json.loads(result)) if result else None
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._memory
+
+    def get(self, key: tuple) -> Optional[GeoResult]:
+        return self._memory.get(key)
+
+    def put(self, key: tuple, result: Optional[GeoResult]) -> None:
+        self._memory[key] = result
+        self._pending.append((*key, json.dumps(asdict(result)) if result else None))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            with self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO geocodes VALUES (?, ?, ?)", self._pending)
+            self._pending = []
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+# ============================================================
+# STAGE
+# ============================================================
+
+# GeoResult attribute -> record column
+DEFAULT_FIELDS = {"lat": "lat", "lon": "lon"}
+
+
+class GeocodeStage:
+    """
+    Args:
+        geocoder: Geocoder implementation
+        fields: {GeoResult attr: record key} to fill on each record
+        cache_path: SQLite cache file (None = in-memory only)
+        workers: concurrent geocoding workers (still capped by the geocoder's limits)
+        max_attempts: tries per address on errors
+    """
+
+    def __init__(
+        self,
+        geocoder: Geocoder,
+        fields: Optional[Dict[str, str]] = None,
+        cache_path: Optional[str] = "geocode_cache.sqlite",
+        workers: int = 8,
+        queue_size: int = 1000,
+        max_attempts: int = 3,
+    ):
+        self.geocoder = geocoder
+        self.fields = fields or DEFAULT_FIELDS
+        self.cache = GeocodeCache(cache_path or ":memory:")
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.limiter = DomainLimiter(geocoder.max_concurrent, geocoder.min_interval)
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._session = None
+        self.stats = {"submitted": 0, "cache_hits": 0, "geocoded": 0, "not_found": 0, "failed": 0}
+
+    async def __aenter__(self) -> "GeocodeStage":
+        import aiohttp
+
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=20))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, exc_type, *exc) -> None:
+        try:
+            if exc_type is None:
+                await self._queue.join()
+        finally:
+            for t in self._tasks:
+                t.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._session.close()
+            self.cache.close()
+
+        s = self.stats
+        print(f"🌍 Geocoding ({self.geocoder.name}): {s['submitted']} records, "
+              f"{s['cache_hits']} cached, {s['geocoded']} geocoded, "
+              f"{s['not_found']} not found, {s['failed']} failed")
+
+    async def submit(self, record: Dict[str, Any], address: str) -> None:
+        """Queue a record; waits only if the stage is `queue_size` records behind."""
+        self.stats["submitted"] += 1
+        await self._queue.put((record, address))
+
+    def _apply(self, record: Dict[str, Any], result: Optional[GeoResult]) -> None:
+        if result is None:
+            return
+        for attr, column in self.fields.items():
+            record[column] = getattr(result, attr)
+
+    async def _resolve(self, address: str) -> Optional[GeoResult]:
+        key = (self.geocoder.name, normalize_address(address))
+        if not key[1]:
+            return None
+        if key in self.cache:
+            self.stats["cache_hits"] += 1
+            return self.cache.get(key)
+
+        # Another worker is already geocoding this address
+        if key[1] in self._in_flight:
+            self.stats["cache_hits"] += 1
+            return await self._in_flight[key[1]]
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key[1]] = future
+        try:
+            result = await self._lookup(address)
+            if result is not None:
+                self.stats["geocoded"] += 1
+            else:
+                self.stats["not_found"] += 1
+            self.cache.put(key, result)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"⚠️ Geocode failed for {address!r}: {e}")
+            future.set_result(None)  # not cached: retried on the next run
+            return None
+        finally:
+            del self._in_flight[key[1]]
+
+    async def _lookup(self, address: str) -> Optional[GeoResult]:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self.limiter.slot(self.geocoder.endpoint):
+                    return await self.geocoder.geocode(self._session, address)
+            except Exception:
+                if attempt == self.max_attempts:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def _worker(self) -> None:
+        while True:
+            record, address = await self._queue.get()
+            try:
+                self._apply(record, await self._resolve(address))
+            finally:
+                self._queue.task_done()
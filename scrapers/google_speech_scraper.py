@@ -4,6 +4,10 @@ import time
 import requests
 from dotenv import load_dotenv
 
+from scrapers.jobs import Adapter, UnitResult
+
+# Run from the repo root: python -m scrapers.google_speech_scraper
+
 load_dotenv()
 
 SERPAPI_KEY = os.getenv("SERPAPI_KEY")
@@ -69,93 +73,135 @@ US_STATES = {
 # SERPAPI SEARCH FUNCTION
 # ------------------------------------------
 
-def serpapi_search(query):
-    url = "https://serpapi.com/search"
+SERPAPI_URL = "https://serpapi.com/search"
 
-    params = {
+LOW_RESULTS = 15  # below this, metro cities are searched too
+
+FIELDNAMES = [
+    "title",
+    "address",
+    "phone",
+    "website",
+    "rating",
+    "reviews",
+    "type",
+    "place_id",
+]
+
+
+def serpapi_params(query):
+    return {
         "engine": "google_maps",
         "q": query,
         "type": "search",
         "api_key": SERPAPI_KEY
     }
 
-    resp = requests.get(url, params=params)
+
+def serpapi_search(query):
+    resp = requests.get(SERPAPI_URL, params=serpapi_params(query))
     data = resp.json()
 
     return data.get("local_results", [])
 
 
+def to_row(p):
+    return {field: p.get(field, "") for field in FIELDNAMES}
+
+
+# ------------------------------------------
+# JOB FRAMEWORK ADAPTER
+# ------------------------------------------
+
+class GoogleSpeechAdapter(Adapter):
+    """One unit per state: state-level query, metro fallback when thin."""
+
+    name = "google_speech"
+    fieldnames = FIELDNAMES
+
+    def units(self):
+        return [self.unit(state, state=state) for state in US_STATES]
+
+    async def _search(self, fetcher, query):
+        resp = await fetcher.get(SERPAPI_URL, params=serpapi_params(query))
+        if resp.status != 200:
+            raise RuntimeError(f"SerpAPI {resp.status} for {query!r}")
+        return resp.json().get("local_results", [])
+
+    async def run_unit(self, unit, fetcher):
+        state = unit.payload["state"]
+        providers = await self._search(fetcher, f"speech therapist {state}")
+        state_providers = {p.get("place_id"): p for p in providers}
+
+        if len(providers) < LOW_RESULTS:
+            for city in US_STATES[state]:
+                for p in await self._search(fetcher, f"speech therapist {city} {state}"):
+                    state_providers[p.get("place_id")] = p
+
+        return UnitResult(rows=[to_row(p) for p in state_providers.values()])
+
+
 # ------------------------------------------
 # MAIN SCRAPER
 # ------------------------------------------
 
-all_results = {}
-total_saved = 0
+def scrape_all():
+    all_results = {}
+
+    print("🚀 Starting NATIONAL Speech Therapist Scraper (Option B)\n")
+
+    for state, metros in US_STATES.items():
+        print(f"\n===============================")
+        print(f"📍 STATE: {state}")
+        print("===============================")
 
-print("🚀 Starting NATIONAL Speech Therapist Scraper (Option B)\n")
+        base_query = f"speech therapist {state}"
 
-for state, metros in US_STATES.items():
-    print(f"\n===============================")
-    print(f"📍 STATE: {state}")
-    print("===============================")
+        # 1) STATE-LEVEL SCRAPE
+        providers = serpapi_search(base_query)
+        print(f"   • Found {len(providers)} from state-level search")
 
-    base_query = f"speech therapist {state}"
+        # Store temporary
+        state_providers = {p.get("place_id"): p for p in providers}
 
-    # 1) STATE-LEVEL SCRAPE
-    providers = serpapi_search(base_query)
-    print(f"   • Found {len(providers)} from state-level search")
+        # 2) If LOW RESULTS — run metro cities (Option B logic)
+        if len(providers) < LOW_RESULTS:
+            print("   ⚠️ Low results — running metro cities...")
+            for city in metros:
+                q = f"speech therapist {city} {state}"
+                city_providers = serpapi_search(q)
+                print(f"      → {city}: {len(city_providers)} found")
+                for p in city_providers:
+                    state_providers[p.get("place_id")] = p
 
-    # Store temporary
-    state_providers = {p.get("place_id"): p for p in providers}
+        # Merge into global dataset
+        for pid, pdata in state_providers.items():
+            all_results[pid] = pdata
 
-    # 2) If LOW RESULTS — run metro cities (Option B logic)
-    if len(providers) < 15:
-        print("   ⚠️ Low results — running metro cities...")
-        for city in metros:
-            q = f"speech therapist {city} {state}"
-            city_providers = serpapi_search(q)
-            print(f"      → {city}: {len(city_providers)} found")
-            for p in city_providers:
-                state_providers[p.get("place_id")] = p
+        print(f"   ✅ Total unique for {state}: {len(state_providers)}")
 
-    # Merge into global dataset
-    for pid, pdata in state_providers.items():
-        all_results[pid] = pdata
+    return all_results
 
-    print(f"   ✅ Total unique for {state}: {len(state_providers)}")
 
 # ------------------------------------------
 # SAVE TO CSV
 # ------------------------------------------
 
 FILENAME = "speech_therapists_USA.csv"
-print(f"\n💾 Saving all results to {FILENAME}...")
 
-fieldnames = [
-    "title",
-    "address",
-    "phone",
-    "website",
-    "rating",
-    "reviews",
-    "type",
-    "place_id",
-]
 
-with open(FILENAME, "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=fieldnames)
-    writer.writeheader()
-
-    for p in all_results.values():
-        writer.writerow({
-            "title": p.get("title", ""),
-            "address": p.get("address", ""),
-            "phone": p.get("phone", ""),
-            "website": p.get("website", ""),
-            "rating": p.get("rating", ""),
-            "reviews": p.get("reviews", ""),
-            "type": p.get("type", ""),
-            "place_id": p.get("place_id", "")
-        })
-
-print(f"\n🎉 DONE! TOTAL NATIONWIDE UNIQUE PROVIDERS: {len(all_results)}")
+def save_csv(all_results):
+    print(f"\n💾 Saving all results to {FILENAME}...")
+
+    with open(FILENAME, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+
+        for p in all_results.values():
+            writer.writerow(to_row(p))
+
+    print(f"\n🎉 DONE! TOTAL NATIONWIDE UNIQUE PROVIDERS: {len(all_results)}")
+
+
+if __name__ == "__main__":
+    save_csv(scrape_all())
@@ -0,0 +1,243 @@
+"""
+HTTP Response Cache - Conditional requests + offline replay for scrapers
+Location: scrapers/http_cache.py
+
+Directory pages rarely change between runs, so every GET goes through a
+shared on-disk cache:
+- bodies are content-addressed (sha256), identical pages are stored once
+- per-URL metadata keeps ETag / Last-Modified for conditional requests
+- a re-scrape mostly gets 304s and reuses the stored body
+- offline mode replays the cache without touching the network
+- hit ratios are tracked per domain
+
+Config (env):
+    SCRAPER_CACHE_DIR   cache root (default .http_cache)
+    SCRAPER_OFFLINE=1   replay only, never hit the network
+    SCRAPER_CACHE_MAX_AGE  seconds a cached page is served without revalidation
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from scrapers.jobs import FetchResponse, full_url, redacted_url
+
+
+class CacheMiss(Exception):
+    """Offline mode and the URL was never cached."""
+
+
+# ============================================================
+# PER-DOMAIN STATS
+# ============================================================
+
+class CacheStats:
+    FIELDS = ("fresh", "revalidated", "downloaded", "errors")
+
+    def __init__(self):
+        self.by_domain: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def record(self, url: str, outcome: str) -> None:
+        self.by_domain[urlparse(url).netloc][outcome] += 1
+
+    def hit_ratio(self, domain: str) -> float:
+        s = self.by_domain[domain]
+        total = sum(s.values())
+        return (s["fresh"] + s["revalidated"]) / total if total else 0.0
+
+    def report(self) -> str:
+        lines = ["📦 HTTP cache (per domain):"]
+        for domain, s in sorted(self.by_domain.items()):
+            lines.append(
+                f"   {domain}: hit ratio {self.hit_ratio(domain):.0%} "
+                f"(fresh {s['fresh']}, 304 {s['revalidated']}, "
+                f"downloaded {s['downloaded']}, errors {s['errors']})"
+            )
+        return "\n".join(lines)
+
+# ============================================================
+# CACHE
+# ============================================================
+
+class HttpCache:
+    def __init__(self, root: str = ".http_cache", offline: bool = False, max_age: float = 0):
+        self.root = root
+        self.offline = offline
+        self.max_age = max_age
+        self.stats = CacheStats()
+        os.makedirs(os.path.join(root, "bodies"), exist_ok=True)
+        os.makedirs(os.path.join(root, "meta"), exist_ok=True)
+
+    # ---------------- storage ----------------
+
+    def _meta_path(self, url: str) -> str:
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "meta", f"{digest}.json")
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.root, "bodies", body_hash[:2], body_hash)
+
+    def _load_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _store(self, url: str, body: bytes, encoding: Optional[str], headers) -> Dict[str, Any]:
+        body_hash = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(body_hash)
+        if not os.path.exists(body_path):
+            self._write_atomic(body_path, body)
+
+        # Header names are case-insensitive; fetchers may hand over a plain dict
+        headers = {k.lower(): v for k, v in headers.items()}
+        meta = {
+            "url": url,
+            "body_hash": body_hash,
+            "encoding": encoding or "utf-8",
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "content_type": headers.get("content-type"),
+            "fetched_at": time.time(),
+        }
+        self._save_meta(url, meta)
+        return meta
+
+    def _save_meta(self, url: str, meta: Dict[str, Any]) -> None:
+        self._write_atomic(self._meta_path(url), json.dumps(meta).encode("utf-8"))
+
+    def _cached_response(self, meta: Dict[str, Any], network: bool = False) -> FetchResponse:
+        with open(self._body_path(meta["body_hash"]), "rb") as f:
+            text = f.read().decode(meta.get("encoding") or "utf-8", errors="replace")
+        headers = {"Content-Type": meta.get("content_type") or ""}
+        return FetchResponse(meta["url"], 200, text, headers, from_cache=True, network=network)
+
+    # ---------------- request planning ----------------
+
+    def _conditional_headers(self, meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        if not meta:
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def _lookup(self, key: str):
+        """Returns (meta, served) where served is a response if no request is needed."""
+        meta = self._load_meta(key)
+        if meta and (self.offline or (self.max_age and time.time() - meta["fetched_at"] < self.max_age)):
+            self.stats.record(key, "fresh")
+            return meta, self._cached_response(meta)
+        if self.offline:
+            self.stats.record(key, "errors")
+            raise CacheMiss(key)
+        return meta, None
+
+    def _complete(self, key, meta, status, body: bytes, encoding, headers) -> FetchResponse:
+        if status == 304 and meta:
+            meta["fetched_at"] = time.time()
+            self._save_meta(key, meta)
+            self.stats.record(key, "revalidated")
+            return self._cached_response(meta, network=True)
+
+        if status == 200:
+            self._store(key, body, encoding, headers)
+            self.stats.record(key, "downloaded")
+        else:
+            self.stats.record(key, "errors")
+
+        text = body.decode(encoding or "utf-8", errors="replace")
+        return FetchResponse(key, status, text, dict(headers))
+
+    # ---------------- sync (requests) ----------------
+
+    def get(self, url: str, params=None, headers=None, timeout: float = 20, session=None) -> FetchResponse:
+        """GET through the cache with requests (or a requests.Session)."""
+        key = redacted_url(url, params)
+        meta, served = self._lookup(key)
+        if served:
+            return served
+
+        import requests
+
+        http = session or requests
+        resp = http.get(
+            full_url(url, params),
+            headers={**(headers or {}), **self._conditional_headers(meta)},
+            timeout=timeout,
+        )
+        return self._complete(key, meta, resp.status_code, resp.content, resp.encoding, resp.headers)
+
+    # ---------------- async (aiohttp) ----------------
+
+    async def aget(self, session, url: str, params=None, headers=None, timeout: float = 20) -> FetchResponse:
+        """GET through the cache with an aiohttp.ClientSession."""
+        import aiohttp
+
+        key = redacted_url(url, params)
+        meta, served = self._lookup(key)
+        if served:
+            return served
+
+        async with session.get(
+            full_url(url, params),
+            headers={**(headers or {}), **self._conditional_headers(meta)},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as resp:
+            body = await resp.read()
+            encoding = resp.get_encoding() if body else "utf-8"
+            return self._complete(key, meta, resp.status, body, encoding, resp.headers)
+
+
+class CachingFetcher:
+    """Job-framework fetcher (scrapers/jobs.py) backed by the HTTP cache."""
+
+    def __init__(self, inner, cache: HttpCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def get(self, url: str, params=None, headers=None) -> FetchResponse:
+        key = redacted_url(url, params)
+        meta, served = self.cache._lookup(key)
+        if served:
+            return served
+
+        resp = await self.inner.get(
+            url,
+            params=params,
+            headers={**(headers or {}), **self.cache._conditional_headers(meta)},
+        )
+        body = resp.text.encode("utf-8")
+        return self.cache._complete(key, meta, resp.status, body, "utf-8", resp.headers)
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_default_cache: Optional[HttpCache] = None
+
+
+def default_cache() -> HttpCache:
+    """Process-wide cache configured from the environment."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache(
+            root=os.getenv("SCRAPER_CACHE_DIR", ".http_cache"),
+            offline=os.getenv("SCRAPER_OFFLINE", "") == "1",
+            max_age=float(os.getenv("SCRAPER_CACHE_MAX_AGE", "0")),
+        )
+    return _default_cache
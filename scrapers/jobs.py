@@ -0,0 +1,469 @@
+"""
+Scraper Job Framework - Resumable, parallel, polite scraping
+Location: scrapers/jobs.py
+
+Every source is split into small work units (one state, one page, one URL).
+Units live in a persistent SQLite job store, so a crash at state 40 resumes
+at state 40. A bounded async worker pool runs units with per-domain
+politeness limits, and each finished unit is written to its own part file
+right away (incremental output).
+
+Sources plug in as small Adapter subclasses; HTTP goes through a Fetcher,
+which can be live (aiohttp), recording, or replaying recorded fixtures
+fully offline.
+"""
+
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlencode, urlparse
+
+# ============================================================
+# WORK UNITS
+# ============================================================
+
+@dataclass
+class WorkUnit:
+    source: str
+    key: str                      # e.g. "FL", "page=3", a URL
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def uid(self) -> str:
+        return f"{self.source}:{self.key}"
+
+
+@dataclass
+class UnitResult:
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    follow_ups: List[WorkUnit] = field(default_factory=list)   # e.g. next page
+
+# ============================================================
+# JOB STORE (SQLITE)
+# ============================================================
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobStore:
+    """Persistent record of which units are pending, done or failed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS units (
+                source TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                rows INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL,
+                PRIMARY KEY (source, key)
+            )
+        """)
+        self.conn.commit()
+
+    def add(self, units: Iterable[WorkUnit]) -> None:
+        """Register units; already-known units keep their status."""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO units (source, key, payload, updated_at) VALUES (?, ?, ?, ?)",
+            [(u.source, u.key, json.dumps(u.payload), now) for u in units],
+        )
+        self.conn.commit()
+
+    def pending(self, source: str, retry_failed: bool = False) -> List[WorkUnit]:
+        statuses = (PENDING, FAILED) if retry_failed else (PENDING,)
+        marks = ",".join("?" * len(statuses))
+        cur = self.conn.execute(
+            f"SELECT key, payload FROM units WHERE source = ? AND status IN ({marks}) ORDER BY rowid",
+            (source, *statuses),
+        )
+        return [WorkUnit(source, key, json.loads(payload)) for key, payload in cur.fetchall()]
+
+    def mark_done(self, unit: WorkUnit, rows: int, follow_ups: Iterable[WorkUnit] = ()) -> List[WorkUnit]:
+        """Mark done and register follow-ups in one transaction; returns the new ones."""
+        now = time.time()
+        added = []
+        with self.conn:
+            for u in follow_ups:
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO units (source, key, payload, updated_at) VALUES (?, ?, ?, ?)",
+                    (u.source, u.key, json.dumps(u.payload), now),
+                )
+                if cur.rowcount:
+                    added.append(u)
+            self.conn.execute(
+                "UPDATE units SET status = ?, rows = ?, attempts = attempts + 1, error = NULL, updated_at = ? "
+                "WHERE source = ? AND key = ?",
+                (DONE, rows, now, unit.source, unit.key),
+            )
+        return added
+
+    def mark_failed(self, unit: WorkUnit, error: str) -> None:
+        self.conn.execute(
+            "UPDATE units SET status = ?, attempts = attempts + 1, error = ?, updated_at = ? "
+            "WHERE source = ? AND key = ?",
+            (FAILED, error[:500], time.time(), unit.source, unit.key),
+        )
+        self.conn.commit()
+
+    def stats(self, source: str) -> Dict[str, int]:
+        cur = self.conn.execute(
+            "SELECT status, COUNT(*), COALESCE(SUM(rows), 0) FROM units WHERE source = ? GROUP BY status",
+            (source,),
+        )
+        out = {PENDING: 0, DONE: 0, FAILED: 0, "rows": 0}
+        for status, count, rows in cur.fetchall():
+            out[status] = count
+            out["rows"] += rows
+        return out
+
+    def close(self) -> None:
+        self.conn.close()
+
+# ============================================================
+# PER-DOMAIN POLITENESS
+# ============================================================
+
+@dataclass
+class Ticket:
+    """Handed out by a limiter slot; the caller flags throttled/failed requests."""
+    ok: bool = True
+
+
+class DomainLimiter:
+    """
+    Caps concurrent requests per domain and spaces request starts.
+
+    Args:
+        max_concurrent: simultaneous requests per domain
+        min_interval: seconds between request starts per domain
+        overrides: {domain: (max_concurrent, min_interval)}
+    """
+
+    def __init__(self, max_concurrent: int = 2, min_interval: float = 1.0, overrides=None):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self.overrides = overrides or {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {}
+
+    def _limits(self, domain: str):
+        return self.overrides.get(domain, (self.max_concurrent, self.min_interval))
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        domain = urlparse(url).netloc
+        concurrent, interval = self._limits(domain)
+
+        if domain not in self._semaphores:
+            self._semaphores[domain] = asyncio.Semaphore(concurrent)
+            self._locks[domain] = asyncio.Lock()
+
+        async with self._semaphores[domain]:
+            async with self._locks[domain]:
+                wait = self._next_start.get(domain, 0.0) - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._next_start[domain] = time.monotonic() + interval
+            yield Ticket()
+
+
+class AimdLimiter:
+    """
+    Adaptive per-domain concurrency (additive increase, multiplicative decrease).
+
+    Each domain starts at `initial` concurrent requests. A fast, successful
+    request grows the window by ~1 per window's worth of completions; an
+    error, a throttled response (ticket.ok = False) or latency above
+    `target_latency` halves it, at most once per `target_latency` seconds.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 32,
+        target_latency: float = 2.0,
+        decrease: float = 0.5,
+    ):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.decrease = decrease
+        self._limit: Dict[str, float] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._conditions: Dict[str, asyncio.Condition] = {}
+        self._last_decrease: Dict[str, float] = {}
+
+    def limit(self, domain: str) -> int:
+        return int(self._limit.get(domain, self.initial))
+
+    def _record(self, domain: str, latency: float, ok: bool) -> None:
+        limit = self._limit[domain]
+        now = time.monotonic()
+        if ok and latency <= self.target_latency:
+            self._limit[domain] = min(self.maximum, limit + 1.0 / limit)
+        elif now - self._last_decrease.get(domain, 0.0) >= self.target_latency:
+            self._limit[domain] = max(self.minimum, limit * self.decrease)
+            self._last_decrease[domain] = now
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        domain = urlparse(url).netloc
+        if domain not in self._conditions:
+            self._conditions[domain] = asyncio.Condition()
+            self._limit[domain] = float(self.initial)
+            self._in_flight[domain] = 0
+
+        cond = self._conditions[domain]
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight[domain] < self.limit(domain))
+            self._in_flight[domain] += 1
+
+        ticket = Ticket()
+        started = time.monotonic()
+        try:
+            yield ticket
+        except Exception:
+            ticket.ok = False
+            raise
+        finally:
+            self._record(domain, time.monotonic() - started, ticket.ok)
+            async with cond:
+                self._in_flight[domain] -= 1
+                cond.notify_all()
+
+# ============================================================
+# FETCHERS (LIVE / RECORDING / OFFLINE FIXTURES)
+# ============================================================
+
+@dataclass
+class FetchResponse:
+    url: str
+    status: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False      # body came from the cache (fresh hit or 304)
+    network: bool = True          # a request was sent (False for fresh / offline hits)
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class FixtureMissing(Exception):
+    pass
+
+
+def full_url(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    if not params:
+        return url
+    sep = "&" if "?" in url else "?"
+    return f"{url}{sep}{urlencode(sorted(params.items()))}"
+
+
+# Credentials never end up in fixture names or recorded URLs
+SECRET_PARAMS = {"api_key", "key", "access_token", "token"}
+
+
+def redacted_url(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    public = {k: v for k, v in (params or {}).items() if k not in SECRET_PARAMS}
+    return full_url(url, public)
+
+
+def fixture_name(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    return hashlib.sha1(redacted_url(url, params).encode("utf-8")).hexdigest() + ".json"
+
+
+class HttpFetcher:
+    """Live fetcher: one shared aiohttp session, every call limited per domain."""
+
+    def __init__(self, session, limiter, headers=None, timeout: float = 20):
+        self.session = session
+        self.limiter = limiter
+        self.headers = headers or {}
+        self.timeout = timeout
+
+    async def get(self, url: str, params=None, headers=None) -> FetchResponse:
+        import aiohttp
+
+        target = full_url(url, params)
+        async with self.limiter.slot(target) as ticket:
+            async with self.session.get(
+                target,
+                headers={**self.headers, **(headers or {})},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as resp:
+                text = await resp.text()
+                ticket.ok = resp.status != 429 and resp.status < 500
+                return FetchResponse(str(resp.url), resp.status, text, dict(resp.headers))
+
+
+class RecordingFetcher:
+    """Wraps a live fetcher and saves every response as a fixture."""
+
+    def __init__(self, inner, fixture_dir: str):
+        self.inner = inner
+        self.fixture_dir = fixture_dir
+        os.makedirs(fixture_dir, exist_ok=True)
+
+    async def get(self, url: str, params=None, headers=None) -> FetchResponse:
+        resp = await self.inner.get(url, params=params, headers=headers)
+        path = os.path.join(self.fixture_dir, fixture_name(url, params))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": redacted_url(url, params),
+                "status": resp.status,
+                "headers": resp.headers,
+                "body": resp.text,
+            }, f)
+        return resp
+
+
+class FixtureFetcher:
+    """Replays recorded responses; never touches the network."""
+
+    def __init__(self, fixture_dir: str):
+        self.fixture_dir = fixture_dir
+
+    async def get(self, url: str, params=None, headers=None) -> FetchResponse:
+        path = os.path.join(self.fixture_dir, fixture_name(url, params))
+        if not os.path.exists(path):
+            raise FixtureMissing(redacted_url(url, params))
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return FetchResponse(data["url"], data["status"], data["body"], data.get("headers", {}))
+
+# ============================================================
+# ADAPTERS
+# ============================================================
+
+class Adapter:
+    """
+    Base class for a scraping source.
+
+    Subclasses set `name` / `fieldnames`, list their initial units and turn
+    one unit into rows (plus optional follow-up units such as next pages).
+    """
+
+    name: str = ""
+    fieldnames: List[str] = []
+
+    def units(self) -> Iterable[WorkUnit]:
+        raise NotImplementedError
+
+    async def run_unit(self, unit: WorkUnit, fetcher) -> UnitResult:
+        raise NotImplementedError
+
+    def unit(self, key: str, **payload) -> WorkUnit:
+        return WorkUnit(self.name, key, payload)
+
+# ============================================================
+# INCREMENTAL OUTPUT
+# ============================================================
+
+_SAFE_KEY_RE = re.compile(r"[^A-Za-z0-9._=-]+")
+
+
+class PartWriter:
+    """One CSV part per finished unit, written atomically; combine() merges."""
+
+    def __init__(self, output_dir: str, adapter: Adapter):
+        self.adapter = adapter
+        self.output_dir = output_dir
+        self.parts_dir = os.path.join(output_dir, adapter.name, "parts")
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+    def _part_path(self, unit: WorkUnit) -> str:
+        safe = _SAFE_KEY_RE.sub("_", unit.key)[:80]
+        digest = hashlib.sha1(unit.key.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.parts_dir, f"{safe}-{digest}.csv")
+
+    def write(self, unit: WorkUnit, rows: List[Dict[str, Any]]) -> None:
+        path = self._part_path(unit)
+        tmp = path + ".tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=self.adapter.fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp, path)
+
+    def combine(self) -> str:
+        out_path = os.path.join(self.output_dir, f"{self.adapter.name}.csv")
+        with open(out_path, "w", newline="", encoding="utf-8") as out:
+            writer = csv.DictWriter(out, fieldnames=self.adapter.fieldnames, extrasaction="ignore")
+            writer.writeheader()
+            for name in sorted(os.listdir(self.parts_dir)):
+                if not name.endswith(".csv"):
+                    continue
+                with open(os.path.join(self.parts_dir, name), newline="", encoding="utf-8") as f:
+                    writer.writerows(csv.DictReader(f))
+        return out_path
+
+# ============================================================
+# WORKER POOL
+# ============================================================
+
+async def run_adapter(
+    adapter: Adapter,
+    store: JobStore,
+    fetcher,
+    output_dir: str,
+    workers: int = 8,
+    max_attempts: int = 3,
+    retry_failed: bool = False,
+) -> Dict[str, int]:
+    """Run every pending unit of one adapter through a bounded worker pool."""
+    store.add(adapter.units())
+    writer = PartWriter(output_dir, adapter)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    for unit in store.pending(adapter.name, retry_failed=retry_failed):
+        queue.put_nowait((unit, 1))
+
+    async def worker():
+        while True:
+            unit, attempt = await queue.get()
+            try:
+                result = await adapter.run_unit(unit, fetcher)
+                writer.write(unit, result.rows)
+                for follow_up in store.mark_done(unit, len(result.rows), result.follow_ups):
+                    queue.put_nowait((follow_up, 1))
+                print(f"   ✔ {unit.uid}: {len(result.rows)} rows")
+            except FixtureMissing as e:
+                store.mark_failed(unit, f"fixture missing: {e}")
+                print(f"   ✗ {unit.uid}: no fixture")
+            except Exception as e:
+                if attempt < max_attempts:
+                    await asyncio.sleep(2 ** attempt)
+                    queue.put_nowait((unit, attempt + 1))
+                else:
+                    store.mark_failed(unit, repr(e))
+                    print(f"   ✗ {unit.uid}: {e}")
+            finally:
+                queue.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, workers))]
+    await queue.join()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    writer.combine()
+    return store.stats(adapter.name)
@@ -1,8 +1,15 @@
-import requests
+import argparse
+import asyncio
 from bs4 import BeautifulSoup
 import csv
-import time
-import urllib.parse
+
+from scrapers.geocoding import GeocodeStage, make_geocoder
+from scrapers.http_cache import default_cache
+from scrapers.jobs import Adapter, UnitResult
+
+# Run from the repo root:
+#   python -m scrapers.pt_aba_florida_scraper
+#   python -m scrapers.pt_aba_florida_scraper --geocoder stub   # no geocoding API calls
 
 # ---------------------------
 # SETTINGS
@@ -13,39 +20,15 @@ BASE_URL = "https://www.psychologytoday.com/us/therapists/aba/fl"
 
 OUTPUT_CSV = "florida_aba_providers.csv"
 
-# OpenStreetMap Geocode API
-GEOCODE_URL = "https://nominatim.openstreetmap.org/search"
-
-
-# ---------------------------
-# LAT / LON FUNCTION
-# ---------------------------
-def get_lat_lon(address):
-    try:
-        params = {
-            "q": address,
-            "format": "json",
-            "limit": 1
-        }
-        r = requests.get(GEOCODE_URL, params=params, headers={"User-Agent": "Mozilla/5.0"})
-        data = r.json()
-
-        if len(data) == 0:
-            return "", ""
-
-        return data[0]["lat"], data[0]["lon"]
-
-    except:
-        return "", ""
+# Seconds between results pages (be polite to psychologytoday.com)
+PAGE_DELAY = 1.0
 
 
 # ---------------------------
-# SCRAPE ONE PAGE
+# PARSE ONE RESULTS PAGE
 # ---------------------------
-def scrape_page(url):
-    print(f"🔍 Scraping page: {url}")
-    r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-    soup = BeautifulSoup(r.text, "html.parser")
+def parse_providers(html):
+    soup = BeautifulSoup(html, "html.parser")
 
     providers = soup.select(".results-row")
 
@@ -65,22 +48,16 @@ def scrape_page(url):
             # Details Section
             description = p.select_one(".teaser").get_text(" ", strip=True) if p.select_one(".teaser") else ""
 
-            # lat / lon lookup
-            lat, lon = get_lat_lon(address)
-            time.sleep(1)  # protect geocode API
-
-            row = {
+            data_list.append({
                 "name": name,
                 "phone": phone,
                 "email": email,
                 "website": website,
                 "address": address,
-                "lat": lat,
-                "lon": lon,
+                "lat": "",
+                "lon": "",
                 "description": description,
-            }
-
-            data_list.append(row)
+            })
 
         except Exception as e:
             print(f"⚠ Error on provider: {e}")
@@ -89,21 +66,40 @@ def scrape_page(url):
     return data_list
 
 
+# ---------------------------
+# SCRAPE ONE PAGE
+# ---------------------------
+async def scrape_page(url, geocoder_stage, html=None):
+    print(f"🔍 Scraping page: {url}")
+    if html is None:
+        resp = await asyncio.to_thread(default_cache().get, url, headers={"User-Agent": "Mozilla/5.0"})
+        html = resp.text
+
+    data_list = parse_providers(html)
+
+    # lat / lon are filled by the geocoding stage while the next page downloads
+    for row in data_list:
+        await geocoder_stage.submit(row, row["address"])
+
+    return data_list
+
+
 # ---------------------------
 # SCRAPE ALL PAGES
 # ---------------------------
-def scrape_florida():
+async def scrape_florida(geocoder_stage):
     all_data = []
 
     page_num = 1
     while True:
         url = f"{BASE_URL}?page={page_num}"
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+        r = await asyncio.to_thread(default_cache().get, url, headers={"User-Agent": "Mozilla/5.0"})
 
-        if "No Results Found" in r.text or r.status_code != 200:
+        if "No Results Found" in r.text or r.status != 200:
             break
 
-        page_data = scrape_page(url)
+        # Parse the response we already have instead of downloading it again
+        page_data = await scrape_page(url, geocoder_stage, html=r.text)
 
         if len(page_data) == 0:
             break
@@ -111,11 +107,43 @@ def scrape_florida():
         all_data.extend(page_data)
 
         page_num += 1
-        time.sleep(1)
+        if r.network:   # 304 revalidations are real requests too
+            await asyncio.sleep(PAGE_DELAY)
 
     return all_data
 
 
+async def run(geocoder):
+    async with GeocodeStage(make_geocoder(geocoder)) as stage:
+        results = await scrape_florida(stage)
+    return results
+
+
+# ---------------------------
+# JOB FRAMEWORK ADAPTER
+# ---------------------------
+class PsychologyTodayAdapter(Adapter):
+    """One unit per results page; each non-empty page queues the next."""
+
+    name = "psychology_today_fl"
+    fieldnames = ["name", "phone", "email", "website", "address", "lat", "lon", "description"]
+
+    def units(self):
+        return [self.unit("page=1", page=1)]
+
+    async def run_unit(self, unit, fetcher):
+        page = unit.payload["page"]
+        resp = await fetcher.get(BASE_URL, params={"page": page}, headers={"User-Agent": "Mozilla/5.0"})
+
+        if resp.status != 200 or "No Results Found" in resp.text:
+            return UnitResult()
+
+        # lat / lon are filled by the geocoding stage, not inline
+        rows = parse_providers(resp.text)
+        follow_ups = [self.unit(f"page={page + 1}", page=page + 1)] if rows else []
+        return UnitResult(rows=rows, follow_ups=follow_ups)
+
+
 # ---------------------------
 # SAVE CSV
 # ---------------------------
@@ -134,7 +162,12 @@ def save_csv(data):
 # MAIN
 # ---------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape PsychologyToday ABA providers (Florida)")
+    parser.add_argument("--geocoder", default="nominatim", choices=["google", "nominatim", "stub"])
+    args = parser.parse_args()
+
     print("🚀 Scraping PsychologyToday ABA providers — FLORIDA")
-    results = scrape_florida()
+    results = asyncio.run(run(args.geocoder))
     save_csv(results)
+    print(default_cache().stats.report())
     print("🎉 Done!")
@@ -0,0 +1,106 @@
+"""
+Scraper Job Runner - CLI for the resumable job framework
+Location: scrapers/run_jobs.py
+
+Run from the repo root:
+    python -m scrapers.run_jobs abafinder_api
+    python -m scrapers.run_jobs abafinder_api --record fixtures/abafinder
+    python -m scrapers.run_jobs abafinder_api --fixtures fixtures/abafinder   # offline
+    python -m scrapers.run_jobs google_speech --retry-failed
+    python -m scrapers.run_jobs psychology_today_fl --cache .http_cache  # conditional GETs
+
+Re-running the same command resumes: finished units are skipped.
+"""
+
+import argparse
+import asyncio
+import os
+
+from scrapers.jobs import (
+    DomainLimiter,
+    FixtureFetcher,
+    HttpFetcher,
+    JobStore,
+    RecordingFetcher,
+    run_adapter,
+)
+from scrapers.http_cache import CachingFetcher, HttpCache
+from scrapers.scraper import GenericDirectoryAdapter
+from scrapers.scraper_abafinder_api import AbaFinderApiAdapter
+from scrapers.pt_aba_florida_scraper import PsychologyTodayAdapter
+from scrapers.google_speech_scraper import GoogleSpeechAdapter
+
+# ============================================================
+# ADAPTER REGISTRY
+# ============================================================
+
+ADAPTERS = {
+    adapter.name: adapter
+    for adapter in (
+        AbaFinderApiAdapter,
+        PsychologyTodayAdapter,
+        GoogleSpeechAdapter,
+        GenericDirectoryAdapter,
+    )
+}
+
+# Per-domain politeness: (max concurrent, seconds between request starts)
+DOMAIN_LIMITS = {
+    "api.abafinder.com": (10, 0.1),
+    "serpapi.com": (4, 0.25),
+    "www.psychologytoday.com": (1, 1.0),
+}
+
+
+async def run(args) -> None:
+    adapter = ADAPTERS[args.source]()
+    os.makedirs(args.output_dir, exist_ok=True)
+    store = JobStore(os.path.join(args.output_dir, "jobs.sqlite"))
+    cache = HttpCache(args.cache) if args.cache else None
+
+    print(f"🚀 {adapter.name}: {args.workers} workers")
+
+    try:
+        if args.fixtures:
+            stats = await run_adapter(
+                adapter, store, FixtureFetcher(args.fixtures), args.output_dir,
+                workers=args.workers, retry_failed=args.retry_failed,
+            )
+        else:
+            import aiohttp
+
+            limiter = DomainLimiter(max_concurrent=2, min_interval=1.0, overrides=DOMAIN_LIMITS)
+            async with aiohttp.ClientSession() as session:
+                fetcher = HttpFetcher(session, limiter)
+                if cache:
+                    fetcher = CachingFetcher(fetcher, cache)
+                if args.record:
+                    fetcher = RecordingFetcher(fetcher, args.record)
+                stats = await run_adapter(
+                    adapter, store, fetcher, args.output_dir,
+                    workers=args.workers, retry_failed=args.retry_failed,
+                )
+    finally:
+        store.close()
+
+    print(f"\n✅ {adapter.name}: {stats['done']} done, {stats['failed']} failed, "
+          f"{stats['pending']} pending, {stats['rows']} rows")
+    print(f"📁 Output: {os.path.join(args.output_dir, adapter.name + '.csv')}")
+    if cache:
+        print(cache.stats.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a scraper through the job framework")
+    parser.add_argument("source", choices=sorted(ADAPTERS))
+    parser.add_argument("--output-dir", default="scrape_output")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--retry-failed", action="store_true")
+    parser.add_argument("--record", metavar="DIR", help="save every response as a fixture")
+    parser.add_argument("--fixtures", metavar="DIR", help="replay recorded fixtures offline")
+    parser.add_argument("--cache", metavar="DIR", help="HTTP cache dir (ETag / Last-Modified revalidation)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
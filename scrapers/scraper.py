@@ -3,6 +3,11 @@ from bs4 import BeautifulSoup
 import pandas as pd
 import time
 
+from scrapers.http_cache import default_cache
+from scrapers.jobs import Adapter, UnitResult
+
+# Run from the repo root: python -m scrapers.scraper
+
 # ============================================
 # SETTINGS
 # ============================================
@@ -33,8 +38,9 @@ EXTRACTION_RULES = {
 def fetch_page(url: str):
     """Downloads a webpage and returns a BeautifulSoup object."""
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
+        response = default_cache().get(url, headers=HEADERS, timeout=10)
+        if response.status != 200:
+            raise requests.HTTPError(f"HTTP {response.status}")
         return BeautifulSoup(response.text, "html.parser")
     except Exception as e:
         print(f"[ERROR] Could not fetch {url}: {e}")
@@ -58,6 +64,11 @@ def scrape_page(url: str):
     if soup is None:
         return []
 
+    return parse_providers(soup, url)
+
+
+def parse_providers(soup, url: str):
+    """Extracts provider blocks from an already-downloaded page."""
     providers = []
 
     # Generic provider blocks — will adjust based on real sites you send
@@ -86,6 +97,28 @@ def scrape_page(url: str):
     return providers
 
 
+# ============================================
+# JOB FRAMEWORK ADAPTER
+# ============================================
+
+class GenericDirectoryAdapter(Adapter):
+    """One unit per TARGET_URLS entry."""
+
+    name = "generic_directory"
+    fieldnames = ["name", "address", "phone", "email", "source_url"]
+
+    def units(self):
+        return [self.unit(url, url=url) for url in TARGET_URLS]
+
+    async def run_unit(self, unit, fetcher):
+        url = unit.payload["url"]
+        resp = await fetcher.get(url, headers=HEADERS)
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status} for {url}")
+        soup = BeautifulSoup(resp.text, "html.parser")
+        return UnitResult(rows=parse_providers(soup, url))
+
+
 # ============================================
 # MAIN EXECUTION LOOP
 # ============================================
@@ -107,6 +140,7 @@ def run_scraper():
 
     df.to_csv("autism_providers.csv", index=False)
     print("✅ DONE! Saved to autism_providers.csv")
+    print(default_cache().stats.report())
 
 
 if __name__ == "__main__":
@@ -1,10 +1,28 @@
 import aiohttp
 import asyncio
 import csv
+import json
+import os
+import time
+from collections import defaultdict
+
+from scrapers.http_cache import default_cache
+from scrapers.jobs import Adapter, AimdLimiter, UnitResult
+
+# Run from the repo root: python -m scrapers.scraper_abafinder_api
+#
+# The API has no state filter, so the catalog is downloaded ONCE and split
+# by state locally. Finished pages are checkpointed; re-running resumes,
+# unless a fresh page 0 shows the catalog changed (total or first page) or
+# the checkpoints are older than ABAFINDER_CHECKPOINT_MAX_AGE_HOURS.
 
 BASE_URL = "https://api.abafinder.com/api/v1/provider"
 LIMIT = 100  # max per request
-CONCURRENT_REQUESTS = 10  # safe async limit
+MAX_CONCURRENT_REQUESTS = 16  # AIMD ceiling; starts lower and adapts
+TARGET_LATENCY = 3.0  # seconds; slower responses shrink concurrency
+MAX_ATTEMPTS = 4
+CHECKPOINT_DIR = "abafinder_pages"
+CHECKPOINT_MAX_AGE = float(os.getenv("ABAFINDER_CHECKPOINT_MAX_AGE_HOURS", 24)) * 3600
 
 # All 50 U.S. state codes
 US_STATES = [
@@ -21,41 +39,39 @@ US_STATES = [
 # ----------------------------------------------------
 #                FETCH PAGE (ASYNC)
 # ----------------------------------------------------
-async def fetch_page(session, page):
+async def fetch_page(session, page, limiter):
     url = f"{BASE_URL}?sortBy=title&order=ASC&limit={LIMIT}&page={page}"
 
     try:
-        async with session.get(url, timeout=20) as resp:
-            if resp.status != 200:
-                print(f"⚠️ API ERROR {resp.status} on page {page}")
-                return None
-            return await resp.json()
+        async with limiter.slot(url) as ticket:
+            resp = await default_cache().aget(session, url, timeout=20)
+            ticket.ok = resp.status == 200
+        if resp.status != 200:
+            print(f"⚠️ API ERROR {resp.status} on page {page}")
+            return None
+        return resp.json()
     except Exception as e:
         print(f"⚠️ Connection error on page {page}: {e}")
         return None
 
 
 # ----------------------------------------------------
-#         FIXED: STATE FILTER BASED ON REAL API
+#            STATE OF A PROVIDER (REAL API)
 # ----------------------------------------------------
-def provider_is_in_state(provider, state_code):
-
-    if not isinstance(provider, dict):
-        return False
+def provider_state(provider):
+    """Two-letter state code, or "" when the record has none."""
 
     # ABAFinder uses "location", not "locations"
     loc = provider.get("location", {})
     if not isinstance(loc, dict):
-        return False
+        return ""
 
     state_obj = loc.get("state", {})
     if not isinstance(state_obj, dict):
-        return False
-
-    short = state_obj.get("shortName", "")
+        return ""
 
-    # Match "GA", "FL", "CA", etc.
-    return short.upper() == state_code.upper()
+    # "GA", "FL", "CA", etc.
+    return (state_obj.get("shortName") or "").upper()
 
 
 # ----------------------------------------------------
@@ -111,69 +127,192 @@ def extract_provider_row(provider):
 
 
 # ----------------------------------------------------
-#               SCRAPE ONE STATE
+#              PAGE CHECKPOINTS
 # ----------------------------------------------------
-async def scrape_state(session, state_code):
-    print(f"\n🔍 Scraping state: {state_code}")
+def checkpoint_path(page):
+    return os.path.join(CHECKPOINT_DIR, f"page_{page:05d}.json")
+
+
+def page_rows(data):
+    """CSV rows (plus "state") for one API page payload."""
+    rows = []
+    for p in data.get("result", []):
+        if not isinstance(p, dict):
+            continue
+        row = extract_provider_row(p)
+        row["state"] = provider_state(p)
+        rows.append(row)
+    return rows
+
+
+def save_checkpoint(page, data):
+    rows = page_rows(data.get("data", {}))
+    tmp = checkpoint_path(page) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "page": page,
+            "total": data.get("data", {}).get("total", 0),
+            "saved_at": time.time(),
+            "rows": rows,
+        }, f)
+    os.replace(tmp, checkpoint_path(page))
+    return rows
+
+
+def load_checkpoint(page):
+    try:
+        with open(checkpoint_path(page), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
 
-    all_results = []
-    page = 0
 
-    while True:
-        data = await fetch_page(session, page)
-        if not data:
-            break
+def stale_reason(stored, fresh):
+    """Why checkpoints from an earlier run can't be resumed (None = they can)."""
+    if stored is None:
+        return None
+    if time.time() - stored.get("saved_at", 0) > CHECKPOINT_MAX_AGE:
+        return "older than the max age"
+    fresh_data = fresh.get("data", {})
+    if stored["total"] != fresh_data.get("total", 0):
+        return f"total changed {stored['total']} → {fresh_data.get('total', 0)}"
+    if stored["rows"] != page_rows(fresh_data):
+        return "first page changed"
+    return None
+
+
+def discard_checkpoints():
+    for name in os.listdir(CHECKPOINT_DIR):
+        if name.startswith("page_") and name.endswith(".json"):
+            os.remove(os.path.join(CHECKPOINT_DIR, name))
+
+
+# ----------------------------------------------------
+#        DOWNLOAD THE CATALOG ONCE (ALL PAGES)
+# ----------------------------------------------------
+async def fetch_with_retries(session, page, limiter):
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        data = await fetch_page(session, page, limiter)
+        if data is not None:
+            return data
+        await asyncio.sleep(2 ** attempt)
+    return None
+
+
+async def download_page(session, page, limiter):
+    data = await fetch_with_retries(session, page, limiter)
+    if data is None:
+        return False
+    rows = save_checkpoint(page, data)
+    print(f"📦 Page {page}: {len(rows)} providers (concurrency {limiter.limit('api.abafinder.com')})")
+    return True
+
 
-        providers = data.get("data", {}).get("result", [])
-        total = data.get("data", {}).get("total", 0)
+async def download_catalog(session, limiter):
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
 
-        if not providers:
-            break
+    # Page 0 is always fetched fresh: it decides whether the checkpoints
+    # still describe the same catalog
+    fresh = await fetch_with_retries(session, 0, limiter)
+    if fresh is None:
+        raise RuntimeError("Could not fetch the first catalog page")
 
-        print(f"📦 {state_code}: Page {page} returned {len(providers)} providers")
+    first = load_checkpoint(0)
+    reason = stale_reason(first, fresh)
+    if reason:
+        print(f"♻️ Discarding page checkpoints ({reason})")
+        discard_checkpoints()
+    if first is None or reason:
+        save_checkpoint(0, fresh)
+        first = load_checkpoint(0)
 
-        for p in providers:
-            if provider_is_in_state(p, state_code):
-                row = extract_provider_row(p)
-                all_results.append(row)
+    last_page = max(0, (first["total"] - 1) // LIMIT)
+    todo = [n for n in range(1, last_page + 1) if load_checkpoint(n) is None]
+    print(f"📚 Catalog: {first['total']} providers, {last_page + 1} pages ({len(todo)} to fetch)")
 
-        page += 1
-        await asyncio.sleep(0.1)
+    results = await asyncio.gather(*(download_page(session, n, limiter) for n in todo))
+    failed = [n for n, ok in zip(todo, results) if not ok]
+    if failed:
+        print(f"⚠️ {len(failed)} pages failed; re-run to resume: {failed[:10]}")
+    return last_page
 
-        if page * LIMIT > total:
-            break
 
-    print(f"🎯 {state_code}: Total providers found = {len(all_results)}")
+# ----------------------------------------------------
+#        SPLIT BY STATE (ONE PASS OVER CHECKPOINTS)
+# ----------------------------------------------------
+def partition_by_state(last_page):
+    by_state = defaultdict(list)
+    for page in range(last_page + 1):
+        checkpoint = load_checkpoint(page)
+        if checkpoint is None:
+            continue
+        for row in checkpoint["rows"]:
+            by_state[row.pop("state")].append(row)
 
-    # Save CSV
     fieldnames = [
         "name", "phone", "website", "email", "location",
         "insurance", "treatmentSetting", "services",
         "languages", "agesServicing"
     ]
 
-    output_file = f"abafinder_{state_code}.csv"
+    for state_code in US_STATES:
+        output_file = f"abafinder_{state_code}.csv"
+        with open(output_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(by_state.get(state_code, []))
+        print(f"💾 {state_code}: {len(by_state.get(state_code, []))} providers → {output_file}")
 
-    with open(output_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(all_results)
+    other = sum(len(rows) for code, rows in by_state.items() if code not in US_STATES)
+    if other:
+        print(f"ℹ️ {other} providers outside the 50 states (DC, territories, missing state)")
 
-    print(f"💾 Saved {state_code} providers to {output_file}")
+
+# ----------------------------------------------------
+#         JOB FRAMEWORK ADAPTER (scrapers/jobs.py)
+# ----------------------------------------------------
+class AbaFinderApiAdapter(Adapter):
+    """Page units over the full catalog; page 0 fans out the rest."""
+
+    name = "abafinder_api"
+    fieldnames = [
+        "name", "phone", "website", "email", "location", "state",
+        "insurance", "treatmentSetting", "services",
+        "languages", "agesServicing"
+    ]
+
+    def units(self):
+        return [self.unit("page=0", page=0)]
+
+    async def run_unit(self, unit, fetcher):
+        page = unit.payload["page"]
+        resp = await fetcher.get(BASE_URL, params={
+            "sortBy": "title", "order": "ASC", "limit": LIMIT, "page": page,
+        })
+        if resp.status != 200:
+            raise RuntimeError(f"API ERROR {resp.status} on page {page}")
+
+        data = resp.json().get("data", {})
+        rows = page_rows(data)
+
+        follow_ups = []
+        if page == 0:
+            last_page = (data.get("total", 0) - 1) // LIMIT
+            follow_ups = [self.unit(f"page={n}", page=n) for n in range(1, last_page + 1)]
+
+        return UnitResult(rows=rows, follow_ups=follow_ups)
 
 
 # ----------------------------------------------------
 #                 RUN ALL STATES
 # ----------------------------------------------------
 async def main():
-    connector = aiohttp.TCPConnector(limit=CONCURRENT_REQUESTS)
+    limiter = AimdLimiter(initial=4, maximum=MAX_CONCURRENT_REQUESTS, target_latency=TARGET_LATENCY)
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_REQUESTS)
     async with aiohttp.ClientSession(connector=connector) as session:
+        last_page = await download_catalog(session, limiter)
 
-        tasks = []
-        for state_code in US_STATES:
-            tasks.append(scrape_state(session, state_code))
-
-        await asyncio.gather(*tasks)
+    partition_by_state(last_page)
 
 
 # ----------------------------------------------------
@@ -182,4 +321,5 @@ async def main():
 if __name__ == "__main__":
     print("🚀 Starting 50-state async ABAFinder scraper...")
     asyncio.run(main())
+    print(default_cache().stats.report())
     print("\n✅ DONE! All states scraped successfully.")
@@ -1,10 +1,18 @@
+import argparse
 import asyncio
-from playwright.async_api import async_playwright
 import csv
+import os
+import re
 import time
-import urllib.parse
 import requests
 
+from scrapers.browser_pool import BrowserPool
+from scrapers.geocoding import GeocodeStage, make_geocoder
+
+# Run from the repo root:
+#   python -m scrapers.yellowpages_scraper
+#   python -m scrapers.yellowpages_scraper --fixtures fixtures/yellowpages --geocoder stub   # offline
+
 # ================================================================
 # CONFIGURATION
 # ================================================================
@@ -35,6 +43,12 @@ SEARCH_CATEGORIES = {
     ],
 }
 
+# Geocoder result -> output column
+GEO_FIELDS = {
+    "city": "city", "state": "state", "zip": "zip",
+    "country": "country", "lat": "lat", "lon": "lon",
+}
+
 OUTPUT_COLUMNS = [
     "name","phone","website","email","full_address","city","state","zip","country",
     "lat","lon","insurance","treatmentSetting","services","languages","agesServicing"
@@ -47,44 +61,20 @@ Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4] });
 window.chrome = { runtime: {} };
 """
 
-
-# ================================================================
-# GOOGLE GEOCODING
-# ================================================================
-def geocode_address(address):
-    try:
-        url = (
-            "https://maps.googleapis.com/maps/api/geocode/json"
-            f"?address={urllib.parse.quote(address)}"
-            f"&key={GOOGLE_API_KEY}"
-        )
-        r = requests.get(url)
-        data = r.json()
-
-        if data["status"] != "OK":
-            return "", "", "", "", "", ""
-
-        result = data["results"][0]
-
-        lat = result["geometry"]["location"]["lat"]
-        lon = result["geometry"]["location"]["lng"]
-
-        city = state = zip_code = country = ""
-
-        for comp in result["address_components"]:
-            if "locality" in comp["types"]:
-                city = comp["long_name"]
-            if "administrative_area_level_1" in comp["types"]:
-                state = comp["short_name"]
-            if "postal_code" in comp["types"]:
-                zip_code = comp["long_name"]
-            if "country" in comp["types"]:
-                country = comp["long_name"]
-
-        return city, state, zip_code, country, lat, lon
-
-    except:
-        return "", "", "", "", "", ""
+# All listings in one round-trip instead of five locator calls per listing
+LISTING_FIELDS_JS = """
+els => els.map(el => {
+    const text = sel => { const n = el.querySelector(sel); return n ? n.innerText : ""; };
+    const site = el.querySelector("a.track-visit-website");
+    return {
+        name: text("a.business-name span"),
+        phone: text(".phones"),
+        street: text(".street-address"),
+        locality: text(".locality"),
+        website: site ? (site.getAttribute("href") || "") : "",
+    };
+})
+"""
 
 
 # ================================================================
@@ -99,7 +89,8 @@ async def relay_fetch(url):
     }
 
     try:
-        res = requests.post(RELAY_ENDPOINT, json=payload, timeout=30)
+        # requests is blocking; keep the event loop free for the other pages
+        res = await asyncio.to_thread(requests.post, RELAY_ENDPOINT, json=payload, timeout=30)
         if res.status_code != 200:
             print(f"⚠ Relay returned status {res.status_code}")
             return None
@@ -109,52 +100,47 @@ async def relay_fetch(url):
         return None
 
 
-# ================================================================
-# PROCESS A SINGLE LISTING
-# ================================================================
-async def process_listing(element):
-    try:
-        name = await element.locator("a.business-name span").inner_text()
-    except:
-        name = ""
-
-    try:
-        phone = await element.locator(".phones").inner_text()
-    except:
-        phone = ""
+def fixture_file(fixture_dir, search_term):
+    slug = re.sub(r"[^a-z0-9]+", "_", search_term.lower()).strip("_")
+    return os.path.join(fixture_dir, f"{slug}.html")
 
-    try:
-        street = await element.locator(".street-address").inner_text()
-    except:
-        street = ""
 
-    try:
-        locality = await element.locator(".locality").inner_text()
-    except:
-        locality = ""
+async def load_results_html(search_term, fixture_dir=None):
+    if fixture_dir:
+        path = fixture_file(fixture_dir, search_term)
+        if not os.path.exists(path):
+            print(f"❌ Missing fixture {path}")
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
 
-    try:
-        website = await element.locator("a.track-visit-website").get_attribute("href")
-    except:
-        website = ""
+    base_url = (
+        "https://www.yellowpages.com/search?"
+        f"search_terms={search_term.replace(' ', '+')}&"
+        f"geo_location_terms={LOCATION.replace(' ', '+')}"
+    )
+    print(f"\n🌎 Relay Fetch → {base_url}")
+    return await relay_fetch(base_url)
 
-    full_address = f"{street}, {locality}".strip(", ")
 
-    # Geo
-    city, state, zip_code, country, lat, lon = geocode_address(full_address)
+# ================================================================
+# PROCESS A SINGLE LISTING
+# ================================================================
+async def process_listing(listing, geocoder_stage):
+    full_address = f"{listing['street']}, {listing['locality']}".strip(", ")
 
-    return {
-        "name": name,
-        "phone": phone,
-        "website": website or "",
+    row = {
+        "name": listing["name"],
+        "phone": listing["phone"],
+        "website": listing["website"] or "",
         "email": "",
         "full_address": full_address,
-        "city": city,
-        "state": state,
-        "zip": zip_code,
-        "country": country,
-        "lat": lat,
-        "lon": lon,
+        "city": "",
+        "state": "",
+        "zip": "",
+        "country": "",
+        "lat": "",
+        "lon": "",
         "insurance": "",
         "treatmentSetting": "",
         "services": "",
@@ -162,42 +148,34 @@ async def process_listing(element):
         "agesServicing": ""
     }
 
+    # Geo fields are filled in place by the geocoding stage
+    await geocoder_stage.submit(row, full_address)
+    return row
+
 
 # ================================================================
 # SCRAPE CATEGORY
 # ================================================================
-async def scrape_category(page, search_term, output_rows):
-    base_url = (
-        "https://www.yellowpages.com/search?"
-        f"search_terms={search_term.replace(' ', '+')}&"
-        f"geo_location_terms={LOCATION.replace(' ', '+')}"
-    )
-
-    print(f"\n🌎 Relay Fetch → {base_url}")
-    html = await relay_fetch(base_url)
+async def scrape_category(page, search_term, geocoder_stage, fixture_dir=None):
+    html = await load_results_html(search_term, fixture_dir)
 
     if not html:
         print("❌ Relay returned empty HTML — skipping keyword.")
-        return
-
-    await page.set_content(html)
+        return []
 
-    elements = await page.locator("div.result").all()
-    total = len(elements)
-    print(f"🔍 Listings found: {total}")
+    # Images/fonts referenced by the HTML are blocked by the pool
+    await page.set_content(html, wait_until="domcontentloaded")
 
-    for i, element in enumerate(elements):
-        print(f"   → Processing listing {i+1}/{total}")
-        row = await process_listing(element)
-        output_rows.append(row)
+    listings = await page.eval_on_selector_all("div.result", LISTING_FIELDS_JS)
+    print(f"🔍 {search_term}: {len(listings)} listings")
 
-        await asyncio.sleep(0.05)  # small cooldown
+    return [await process_listing(listing, geocoder_stage) for listing in listings]
 
 
 # ================================================================
 # MAIN RUNNER
 # ================================================================
-async def run_scraper():
+async def run_scraper(workers=4, fixture_dir=None, geocoder="google"):
 
     print("""
 =====================================
@@ -206,41 +184,49 @@ async def run_scraper():
 =====================================
 """)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
-
-        page = await context.new_page()
-        await page.add_init_script(STEALTH_JS)
-
-        # Loop categories
-        for filename, keywords in SEARCH_CATEGORIES.items():
-
-            print(f"\n==============================")
-            print(f" SCRAPING FILE: {filename}")
-            print(f"==============================\n")
+    start = time.time()
 
-            rows = []
+    # Every (file, keyword) pair is independent: run them across the pool
+    jobs = [
+        (filename, term)
+        for filename, keywords in SEARCH_CATEGORIES.items()
+        for term in keywords
+    ]
 
-            for term in keywords:
-                print(f"\n🔎 Searching: {term}")
-                await scrape_category(page, term, rows)
+    # Scraping and geocoding overlap; leaving the stage waits for the last rows
+    geo = make_geocoder(geocoder, api_key=os.getenv("GOOGLE_MAPS_API_KEY", GOOGLE_API_KEY))
+    async with GeocodeStage(geo, fields=GEO_FIELDS) as stage:
+        async with BrowserPool(size=workers, init_script=STEALTH_JS) as pool:
+            results = await pool.map(
+                lambda page, job: scrape_category(page, job[1], stage, fixture_dir),
+                jobs,
+            )
 
-            # Save CSV
-            with open(filename, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
-                writer.writeheader()
-                writer.writerows(rows)
+    rows_by_file = {filename: [] for filename in SEARCH_CATEGORIES}
+    for (filename, term), rows, error in results:
+        if error:
+            print(f"❌ Error on '{term}': {error}")
+        else:
+            rows_by_file[filename].extend(rows)
 
-            print(f"\n💾 Saved {len(rows)} rows → {filename}")
+    for filename, rows in rows_by_file.items():
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
 
-        await browser.close()
+        print(f"\n💾 Saved {len(rows)} rows → {filename}")
 
-    print("\n🎉 DONE — All Florida CSV files generated!\n")
+    print(f"\n🎉 DONE — All Florida CSV files generated in {time.time() - start:.0f}s!\n")
 
 
 # ================================================================
 # ENTRY
 # ================================================================
 if __name__ == "__main__":
-    asyncio.run(run_scraper())
+    parser = argparse.ArgumentParser(description="YellowPages relay scraper (Florida)")
+    parser.add_argument("--workers", type=int, default=4, help="parallel browser pages")
+    parser.add_argument("--fixtures", metavar="DIR", help="read <keyword>.html from DIR instead of the relay")
+    parser.add_argument("--geocoder", default="google", choices=["google", "nominatim", "stub"])
+    args = parser.parse_args()
+    asyncio.run(run_scraper(args.workers, args.fixtures, args.geocoder))
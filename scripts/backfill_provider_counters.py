@@ -0,0 +1,36 @@
+import argparse
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+from app.services.provider_counters import WATERMARK_KEY, backfill
+from db.connection import get_db
+
+# Run from the repo root once after migrations/0006_provider_activity_hourly.sql,
+# after the analytics worker has compacted at least once (it sets the watermark):
+#   python -m scripts.backfill_provider_counters --days 365
+#
+# Safe to re-run: hours are only ever raised to the user_activity count.
+# user_activity.timestamp is read as UTC, like the hourly buckets.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill provider_activity_hourly from user_activity")
+    parser.add_argument("--days", type=int, default=365, help="days of history to backfill")
+    args = parser.parse_args()
+
+    since = datetime.utcnow() - timedelta(days=args.days)
+    with get_db() as conn:
+        rows = backfill(conn, since)
+
+    if rows is None:
+        print(f"❌ No {WATERMARK_KEY} yet: start the analytics worker and let it compact once")
+        return
+    print(f"✅ Backfilled provider_activity_hourly since {since:%Y-%m-%d %H:00}: {rows:,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+from psycopg2.extras import RealDictCursor
+
+# Load environment
+load_dotenv()
+
+from app.services.catalog import RECORD_FIELDS, ProviderCatalog, write_catalog
+from db.connection import get_db
+
+# Run from the repo root (safe while the API is serving; the swap is atomic):
+#   python -m scripts.build_catalog [--out data/provider_catalog.bin]
+# scripts/load_to_postgres.py calls build() after every load that changed rows.
+
+CATALOG_PATH = os.getenv("PROVIDER_CATALOG_PATH", "data/provider_catalog.bin")
+
+
+def fetch_providers():
+    with get_db() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(f"SELECT {', '.join(RECORD_FIELDS)} FROM providers")
+        rows = cur.fetchall()
+        cur.close()
+    return rows
+
+
+def build(out=CATALOG_PATH):
+    start = time.time()
+    print("📥 Reading providers...")
+    rows = fetch_providers()
+
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    stats = write_catalog(out, rows)
+    print(f"✅ Catalog: {stats['rows']} providers, {stats['tokens']} tokens, "
+          f"{stats['cells']} geo cells, {stats['bytes'] / 1e6:.1f} MB in {time.time() - start:.1f}s")
+
+    # Sanity check: the file maps and reads back
+    catalog = ProviderCatalog(out)
+    print(f"📁 Saved: {out} ({len(catalog)} rows readable)")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mapped provider catalog")
+    parser.add_argument("--out", default=CATALOG_PATH)
+    args = parser.parse_args()
+
+    build(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+from db.connection import READ, WRITE, bind_session, get_db, router
+
+# Run from the repo root with a primary and at least one replica, e.g. two
+# local instances on 5432 and 5433:
+#   DATABASE_REPLICA_URLS=postgresql://postgres:pw@localhost:5433/autizim_app \
+#   DB_READ_YOUR_WRITES_SECONDS=5 python -m scripts.db_routing
+#
+# Prints which server each intent lands on, then checks that a session
+# which just wrote reads from the primary while its pin lasts.
+
+
+def whoami(intent: str) -> str:
+    with get_db(intent) as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT inet_server_port(), pg_is_in_recovery()")
+        port, in_recovery = cur.fetchone()
+        cur.close()
+    role = "standby" if in_recovery else "primary"
+    return f"port {port} ({role})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show read/write routing across primary and replicas")
+    parser.add_argument("--reads", type=int, default=4, help="read checkouts to show (round-robin)")
+    args = parser.parse_args()
+
+    print(f"📊 Replicas configured: {len(router.replicas)}")
+    print(f"   write -> {whoami(WRITE)}")
+    for i in range(args.reads):
+        print(f"   read {i + 1} -> {whoami(READ)}")
+
+    if not router.pins.enabled:
+        print("⚠️ DB_READ_YOUR_WRITES_SECONDS is 0; skipping the pinning check")
+        return
+
+    bind_session("db-routing-check")
+    whoami(WRITE)
+    target = whoami(READ)
+    print(f"   read after write (pinned session) -> {target}")
+    if router.replicas and "primary" not in target:
+        print("❌ Pinned session was routed to a replica")
+    else:
+        print("✅ Read-your-writes pinning OK")
+
+
+if __name__ == "__main__":
+    main()
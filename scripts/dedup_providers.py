@@ -0,0 +1,86 @@
+import argparse
+import json
+import re
+import time
+
+import pandas as pd
+
+from pipeline.dedup import resolve
+from pipeline.normalize import FrameWriter
+from pipeline.snapshot import canonical_columns, read_snapshot, to_snapshot_table, write_snapshot
+
+# Run from the repo root:
+#   python -m scripts.dedup_providers \
+#       data/raw/abafinder_GLIDE_READY_with_geo.csv:abafinder \
+#       data/raw/speech_therapists_USA.csv:serpapi \
+#       --out providers_golden.csv
+# Inputs may also be provider snapshots (.snapshot.parquet / .arrow).
+
+OUTPUT_FILE = "providers_golden.csv"
+
+# Only a plain word after the last ":" is a label, so "C:\data\x.csv" stays a path
+_SOURCE_LABEL = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def split_spec(spec: str) -> tuple:
+    """FILE[:SOURCE] -> (path, source)."""
+    path, _, source = spec.rpartition(":")
+    if path and _SOURCE_LABEL.match(source) and not re.fullmatch(r"[A-Za-z]", path):
+        return path, source
+    return spec, "unknown"
+
+
+def load_source(spec: str) -> list:
+    path, source = split_spec(spec)
+
+    if path.endswith((".snapshot.parquet", ".arrow")):
+        df = read_snapshot(path).to_pandas()
+    elif path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    df = canonical_columns(df)
+    if source != "unknown" or "source" not in df.columns:
+        df["source"] = source
+    print(f"   {path}: {len(df)} rows ({source})")
+    return df.to_dict("records")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve provider records into golden records")
+    parser.add_argument("sources", nargs="+", help="FILE[:SOURCE] (csv or parquet)")
+    parser.add_argument("--out", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    print("🔍 Loading sources...")
+    records = []
+    for spec in args.sources:
+        records.extend(load_source(spec))
+
+    start = time.time()
+    golden = resolve(records)
+    elapsed = time.time() - start
+
+    df = pd.DataFrame(golden)
+    df["sources"] = df["sources"].map("; ".join)
+    df["source_ids"] = df["source_ids"].map("; ".join)
+    df["field_sources"] = df["field_sources"].map(json.dumps)
+
+    parquet_path = args.out.rsplit(".", 1)[0] + ".parquet"
+    with FrameWriter(args.out, parquet_path) as writer:
+        writer.write(df.astype(str).replace({"None": "", "nan": ""}))
+
+    # Typed snapshot for the loader: one row per golden record
+    snapshot_path = args.out.rsplit(".", 1)[0] + ".snapshot.parquet"
+    write_snapshot(to_snapshot_table(df.assign(source=df["sources"], source_id=None)), snapshot_path)
+
+    merged = len(records) - len(golden)
+    print(f"\n✅ {len(records)} records → {len(golden)} golden records ({merged} merged) in {elapsed:.1f}s")
+    print(f"📁 Saved: {args.out}")
+    print(f"📁 Parquet: {parquet_path}")
+    print(f"📁 Snapshot: {snapshot_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,127 @@
+import argparse
+import json
+import os
+
 import pandas as pd
-from sqlalchemy import create_engine, text
+import pyarrow.compute as pc
 from dotenv import load_dotenv
-import os
 
 # Load environment
 load_dotenv()
 
+from db.connection import get_db
+from pipeline.ingest import ingest, publish_changes
+from pipeline.snapshot import ingest_snapshot, read_any, source_counts
+
 # CONFIG
 CSV_PATH = "test_providers_geocoded.csv"
-DB_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}"
-TABLE_NAME = "providers"
+CHANGED_IDS_FILE = "changed_provider_ids.json"
+
+# Source headers that differ from the providers table
+COLUMN_ALIASES = {
+    "zipcode": "zip",
+}
+
+# Run from the repo root:
+#   python -m scripts.load_to_postgres [--csv FILE] [--dry-run] [--publish] [--no-catalog]
+#   python -m scripts.load_to_postgres --snapshot providers_golden.snapshot.parquet
+
 
 def main():
-    print(f"Loading CSV: {CSV_PATH}")
-    
+    parser = argparse.ArgumentParser(description="Incremental provider load")
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="classify only, write nothing")
+    parser.add_argument("--publish", action="store_true", help="emit changed ids on Redis")
+    parser.add_argument("--no-catalog", action="store_true", help="skip rebuilding the provider catalog")
+    parser.add_argument("--snapshot", help="provider snapshot (.parquet / .arrow): COPY + SQL diff")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        result = load_snapshot(args.snapshot, args.dry_run)
+    else:
+        result = load_csv(args.csv, args.dry_run)
+    if result is None:
+        return
+
+    summary = result.summary()
+    print(f"   New: {summary['new']} | Changed: {summary['changed']} | "
+          f"Unchanged: {summary['unchanged']} | Duplicate rows: {summary['duplicates']}")
+
+    if args.dry_run:
+        print("Dry run - nothing written")
+        return
+
+    changed_ids = sorted(result.changed_ids)
+    with open(CHANGED_IDS_FILE, "w") as f:
+        json.dump(changed_ids, f)
+
+    print(f"SUCCESS! Inserted {len(result.inserted_ids)}, updated {len(result.updated_ids)}")
+    print(f"   Changed ids written to: {CHANGED_IDS_FILE}")
+
+    if args.publish and changed_ids:
+        from app.utils.redis_client import redis_client
+        publish_changes(redis_client, changed_ids)
+        print(f"   Published {len(changed_ids)} ids for cache invalidation")
+
+    # The API answers basic / nearby search from the catalog when one exists,
+    # so an existing catalog is rebuilt or it would keep serving the old rows
+    from scripts.build_catalog import CATALOG_PATH, build
+    if changed_ids and not args.no_catalog and os.path.exists(CATALOG_PATH):
+        build(CATALOG_PATH)
+
+
+def load_snapshot(path, dry_run):
+    print(f"Loading snapshot: {path}")
+
     try:
-        df = pd.read_csv(CSV_PATH)
+        table = read_any(path)
     except FileNotFoundError:
-        print(f"ERROR: File not found: {CSV_PATH}")
-        return
-    
+        print(f"ERROR: File not found: {path}")
+        return None
+
+    print(f"   Found {table.num_rows} rows from {source_counts(table)}")
+
+    # Same cleanup as the CSV path, on typed columns
+    keep = pc.and_(
+        pc.invert(pc.fill_null(pc.match_substring(table["name"], "ERRORS BELOW"), False)),
+        pc.and_(pc.is_valid(table["latitude"]), pc.is_valid(table["longitude"])),
+    )
+    table = table.filter(keep)
+    print(f"   After cleanup: {table.num_rows} rows")
+
+    try:
+        with get_db() as conn:
+            return ingest_snapshot(conn, table, dry_run=dry_run)
+    except Exception as e:
+        print(f"ERROR: {e}")
+        return None
+
+
+def load_csv(path, dry_run):
+    print(f"Loading CSV: {path}")
+
+    try:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    except FileNotFoundError:
+        print(f"ERROR: File not found: {path}")
+        return None
+
     print(f"   Found {len(df)} rows, {len(df.columns)} columns")
-    
+
     # Clean
+    df = df.rename(columns=COLUMN_ALIASES)
     df = df[~df['name'].str.contains('ERRORS BELOW', na=False)]
-    df = df.dropna(subset=['latitude', 'longitude'])
-    df = df.replace({pd.NA: None, '': None})
-    df = df.drop_duplicates(subset=['name', 'full_address'], keep='first')
-    
+    df = df[(df['latitude'].str.strip() != '') & (df['longitude'].str.strip() != '')]
+
     print(f"   After cleanup: {len(df)} rows")
-    
-    # Connect
-    try:
-        engine = create_engine(DB_URL)
-        with engine.connect() as conn:
-            # Get table columns
-            result = conn.execute(text(
-                f"SELECT column_name FROM information_schema.columns WHERE table_name='{TABLE_NAME}'"
-            ))
-            db_columns = [row[0] for row in result]
-            
-            # Match columns
-            csv_columns = df.columns.tolist()
-            matching_columns = [col for col in csv_columns if col in db_columns]
-            missing = [col for col in csv_columns if col not in db_columns]
-            
-            if missing:
-                print(f"   Skipping: {missing}")
-            
-            df = df[matching_columns]
-            
-            # Check for duplicates in database
-            if 'name' in matching_columns and 'full_address' in matching_columns:
-                existing_df = pd.read_sql(
-                    f"SELECT name, full_address FROM {TABLE_NAME}",
-                    engine
-                )
-                
-                # Filter out duplicates
-                before_filter = len(df)
-                df = df.merge(
-                    existing_df,
-                    on=['name', 'full_address'],
-                    how='left',
-                    indicator=True
-                )
-                df = df[df['_merge'] == 'left_only'].drop('_merge', axis=1)
-                
-                duplicates_skipped = before_filter - len(df)
-                if duplicates_skipped > 0:
-                    print(f"   Skipped {duplicates_skipped} duplicates already in database")
-            
-            print(f"   Inserting {len(df)} new rows")
-    
-    except Exception as e:
-        print(f"ERROR: {e}")
-        return
-    
-    # Insert
-    if len(df) == 0:
-        print("No new rows to insert!")
-        return
-    
+
     try:
-        df.to_sql(TABLE_NAME, engine, if_exists="append", index=False, method='multi')
-        print(f"SUCCESS! Inserted {len(df)} rows")
-        
-        with engine.connect() as conn:
-            result = conn.execute(text(f"SELECT COUNT(*) FROM {TABLE_NAME}"))
-            total = result.scalar()
-            print(f"   Total in database: {total} rows")
-    
+        with get_db() as conn:
+            return ingest(conn, df.to_dict("records"), dry_run=dry_run)
     except Exception as e:
         print(f"ERROR: {e}")
-        return
+        return None
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,60 @@
+import argparse
+
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+from db.connection import get_db
+from db.partitions import TABLES, list_partitions, maintain
+
+# Run from the repo root after migrations/0004_partition_activity_tables.sql,
+# then daily from cron:
+#   python -m scripts.manage_partitions              # create ahead + retention
+#   python -m scripts.manage_partitions --dry-run    # show what would be dropped
+#   python -m scripts.manage_partitions --status     # list partitions + sizes
+
+
+def status(conn):
+    cur = conn.cursor()
+    for table in TABLES:
+        print(f"📊 {table.name} (by {table.unit}, retention {table.retention_days or '∞'} days)")
+        for p in list_partitions(cur, table):
+            cur.execute(
+                "SELECT reltuples::bigint, pg_size_pretty(pg_total_relation_size(oid)) FROM pg_class WHERE oid = %s::regclass",
+                (p.name,),
+            )
+            rows, size = cur.fetchone()
+            bounds = "DEFAULT" if p.is_default else f"{p.lower or 'MIN'} → {p.upper or 'MAX'}"
+            print(f"   {p.name:<36} {bounds:<26} ~{max(rows, 0):>10,} rows  {size}")
+    cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming partitions and drop expired ones")
+    parser.add_argument("--dry-run", action="store_true", help="report only; create and drop nothing")
+    parser.add_argument("--no-retention", action="store_true", help="only create partitions")
+    parser.add_argument("--status", action="store_true")
+    args = parser.parse_args()
+
+    with get_db() as conn:
+        if args.status:
+            status(conn)
+            return
+
+        report = maintain(conn, retention=not args.no_retention, dry_run=args.dry_run)
+
+    for table, result in report.items():
+        if "skipped" in result:
+            print(f"⚠️ {table}: {result['skipped']}")
+            continue
+        print(f"✅ {table}: created {len(result['created'])}, "
+              f"{'would drop' if args.dry_run else 'dropped'} {len(result['dropped'])}")
+        for name in result["created"]:
+            print(f"   + {name}")
+        for name in result["dropped"]:
+            print(f"   - {name}")
+
+
+if __name__ == "__main__":
+    main()
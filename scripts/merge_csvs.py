@@ -1,46 +1,43 @@
 import os
-import pandas as pd
+import sys
+import time
+
+from pipeline.normalize import FrameWriter, merge_state_files, state_files
+from pipeline.snapshot import SnapshotWriter
+
+# Run from the repo root:
+#   python -m scripts.merge_csvs [FOLDER]
 
 # Folder where all your CSV files exist
-folder = r"C:\Users\zubby\AUTIZIM BOT"
+folder = sys.argv[1] if len(sys.argv) > 1 else r"C:\Users\zubby\AUTIZIM BOT"
 
-# Output file
+# Output files
 output_file = os.path.join(folder, "abafinder_ALL_STATES.csv")
+parquet_file = os.path.join(folder, "abafinder_ALL_STATES.parquet")
+snapshot_file = os.path.join(folder, "abafinder_ALL_STATES.snapshot.parquet")  # + .snapshot.arrow
 
 print("🔍 Looking for CSV files in:", folder)
 
 # Get all CSVs that match abafinder_XX.csv
-csv_files = [
-    f for f in os.listdir(folder)
-    if f.startswith("abafinder_") and f.endswith(".csv")
-]
+csv_files = state_files(folder)
 
 print(f"📄 Found {len(csv_files)} state CSV files:")
 for f in csv_files:
-    print("  -", f)
+    print("  -", os.path.basename(f))
 
 if not csv_files:
     print("❌ No files found. Make sure they are named like 'abafinder_CA.csv'")
     exit()
 
-# Read and merge
-df_list = []
-for file in csv_files:
-    full_path = os.path.join(folder, file)
-    print(f"➡️  Merging {file}...")
-    df = pd.read_csv(full_path)
-
-    # Add a column for the state (from filename)
-    state_code = file.replace("abafinder_", "").replace(".csv", "")
-    df["state"] = state_code
-
-    df_list.append(df)
-
-merged_df = pd.concat(df_list, ignore_index=True)
+start = time.time()
 
-# Save final merged CSV
-merged_df.to_csv(output_file, index=False)
+# Stream every file in chunks straight to the outputs
+with FrameWriter(output_file, parquet_file) as writer, SnapshotWriter(snapshot_file) as snapshot:
+    stats = merge_state_files(csv_files, writer, snapshot=snapshot)
 
 print("\n✅ MERGE COMPLETE!")
 print(f"📁 Output saved to: {output_file}")
-print(f"📊 Total rows: {len(merged_df)}")
+print(f"📁 Parquet saved to: {parquet_file}")
+print(f"📁 Snapshot saved to: {snapshot_file}")
+print(f"📊 Total rows: {stats['rows_out']}")
+print(f"⏱️  {time.time() - start:.1f}s")
@@ -0,0 +1,55 @@
+import argparse
+
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+from db.connection import get_db
+from db.migrations import SchemaError, migrate, status, verify_schema
+from db.partitions import maintain as maintain_partitions
+
+# Run from the repo root before starting a new API version:
+#   python -m scripts.migrate              # apply pending migrations
+#   python -m scripts.migrate --dry-run    # list what would run
+#   python -m scripts.migrate --status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned SQL migrations (migrations/NNNN_*.sql)")
+    parser.add_argument("--status", action="store_true")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--target", type=int, help="stop after this version")
+    args = parser.parse_args()
+
+    with get_db() as conn:
+        if args.status:
+            for row in status(conn):
+                icon = {"applied": "✅", "pending": "⏳", "drifted": "⚠️"}[row["state"]]
+                when = f"  {row['applied_at']:%Y-%m-%d %H:%M}" if row["applied_at"] else ""
+                print(f"{icon} {row['version']:04d}_{row['name']:<32} {row['state']}{when}")
+            return
+
+        try:
+            ran = migrate(conn, target=args.target, dry_run=args.dry_run)
+        except SchemaError as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+
+        if args.dry_run:
+            for m in ran:
+                print(f"⏳ would apply {m.version:04d}_{m.name}")
+            return
+        if not ran:
+            print("✅ Schema up to date")
+
+        # Partitioned tables need their current/upcoming partitions right away
+        maintain_partitions(conn, retention=False)
+
+        if args.target is None:
+            verify_schema(conn)
+            print("✅ Schema check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import argparse
+
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+from app.core.observability import PROFILES_RATE_KEY, set_profiling
+from app.utils.redis_client import redis_client
+
+# Run from the repo root (every API worker picks it up within ~10s):
+#   python -m scripts.profiling on --rate 0.25 --minutes 15
+#   python -m scripts.profiling off
+#   python -m scripts.profiling status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Toggle Sentry profiling on the running API")
+    parser.add_argument("action", choices=["on", "off", "status"])
+    parser.add_argument("--rate", type=float, default=0.1, help="share of traced requests to profile")
+    parser.add_argument("--minutes", type=float, default=15, help="switches itself off after this long")
+    args = parser.parse_args()
+
+    if args.action == "on":
+        set_profiling(args.rate, args.minutes)
+        print(f"✅ Profiling {args.rate:.0%} of traced requests for {args.minutes:g} min")
+    elif args.action == "off":
+        set_profiling(0, 0)
+        print("✅ Profiling off")
+
+    rate = redis_client.get(PROFILES_RATE_KEY)
+    ttl = redis_client.ttl(PROFILES_RATE_KEY)
+    if rate is None:
+        print("📊 Profiling: off (env default applies)")
+    else:
+        print(f"📊 Profiling: {float(rate):.0%} of traced requests, {ttl}s left")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+
+# Load environment
+load_dotenv()
+
+from app.services.search_demand import rebuild
+from db.connection import get_db
+
+# Run from the repo root once after migrations/0005_search_demand_daily.sql
+# to backfill history, or after changing the controlled vocabulary:
+#   python -m scripts.rebuild_search_demand --days 365
+#
+# Days from the cutoff onward are deleted and recomputed in one
+# transaction. Events the worker records while this runs can be counted
+# twice, so prefer a quiet period (or stop the worker) for large ranges.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute search_demand_daily from user_activity")
+    parser.add_argument("--days", type=int, default=90, help="days of history to rebuild")
+    args = parser.parse_args()
+
+    since = date.today() - timedelta(days=args.days)
+    with get_db() as conn:
+        buckets = rebuild(conn, since)
+
+    print(f"✅ Rebuilt search_demand_daily since {since}: {buckets:,} buckets")
+
+
+if __name__ == "__main__":
+    main()
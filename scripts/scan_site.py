@@ -1,54 +1,75 @@
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import re
-import time
+import argparse
+import asyncio
+import json
+
+from scrapers.crawler import Crawler
+from scrapers.jobs import DomainLimiter, HttpFetcher
+
+# Run from the repo root:
+#   python -m scripts.scan_site
+#   python -m scripts.scan_site --base http://127.0.0.1:8000/ --max-pages 200
+# Re-running with the same --state file resumes an interrupted scan.
 
 BASE = "https://www.appliedbehavioranalysisedu.org/"
-visited = set()
-results = []
+OUTPUT = "abaedu_found_pages.txt"
+
+KEYWORDS = [
+    "aba", "applied behavior", "bcba", "autism", "clinic",
+    "center", "therapy", "address", "suite", "street", "phone"
+]
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
 
-def is_internal(url):
-    return urlparse(url).netloc == urlparse(BASE).netloc
 
-def crawl(url):
-    if url in visited:
-        return
+async def scan(args):
+    import aiohttp
 
-    print("🟦 Visiting:", url)
-    visited.add(url)
+    limiter = DomainLimiter(max_concurrent=args.workers, min_interval=args.interval)
+    async with aiohttp.ClientSession() as session:
+        crawler = Crawler(
+            HttpFetcher(session, limiter, headers=HEADERS, timeout=10),
+            KEYWORDS,
+            output_path=args.jsonl,
+            state_path=args.state,
+            max_depth=args.max_depth,
+            max_pages=args.max_pages,
+            workers=args.workers,
+        )
+        await crawler.run([args.base])
 
-    try:
-        r = requests.get(url, timeout=10)
-    except:
-        return
 
-    soup = BeautifulSoup(r.text, "html.parser")
+def main():
+    parser = argparse.ArgumentParser(description="Breadth-first scan of a site for ABA-related pages")
+    parser.add_argument("--base", default=BASE)
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--max-pages", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.25, help="seconds between requests per host")
+    parser.add_argument("--jsonl", default="abaedu_scan.jsonl", help="streaming per-page results")
+    parser.add_argument("--state", default="abaedu_scan_state.json", help="resume file")
+    parser.add_argument("--out", default=OUTPUT)
+    args = parser.parse_args()
 
-    # Check for ABA-related content
-    text = soup.get_text().lower()
+    asyncio.run(scan(args))
 
-    keywords = [
-        "aba", "applied behavior", "bcba", "autism", "clinic",
-        "center", "therapy", "address", "suite", "street", "phone"
-    ]
-    if any(k in text for k in keywords):
-        results.append(url)
+    # The JSONL holds every page across resumed runs; keep the matches
+    results, seen = [], set()
+    with open(args.jsonl, encoding="utf-8") as f:
+        for line in f:
+            page = json.loads(line)
+            if page["matched"] and page["url"] not in seen:
+                seen.add(page["url"])
+                results.append(page["url"])
 
-    # Find links
-    for a in soup.find_all("a", href=True):
-        link = urljoin(BASE, a["href"])
-        if is_internal(link):
-            crawl(link)
+    print("\n✅ Scan complete")
+    print("Found pages with ABA-like content:", len(results))
 
-# Start
-crawl(BASE)
+    with open(args.out, "w") as f:
+        for page in results:
+            f.write(page + "\n")
 
-print("\n✅ Scan complete")
-print("Found pages with ABA-like content:", len(results))
+    print("Saved URLs to:", args.out)
 
-with open("abaedu_found_pages.txt", "w") as f:
-    for page in results:
-        f.write(page + "\n")
 
-print("Saved URLs to: abaedu_found_pages.txt")
+if __name__ == "__main__":
+    main()
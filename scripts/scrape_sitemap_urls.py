@@ -1,6 +1,9 @@
-import requests
 import xml.etree.ElementTree as ET
 
+from scrapers.http_cache import default_cache
+
+# Run from the repo root: python -m scripts.scrape_sitemap_urls
+
 SITEMAPS = [
     "https://www.appliedbehavioranalysisedu.org/post-sitemap.xml",
     "https://www.appliedbehavioranalysisedu.org/page-sitemap.xml"
@@ -15,7 +18,7 @@ KEYWORDS = [
 
 def fetch_urls(url):
     print(f"🟦 Fetching sitemap: {url}")
-    r = requests.get(url)
+    r = default_cache().get(url)
     urls = []
 
     root = ET.fromstring(r.text)
@@ -44,6 +47,7 @@ def main():
             f.write(url + "\n")
 
     print("\n✅ Saved ABA-related URLs to:", OUTPUT)
+    print(default_cache().stats.report())
 
 
 if __name__ == "__main__":
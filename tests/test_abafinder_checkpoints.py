@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+import pytest
+
+from scrapers import scraper_abafinder_api as api
+from scrapers.jobs import AimdLimiter
+
+
+def provider(title, state="FL"):
+    return {"title": title, "location": {"state": {"shortName": state}}}
+
+
+class FakeApi:
+    """fetch_page stand-in: `catalog` is the full, title-ordered provider list."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.pages = []
+
+    async def fetch_page(self, session, page, limiter):
+        self.pages.append(page)
+        chunk = self.catalog[page * api.LIMIT:(page + 1) * api.LIMIT]
+        return {"data": {"total": len(self.catalog), "result": chunk}}
+
+
+@pytest.fixture
+def fake_api(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "CHECKPOINT_DIR", str(tmp_path / "pages"))
+    monkeypatch.setattr(api, "LIMIT", 2)
+
+    def install(catalog):
+        fake = FakeApi(catalog)
+        monkeypatch.setattr(api, "fetch_page", fake.fetch_page)
+        return fake
+
+    return install
+
+
+def download():
+    return asyncio.run(api.download_catalog(None, AimdLimiter()))
+
+
+def titles(last_page):
+    return [row["name"] for page in range(last_page + 1) for row in api.load_checkpoint(page)["rows"]]
+
+
+def test_unchanged_catalog_resumes_from_checkpoints(fake_api):
+    catalog = [provider(f"P{i}") for i in range(5)]
+    fake_api(catalog)
+    download()
+    os.remove(api.checkpoint_path(2))   # interrupted run
+
+    fake = fake_api(catalog)
+    last_page = download()
+
+    assert fake.pages == [0, 2]
+    assert titles(last_page) == [f"P{i}" for i in range(5)]
+
+
+def test_changed_total_discards_checkpoints(fake_api):
+    fake_api([provider(f"P{i}") for i in range(5)])
+    download()
+
+    fake = fake_api([provider(f"P{i}") for i in range(6)])
+    last_page = download()
+
+    assert fake.pages == [0, 1, 2]
+    assert titles(last_page) == [f"P{i}" for i in range(6)]
+
+
+def test_changed_first_page_discards_checkpoints(fake_api):
+    fake_api([provider(f"P{i}") for i in range(5)])
+    download()
+
+    fake = fake_api([provider("A new clinic")] + [provider(f"P{i}") for i in range(4)])
+    last_page = download()
+
+    assert fake.pages == [0, 1, 2]
+    assert titles(last_page)[:2] == ["A new clinic", "P0"]
+
+
+def test_old_checkpoints_expire(fake_api, monkeypatch):
+    catalog = [provider(f"P{i}") for i in range(5)]
+    fake_api(catalog)
+    download()
+
+    monkeypatch.setattr(api, "CHECKPOINT_MAX_AGE", -1)
+    fake = fake_api(catalog)
+    download()
+
+    assert fake.pages == [0, 1, 2]
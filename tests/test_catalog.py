@@ -0,0 +1,31 @@
+from app.services.catalog import ProviderCatalog, write_catalog
+
+PROVIDERS = [
+    {"id": 1, "name": "Sunshine ABA Therapy", "latitude": 25.77, "longitude": -80.19},
+    {"id": 2, "name": "Bay Area Speech", "latitude": 27.95, "longitude": -82.46},
+    {"id": 3, "name": "Kids First OT", "latitude": None, "longitude": None},
+    {"id": 4, "name": "Abacus Learning", "latitude": 30.33, "longitude": -81.66},
+]
+
+
+def catalog(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    write_catalog(path, PROVIDERS)
+    return ProviderCatalog(path)
+
+
+def test_substring_matches_inside_words_case_insensitively(tmp_path):
+    names = [r.name for r in catalog(tmp_path).search_substring("ba")]
+    # same rows as name ILIKE '%ba%', in name order
+    assert names == ["Abacus Learning", "Bay Area Speech", "Sunshine ABA Therapy"]
+
+
+def test_substring_respects_limit_and_never_spans_names(tmp_path):
+    cat = catalog(tmp_path)
+    assert [r.id for r in cat.search_substring("a", limit=2)] == [4, 2]
+    assert cat.search_substring("speechkids") == []
+    assert cat.search_substring("zzz") == []
+
+
+def test_empty_substring_returns_first_rows(tmp_path):
+    assert len(catalog(tmp_path).search_substring("", limit=3)) == 3
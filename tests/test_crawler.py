@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from scrapers.crawler import CrawlState, Crawler, canonicalize_url
+from scrapers.jobs import FetchResponse
+
+SITE = {
+    "https://example.com/": '<a href="/services">Services</a> <a href="/contact#form">Contact</a>',
+    "https://example.com/services": '<p>We offer ABA therapy</p> <a href="/?utm_source=x">Home</a>',
+    "https://example.com/contact": '<a href="mailto:hi@example.com">Mail</a> <a href="https://other.com/">Out</a>',
+}
+
+
+class SiteFetcher:
+    def __init__(self):
+        self.fetched = []
+
+    async def get(self, url, params=None, headers=None):
+        self.fetched.append(url)
+        if url not in SITE:
+            return FetchResponse(url, 404, "")
+        return FetchResponse(url, 200, SITE[url], {"Content-Type": "text/html"})
+
+
+def crawl(tmp_path, fetcher, **kwargs):
+    crawler = Crawler(
+        fetcher, ["aba"], str(tmp_path / "pages.jsonl"), state_path=str(tmp_path / "state.json"), workers=2, **kwargs
+    )
+    return asyncio.run(crawler.run(["https://EXAMPLE.com:443/"]))
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("HTTPS://Example.com:443//a//b?utm_source=x&b=2&a=1#top") == "https://example.com/a/b?a=1&b=2"
+    assert canonicalize_url("/logo.png", "https://example.com/") is None
+    assert canonicalize_url("tel:123") is None
+
+
+def test_crawl_visits_each_page_once_and_stays_on_site(tmp_path):
+    fetcher = SiteFetcher()
+    state = crawl(tmp_path, fetcher)
+
+    assert sorted(fetcher.fetched) == sorted(SITE)
+    assert state.pages == 3 and state.matched == 1
+    assert state.pending == {}
+
+
+def test_resume_fetches_only_what_was_pending(tmp_path):
+    CrawlState(
+        done={"https://example.com/", "https://example.com/contact"},
+        pending={"https://example.com/services": 1},
+        pages=2,
+    ).save(str(tmp_path / "state.json"))
+
+    fetcher = SiteFetcher()
+    state = crawl(tmp_path, fetcher)
+
+    assert fetcher.fetched == ["https://example.com/services"]
+    assert state.pages == 3
+    with open(tmp_path / "state.json") as f:
+        assert json.load(f)["pending"] == {}
+
+
+def test_finished_crawl_does_nothing_on_rerun(tmp_path):
+    crawl(tmp_path, SiteFetcher())
+    fetcher = SiteFetcher()
+    crawl(tmp_path, fetcher)
+    assert fetcher.fetched == []
+
+
+def test_page_budget_counts_everything_queued(tmp_path):
+    fetcher = SiteFetcher()
+    crawl(tmp_path, fetcher, max_pages=2)
+    assert len(fetcher.fetched) == 2
@@ -0,0 +1,32 @@
+import math
+
+from pipeline import dedup
+from pipeline.dedup import resolve
+
+
+def test_source_ids_are_text_without_missing_values():
+    records = [
+        {"name": "Sunshine ABA", "zip": "33101", "source": "abafinder", "source_id": 123.0},
+        {"name": "Sunshine ABA", "zip": "33101", "source": "serpapi", "source_id": math.nan},
+        {"name": "Sunshine ABA", "zip": "33101", "source": "bhcoe", "source_id": 7},
+    ]
+
+    (golden,) = resolve(records)
+
+    assert golden["source_ids"] == ["123", "7"]
+    assert "; ".join(golden["source_ids"]) == "123; 7"
+
+
+def test_oversized_blocks_are_still_compared(monkeypatch, capsys):
+    monkeypatch.setattr(dedup, "MAX_BLOCK_SIZE", 4)
+    # One zip, same first two name tokens, no geo: no sub-key can split it
+    words = ["Alpha", "Bravo", "Charlie", "Delta", "Echo", "Foxtrot", "Golf", "Hotel", "India", "Juliet"]
+    records = [{"name": f"Kids Care {w} Center", "zip": "33101", "source": "abafinder"} for w in words]
+    records.append({"name": "Kids Care Juliet Center LLC", "zip": "33101", "source": "bhcoe"})
+
+    golden = resolve(records)
+
+    (merged,) = [g for g in golden if "bhcoe" in g["sources"]]
+    assert merged["member_count"] == 2
+    assert merged["name"].startswith("Kids Care Juliet Center")
+    assert "11 records in blocks still over 4" in capsys.readouterr().out
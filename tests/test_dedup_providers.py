@@ -0,0 +1,14 @@
+import pytest
+
+from scripts.dedup_providers import split_spec
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("data/raw/abafinder.csv:abafinder", ("data/raw/abafinder.csv", "abafinder")),
+    ("data/raw/abafinder.csv", ("data/raw/abafinder.csv", "unknown")),
+    (r"C:\data\speech.csv", (r"C:\data\speech.csv", "unknown")),
+    (r"C:\data\speech.csv:serpapi", (r"C:\data\speech.csv", "serpapi")),
+    ("C:speech", ("C:speech", "unknown")),
+])
+def test_split_spec(spec, expected):
+    assert split_spec(spec) == expected
@@ -0,0 +1,43 @@
+import asyncio
+
+from scrapers.geocoding import GeocodeStage, GeoResult, StubGeocoder, normalize_address
+
+
+def geocode(rows, geocoder, cache_path):
+    async def run():
+        async with GeocodeStage(geocoder, cache_path=cache_path, workers=4) as stage:
+            for row in rows:
+                await stage.submit(row, row["address"])
+        return stage.stats
+
+    return asyncio.run(run())
+
+
+def test_normalize_address():
+    assert normalize_address("  12 Main St.,  Miami, FL ") == "12 main st miami fl"
+
+
+def test_duplicate_addresses_share_one_request(tmp_path):
+    geocoder = StubGeocoder({"1 Main St": GeoResult(lat=25.1, lon=-80.2)}, delay=0.01)
+    rows = [{"address": "1 Main St"}, {"address": "1 main st."}, {"address": "1 MAIN ST"}]
+
+    stats = geocode(rows, geocoder, str(tmp_path / "geo.sqlite"))
+
+    assert geocoder.calls == 1
+    assert stats["geocoded"] == 1 and stats["cache_hits"] == 2
+    assert all((r["lat"], r["lon"]) == (25.1, -80.2) for r in rows)
+
+
+def test_rerun_is_served_from_the_cache_including_misses(tmp_path):
+    cache_path = str(tmp_path / "geo.sqlite")
+    table = {"1 Main St": GeoResult(lat=25.1, lon=-80.2), "nowhere": None}
+    geocode([{"address": "1 Main St"}, {"address": "nowhere"}], StubGeocoder(table), cache_path)
+
+    geocoder = StubGeocoder(table)
+    rows = [{"address": "1 Main St"}, {"address": "nowhere"}]
+    stats = geocode(rows, geocoder, cache_path)
+
+    assert geocoder.calls == 0
+    assert stats["cache_hits"] == 2
+    assert rows[0]["lat"] == 25.1
+    assert "lat" not in rows[1]
@@ -0,0 +1,48 @@
+import asyncio
+
+from scrapers.http_cache import CachingFetcher, HttpCache
+from scrapers.jobs import FetchResponse
+
+URL = "https://example.com/directory"
+
+
+class ValidatingServer:
+    """Fetcher double: lowercase header names, 304 when the ETag matches."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def get(self, url, params=None, headers=None):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return FetchResponse(url, 304, "", {"etag": '"v1"'})
+        return FetchResponse(url, 200, "<html>v1</html>", {"etag": '"v1"', "content-type": "text/html"})
+
+
+def test_lowercase_etag_is_stored_and_sent_back(tmp_path):
+    server = ValidatingServer()
+    cache = HttpCache(str(tmp_path / "cache"))
+    fetcher = CachingFetcher(server, cache)
+
+    first = asyncio.run(fetcher.get(URL))
+    second = asyncio.run(fetcher.get(URL))
+
+    assert server.requests[1] == {"If-None-Match": '"v1"'}
+    assert (first.text, second.text) == ("<html>v1</html>", "<html>v1</html>")
+    assert second.headers["Content-Type"] == "text/html"
+    assert cache.stats.by_domain["example.com"]["revalidated"] == 1
+
+
+def test_only_fresh_hits_skip_the_network(tmp_path):
+    server = ValidatingServer()
+    fetcher = CachingFetcher(server, HttpCache(str(tmp_path / "cache")))
+    downloaded = asyncio.run(fetcher.get(URL))
+    revalidated = asyncio.run(fetcher.get(URL))
+
+    fresh = CachingFetcher(server, HttpCache(str(tmp_path / "cache"), max_age=3600))
+    served = asyncio.run(fresh.get(URL))
+
+    assert (downloaded.from_cache, downloaded.network) == (False, True)
+    assert (revalidated.from_cache, revalidated.network) == (True, True)
+    assert (served.from_cache, served.network) == (True, False)
+    assert len(server.requests) == 2
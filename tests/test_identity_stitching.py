@@ -0,0 +1,49 @@
+import pytest
+
+from analytics.identity_stitching import stitch
+from db import statements
+
+
+class FakeConnection:
+    def commit(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self):
+        self.connection = FakeConnection()
+        self.executed = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cur(monkeypatch):
+    monkeypatch.setattr(statements, "ENABLED", False)
+    cursor = FakeCursor()
+    cursor.connection.cursor = lambda: cursor
+    return cursor
+
+
+def test_device_rows_are_scoped_to_sessions_the_user_owns(cur):
+    stitch(cur.connection, 7, session_id="s1", device_id="fp1", batch_size=100)
+
+    session_runs = [(sql, p) for sql, p in cur.executed if "session_id = %s" in sql]
+    device_runs = [(sql, p) for sql, p in cur.executed if "device_id = %s" in sql]
+    assert len(session_runs) == len(device_runs) == 2   # one per table
+
+    for sql, params in device_runs:
+        assert "session_id IN (SELECT session_id FROM" in sql and "WHERE user_id = %s" in sql
+        assert params == (7, "fp1", 7, 100, "fp1")
+    for sql, params in session_runs:
+        assert params == (7, "s1", 100, "s1")
+
+
+def test_device_alone_never_runs_unscoped(cur):
+    stitch(cur.connection, 7, device_id="fp1")
+    assert cur.executed and all("session_id IN (SELECT session_id FROM" in sql for sql, _ in cur.executed)
@@ -0,0 +1,72 @@
+import asyncio
+import csv
+import os
+
+from scrapers.jobs import Adapter, JobStore, UnitResult, WorkUnit, run_adapter
+
+
+def unit(key, **payload):
+    return WorkUnit("test", key, payload)
+
+
+def test_reopened_store_resumes_pending_units(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    store.add([unit("FL"), unit("GA"), unit("TX")])
+    store.mark_done(unit("FL"), rows=3)
+    store.mark_failed(unit("GA"), "timeout")
+    store.close()
+
+    store = JobStore(path)
+    store.add([unit("FL"), unit("GA"), unit("TX")])   # re-adding keeps status
+    assert [u.key for u in store.pending("test")] == ["TX"]
+    assert [u.key for u in store.pending("test", retry_failed=True)] == ["GA", "TX"]
+    assert store.stats("test") == {"pending": 1, "done": 1, "failed": 1, "rows": 3}
+
+
+def test_mark_done_returns_only_new_follow_ups(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    store.add([unit("page=1"), unit("page=2")])
+
+    added = store.mark_done(unit("page=1"), rows=10, follow_ups=[unit("page=2"), unit("page=3", n=3)])
+
+    assert [u.key for u in added] == ["page=3"]
+    assert [(u.key, u.payload) for u in store.pending("test")] == [("page=2", {}), ("page=3", {"n": 3})]
+
+
+class PagedAdapter(Adapter):
+    name = "test"
+    fieldnames = ["page"]
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.ran = []
+
+    def units(self):
+        return [self.unit("page=1", n=1)]
+
+    async def run_unit(self, unit, fetcher):
+        self.ran.append(unit.key)
+        n = unit.payload["n"]
+        if n in self.broken:
+            raise RuntimeError("boom")
+        follow_ups = [self.unit(f"page={n + 1}", n=n + 1)] if n < 3 else []
+        return UnitResult(rows=[{"page": n}], follow_ups=follow_ups)
+
+
+def test_rerun_only_retries_failed_units(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    out = str(tmp_path / "out")
+
+    first = PagedAdapter(broken={2})
+    stats = asyncio.run(run_adapter(first, store, fetcher=None, output_dir=out, workers=2, max_attempts=1))
+    assert first.ran == ["page=1", "page=2"]
+    assert stats["failed"] == 1
+
+    second = PagedAdapter()
+    stats = asyncio.run(run_adapter(second, store, fetcher=None, output_dir=out, workers=2, retry_failed=True))
+    assert second.ran == ["page=2", "page=3"]
+    assert stats == {"pending": 0, "done": 3, "failed": 0, "rows": 3}
+
+    with open(os.path.join(out, "test.csv"), newline="") as f:
+        assert sorted(int(r["page"]) for r in csv.DictReader(f)) == [1, 2, 3]
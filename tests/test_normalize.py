@@ -0,0 +1,21 @@
+import pandas as pd
+
+from pipeline.normalize import clean_phone, clean_text, extract_address_parts
+
+
+def test_clean_text_replaces_each_newline_character():
+    values = pd.Series(["a\r\nb", "x\n\ny", " c\rd ", None])
+    assert clean_text(values).tolist() == ["a  b", "x  y", "c d", ""]
+
+
+def test_clean_phone_formats_ten_digit_numbers():
+    values = pd.Series(["305.555.0100", "+1 305 555 0100", None])
+    assert clean_phone(values).tolist() == ["(305) 555-0100", "13055550100", ""]
+
+
+def test_extract_address_parts():
+    parts = extract_address_parts(pd.Series(["12 Main St, Miami, FL 33101", "Online only"]))
+    assert parts.to_dict("records") == [
+        {"address": "12 Main St", "city": "Miami", "state": "FL", "zip": "33101"},
+        {"address": "Online only", "city": "", "state": "", "zip": ""},
+    ]
@@ -0,0 +1,37 @@
+from app.core.observability import SamplingPolicy
+
+
+def policy(**kwargs):
+    return SamplingPolicy(default_rate=0.05, hot_rate=0.005, **kwargs)
+
+
+def test_health_and_metrics_are_never_traced():
+    assert policy().rate_for("/health") == 0.0
+    assert policy().rate_for("/metrics") == 0.0
+
+
+def test_hot_paths_use_the_hot_rate():
+    p = policy()
+    assert p.rate_for("/providers/search") == 0.005
+    assert p.rate_for("/providers/nearby") == 0.005
+    assert p.rate_for("/providers/123") == 0.005
+    assert p.rate_for("/providers/123/") == 0.005
+
+
+def test_other_paths_use_the_default_rate():
+    p = policy()
+    assert p.rate_for("/providers/stats") == 0.05
+    assert p.rate_for("/users/me") == 0.05
+
+
+def test_exact_override_wins():
+    p = policy(overrides={"/health": 1.0, "/providers/search": 0.5})
+    assert p.rate_for("/health") == 1.0
+    assert p.rate_for("/providers/search") == 0.5
+
+
+def test_sampler_honours_parent_and_skips_non_http():
+    p = policy()
+    assert p.traces_sampler({"parent_sampled": True, "asgi_scope": {"type": "http", "path": "/health"}}) == 1.0
+    assert p.traces_sampler({"asgi_scope": {"type": "websocket", "path": "/ws"}}) == 0.0
+    assert p.traces_sampler({"asgi_scope": {"type": "http", "path": "/users/me"}}) == 0.05
@@ -0,0 +1,53 @@
+from datetime import date
+
+from db.partitions import Partition, PartitionedTable, _covered_until, partition_name, periods
+
+MONTHLY = PartitionedTable("user_activity", "timestamp", "month", retention_days=730, premake=2)
+DAILY = PartitionedTable("analytics_events_v2", "created_at", "day", retention_days=180, premake=2)
+
+
+def test_monthly_periods_roll_over_the_year():
+    assert periods(MONTHLY, date(2026, 11, 17)) == [
+        (date(2026, 11, 1), date(2026, 12, 1)),
+        (date(2026, 12, 1), date(2027, 1, 1)),
+        (date(2027, 1, 1), date(2027, 2, 1)),
+    ]
+
+
+def test_daily_periods_start_today():
+    assert periods(DAILY, date(2026, 2, 27)) == [
+        (date(2026, 2, 27), date(2026, 2, 28)),
+        (date(2026, 2, 28), date(2026, 3, 1)),
+        (date(2026, 3, 1), date(2026, 3, 2)),
+    ]
+
+
+def test_partition_name_uses_lower_bound():
+    assert partition_name(MONTHLY, date(2026, 11, 1)) == "user_activity_p20261101"
+
+
+def test_uncovered_period_starts_at_lower():
+    assert _covered_until([], date(2026, 11, 1), date(2026, 12, 1)) == date(2026, 11, 1)
+
+
+def test_legacy_partition_covers_start_of_period():
+    legacy = Partition("user_activity_legacy", None, date(2026, 11, 10))
+    assert _covered_until([legacy], date(2026, 11, 1), date(2026, 12, 1)) == date(2026, 11, 10)
+
+
+def test_adjacent_partitions_are_chained():
+    parts = [
+        Partition("user_activity_p20261115", date(2026, 11, 15), date(2026, 12, 1)),
+        Partition("user_activity_legacy", None, date(2026, 11, 15)),
+    ]
+    assert _covered_until(parts, date(2026, 11, 1), date(2026, 12, 1)) == date(2026, 12, 1)
+
+
+def test_covered_until_is_capped_at_upper():
+    legacy = Partition("user_activity_legacy", None, None)
+    assert _covered_until([legacy], date(2026, 11, 1), date(2026, 12, 1)) == date(2026, 12, 1)
+
+
+def test_default_partition_does_not_count_as_coverage():
+    default = Partition("user_activity_default", None, None, is_default=True)
+    assert _covered_until([default], date(2026, 11, 1), date(2026, 12, 1)) == date(2026, 11, 1)
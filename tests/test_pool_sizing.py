@@ -0,0 +1,40 @@
+from db.connection import pool_sizing, sizing_from_env
+
+
+def test_budget_is_split_across_processes_two_to_one():
+    sizing = pool_sizing(max_connections=100, reserved=10, processes=4)
+    assert sizing.budget == 90
+    assert (sizing.pool_size, sizing.max_overflow) == (14, 8)
+    assert sizing.per_process * sizing.processes <= sizing.budget
+
+
+def test_per_process_is_capped():
+    sizing = pool_sizing(max_connections=500, reserved=10, processes=1, cap=30)
+    assert sizing.per_process == 30
+    assert (sizing.pool_size, sizing.max_overflow) == (20, 10)
+
+
+def test_tiny_budget_still_gets_a_connection_and_one_spare():
+    sizing = pool_sizing(max_connections=5, reserved=10, processes=8)
+    assert sizing.budget == 2
+    assert (sizing.pool_size, sizing.max_overflow) == (1, 1)
+
+
+def test_zero_processes_counts_as_one():
+    assert pool_sizing(max_connections=40, reserved=10, processes=0).processes == 1
+
+
+def test_env_overrides_computed_values(monkeypatch):
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "100")
+    monkeypatch.setenv("DB_RESERVED_CONNECTIONS", "10")
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("API_INSTANCES", "2")
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.delenv("DB_MAX_OVERFLOW", raising=False)
+    monkeypatch.setenv("DB_POOL_MAX_PER_PROCESS", "not-a-number")
+
+    sizing = sizing_from_env()
+
+    assert sizing.processes == 6
+    assert sizing.pool_size == 7
+    assert sizing.max_overflow == 5   # computed: 90 // 6 = 15 per process, 10 + 5
@@ -0,0 +1,168 @@
+import time
+
+import pytest
+
+from analytics import profile_store
+
+
+class FakeRedis:
+    def __init__(self, hashes=None):
+        self.hashes = hashes or {}
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def delete(self, key):
+        return int(self.hashes.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis, self.calls = redis, []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.calls]
+
+
+def add_into(redis):
+    """_DECAY_AND_ADD stand-in: plain HINCRBYFLOAT of the increments."""
+    def run(keys, args):
+        profile = redis.hashes.setdefault(keys[0], {})
+        for field, value in zip(args[3::2], args[4::2]):
+            profile[field] = str(float(profile.get(field, 0)) + float(value))
+        profile["updated_at"] = str(args[0])
+    return run
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(profile_store, "redis_client", fake)
+    monkeypatch.setattr(profile_store, "_cache", profile_store._LRU(100, 30))
+    return fake
+
+
+def test_user_without_profile_falls_back_to_session(redis):
+    now = time.time()
+    redis.hashes["profile:session:s1"] = {"svc:aba": "3", "updated_at": str(now)}
+
+    profile = profile_store.get_profile(session_id="s1", user_id=7)
+
+    assert profile["preferred_services"] == ["ABA"]
+
+
+def test_user_profile_wins_once_written(redis):
+    now = time.time()
+    redis.hashes["profile:session:s1"] = {"svc:aba": "3", "updated_at": str(now)}
+    redis.hashes["profile:user:7"] = {"svc:speech": "2", "updated_at": str(now)}
+
+    profile = profile_store.get_profile(session_id="s1", user_id=7)
+
+    assert profile["preferred_services"] == ["Speech"]
+
+
+def test_merge_session_into_user_decays_and_targets_user_key(redis, monkeypatch):
+    calls = []
+    monkeypatch.setattr(profile_store, "_DECAY_AND_ADD", lambda keys, args: calls.append((keys, args)))
+    now = time.time()
+    redis.hashes["profile:session:s1"] = {
+        "svc:aba": "4",
+        "updated_at": str(now - profile_store.HALF_LIFE),
+    }
+
+    assert profile_store.merge_session_into_user("s1", 7, now=now)
+
+    (keys, args), = calls
+    assert keys == ["profile:user:7"]
+    fields = dict(zip(args[3::2], args[4::2]))
+    assert fields == {"svc:aba": pytest.approx(2.0)}
+
+
+def test_second_login_with_same_session_adds_nothing(redis, monkeypatch):
+    monkeypatch.setattr(profile_store, "_DECAY_AND_ADD", add_into(redis))
+    now = time.time()
+    redis.hashes["profile:session:s1"] = {"svc:aba": "3", "updated_at": str(now)}
+
+    assert profile_store.merge_session_into_user("s1", 7, now=now)
+    assert not profile_store.merge_session_into_user("s1", 7, now=now)
+
+    assert "profile:session:s1" not in redis.hashes
+    assert float(redis.hashes["profile:user:7"]["svc:aba"]) == pytest.approx(3.0)
+
+
+def test_only_activity_since_last_login_is_merged(redis, monkeypatch):
+    monkeypatch.setattr(profile_store, "_DECAY_AND_ADD", add_into(redis))
+    now = time.time()
+    profile_store.record_event({"event": "search", "query": "aba", "session_id": "s1"}, now=now)
+    profile_store.merge_session_into_user("s1", 7, now=now)
+
+    profile_store.record_event({"event": "search", "query": "aba", "session_id": "s1"}, now=now)
+    profile_store.merge_session_into_user("s1", 7, now=now)
+
+    assert float(redis.hashes["profile:user:7"]["svc:aba"]) == pytest.approx(2.0)
+
+
+def test_events_with_user_update_only_the_user_profile(redis, monkeypatch):
+    monkeypatch.setattr(profile_store, "_DECAY_AND_ADD", add_into(redis))
+    profile_store.record_event({"event": "search", "query": "aba", "session_id": "s1", "user_id": 7})
+
+    assert set(redis.hashes) == {"profile:user:7"}
+
+
+def test_merge_without_session_profile_is_noop(redis, monkeypatch):
+    monkeypatch.setattr(profile_store, "_DECAY_AND_ADD", lambda keys, args: pytest.fail("no write expected"))
+    assert not profile_store.merge_session_into_user("missing", 7)
+
+
+def test_summarize_applies_half_life():
+    now = time.time()
+    raw = {
+        "svc:aba": "3",
+        "svc:speech": "0.4",
+        "loc:Miami": "2",
+        "radius_sum": "30",
+        "radius_n": "2",
+        "engagement": "4",
+        "updated_at": str(now - profile_store.HALF_LIFE),
+    }
+
+    profile = profile_store.summarize(raw, now)
+
+    assert profile["preferred_services"] == ["ABA"]   # speech decayed below the threshold
+    assert profile["preferred_locations"] == ["Miami"]
+    assert profile["avg_search_radius"] == 15
+    assert profile["engagement_score"] == 0.2
+    assert profile["weights"]["aba"] == pytest.approx(1.5)
+
+
+def test_summarize_empty_is_default_profile():
+    profile = profile_store.summarize({})
+    assert profile["preferred_services"] == []
+    assert profile["avg_search_radius"] == profile_store.DEFAULT_RADIUS
+
+
+def test_score_providers_ranks_matching_service_and_city_first():
+    profile = {"weights": {"aba": 2.0, "speech": 0.5}, "locations": {"Miami": 1.0}, "avg_search_radius": 10}
+    providers = [
+        {"services": "Speech Therapy", "city": "Tampa"},
+        {"services": "ABA Therapy", "city": "Miami", "distance_miles": 5},
+        {"services": "Hotel", "city": "Orlando"},
+    ]
+
+    scores = profile_store.score_providers(profile, providers)
+
+    assert scores[1] > scores[0] > scores[2]
+    assert scores[2] == 0.0
+    assert scores[1] == pytest.approx(0.6 * 0.8 + 0.25 + 0.15 * 0.5, abs=1e-3)
+
+
+def test_services_in_uses_word_boundaries():
+    assert profile_store.services_in("hotel") == []
+    assert profile_store.services_in("OT near me") == ["ot"]
+    assert sorted(profile_store.services_in("aba and slp")) == ["aba", "speech"]
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from app.services import provider_counters
+
+
+class FakeCursor:
+    rowcount = 12
+
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cur = FakeCursor()
+        self.committed = False
+
+    def cursor(self):
+        return self.cur
+
+    def commit(self):
+        self.committed = True
+
+
+def test_backfill_waits_for_the_first_compaction(monkeypatch):
+    monkeypatch.setattr(provider_counters, "_watermark", lambda: None)
+    conn = FakeConnection()
+
+    assert provider_counters.backfill(conn, datetime(2026, 1, 1)) is None
+    assert conn.cur.executed == []
+
+
+def test_backfill_stops_at_the_watermark_and_never_lowers_counts(monkeypatch):
+    watermark = datetime(2026, 10, 18, 9)
+    monkeypatch.setattr(provider_counters, "_watermark", lambda: watermark)
+    conn = FakeConnection()
+
+    assert provider_counters.backfill(conn, datetime(2026, 1, 1, 13, 45)) == 12
+
+    (sql, params), = conn.cur.executed
+    assert params == (datetime(2026, 1, 1, 13), watermark)
+    assert "GREATEST(provider_activity_hourly.count, EXCLUDED.count)" in sql
+    assert conn.committed
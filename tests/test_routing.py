@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import pytest
+
+from db.connection import READ, WRITE, Router, bind_session
+
+
+class FakePins:
+    enabled = True
+
+    def __init__(self):
+        self.sessions = set()
+
+    def pin(self, session_id):
+        self.sessions.add(session_id)
+
+    def pinned(self, session_id):
+        return session_id in self.sessions
+
+
+@pytest.fixture
+def router():
+    primary = SimpleNamespace(pool_name="primary")
+    replicas = [SimpleNamespace(pool_name="replica0"), SimpleNamespace(pool_name="replica1")]
+    bind_session("s1")
+    yield Router(primary, replicas, FakePins())
+    bind_session(None)
+
+
+def names(engines):
+    return [e.pool_name for e in engines]
+
+
+def test_reads_rotate_over_replicas_with_primary_last(router):
+    assert names(router.candidates(READ)) == ["replica0", "replica1", "primary"]
+    assert names(router.candidates(READ)) == ["replica1", "replica0", "primary"]
+
+
+def test_write_pins_session_reads_to_primary(router):
+    assert names(router.candidates(WRITE)) == ["primary"]
+    assert names(router.candidates(READ)) == ["primary"]
+
+
+def test_unpinned_write_leaves_reads_on_replicas(router):
+    assert names(router.candidates(WRITE, pin=False)) == ["primary"]
+    assert router.pins.sessions == set()
+    assert names(router.candidates(READ))[0] == "replica0"
+
+
+def test_replica_marked_down_is_skipped(router):
+    router.mark_down(router.replicas[0])
+    assert names(router.candidates(READ)) == ["replica1", "primary"]
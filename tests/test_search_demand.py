@@ -0,0 +1,32 @@
+from datetime import date, datetime
+
+from app.core.controlled_vocabulary import canonical_service
+from app.services.search_demand import demand_key
+
+
+def test_non_demand_events_have_no_key():
+    assert demand_key({"event": "search", "query": "aba"}) is None
+    assert demand_key({}) is None
+
+
+def test_key_normalizes_query_city_and_state():
+    event = {"event": "search_unmet", "query": " SLP ", "city": " Miami ", "state": "fl"}
+    assert demand_key(event, day=date(2026, 10, 1)) == (
+        date(2026, 10, 1), canonical_service("slp"), "Miami", "FL",
+    )
+
+
+def test_aliases_share_a_key():
+    day = date(2026, 10, 1)
+    a = demand_key({"event_type": "search_low_supply", "query": "speech therapy"}, day)
+    b = demand_key({"event_type": "search_low_supply", "query": "slp"}, day)
+    assert a == b
+
+
+def test_day_comes_from_the_event_timestamp():
+    ts = int(datetime(2026, 3, 14, 12).timestamp())
+    assert demand_key({"event": "search_unmet", "query": "aba", "ts": str(ts)})[0] == date(2026, 3, 14)
+
+
+def test_bad_timestamp_falls_back_to_today():
+    assert demand_key({"event": "search_unmet", "query": "aba", "ts": "soon"})[0] == date.today()
@@ -0,0 +1,71 @@
+import pytest
+
+from db import statements
+from db.statements import Statement, execute, statement
+
+
+class FakeConnection:
+    pass
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+
+def test_placeholders_are_numbered_in_order():
+    stmt = Statement("t_numbering", "SELECT * FROM providers WHERE city = %s AND state = %s LIMIT %s;")
+    assert stmt.server_sql == "SELECT * FROM providers WHERE city = $1 AND state = $2 LIMIT $3"
+    assert stmt.param_count == 3
+    assert stmt.execute_sql == "EXECUTE t_numbering (%s, %s, %s)"
+
+
+def test_escaped_percent_is_not_a_placeholder():
+    stmt = Statement("t_percent", "SELECT * FROM providers WHERE name ILIKE '%%' || %s || '%%'")
+    assert stmt.server_sql == "SELECT * FROM providers WHERE name ILIKE '%' || $1 || '%'"
+    assert stmt.param_count == 1
+
+
+def test_statement_without_params():
+    stmt = Statement("t_noparams", "SELECT COUNT(*) FROM providers")
+    assert stmt.param_count == 0
+    assert stmt.execute_sql == "EXECUTE t_noparams"
+
+
+def test_registry_rejects_bad_names_and_conflicting_sql():
+    with pytest.raises(ValueError):
+        statement("Bad-Name", "SELECT 1")
+
+    first = statement("t_registry", "SELECT %s")
+    assert statement("t_registry", "SELECT %s") is first
+    with pytest.raises(ValueError):
+        statement("t_registry", "SELECT %s, %s")
+
+
+def test_execute_prepares_once_per_connection(monkeypatch):
+    monkeypatch.setattr(statements, "ENABLED", True)
+    stmt = statement("t_prepare_once", "SELECT * FROM providers WHERE id = %s")
+
+    conn = FakeConnection()
+    cur = FakeCursor(conn)
+    execute(cur, stmt, (1,))
+    execute(cur, stmt, (2,))
+    assert cur.executed == [
+        ("PREPARE t_prepare_once AS SELECT * FROM providers WHERE id = $1", None),
+        ("EXECUTE t_prepare_once (%s)", (1,)),
+        ("EXECUTE t_prepare_once (%s)", (2,)),
+    ]
+
+    other = FakeCursor(FakeConnection())
+    execute(other, stmt, (3,))
+    assert other.executed[0][0].startswith("PREPARE t_prepare_once")
+
+
+def test_execute_checks_param_count():
+    stmt = statement("t_param_count", "SELECT %s, %s")
+    with pytest.raises(ValueError):
+        execute(FakeCursor(FakeConnection()), stmt, (1,))